@@ -0,0 +1,89 @@
+# benchmarks/codec.py
+"""
+Size and encode/decode time of models.codec against the dict form.
+
+The dict form is what the pipeline wrote before the codec:
+json.dumps(record.to_dict()) and Record.from_dict(json.loads(...)). Records are
+synthetic answer proposals shaped like the answer model's output.
+
+    python benchmarks/codec.py --records 2000 --claims 6 --repeat 5
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from models import codec  # noqa: E402
+from models.types import AnswerProposal, Assumption, AssumptionType, Claim, Impact  # noqa: E402
+
+WORDS = "policy employee data retention access approval manager request record system must may within days".split()
+
+
+def sentence(rng: random.Random, n: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(n)).capitalize() + "."
+
+
+def make_proposals(n: int, claims: int, seed: int) -> List[AnswerProposal]:
+    rng = random.Random(seed)
+    out = []
+    for _ in range(n):
+        out.append(AnswerProposal(
+            claims=[
+                Claim(sentence(rng, 14), [f"POL-{rng.randint(1, 40):03d}:{rng.randint(1, 9)}.{rng.randint(1, 9)}#s{rng.randint(0, 6)}"])
+                for _ in range(claims)
+            ],
+            assumptions=[Assumption(rng.choice(list(AssumptionType)).value, sentence(rng, 10), rng.choice(list(Impact)))],
+            final_answer=sentence(rng, 40),
+        ))
+    return out
+
+
+def best_of(fn: Callable[[], object], repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return min(times)
+
+
+def measure(records: List[AnswerProposal], repeat: int) -> Dict[str, Dict[str, float]]:
+    dict_blobs = [json.dumps(r.to_dict()).encode("utf-8") for r in records]
+    codec_blobs = [codec.dumps(r) for r in records]
+    assert [codec.loads(b) for b in codec_blobs] == [AnswerProposal.from_dict(json.loads(b)) for b in dict_blobs]
+    n = len(records)
+    return {
+        "dict": {
+            "bytes_per_record": sum(map(len, dict_blobs)) / n,
+            "encode_us": best_of(lambda: [json.dumps(r.to_dict()).encode("utf-8") for r in records], repeat) / n * 1e6,
+            "decode_us": best_of(lambda: [AnswerProposal.from_dict(json.loads(b)) for b in dict_blobs], repeat) / n * 1e6,
+        },
+        "codec": {
+            "bytes_per_record": sum(map(len, codec_blobs)) / n,
+            "encode_us": best_of(lambda: [codec.dumps(r) for r in records], repeat) / n * 1e6,
+            "decode_us": best_of(lambda: [codec.loads(b) for b in codec_blobs], repeat) / n * 1e6,
+        },
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--records", type=int, default=2000)
+    ap.add_argument("--claims", type=int, default=6)
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    result = measure(make_proposals(args.records, args.claims, args.seed), args.repeat)
+    for name in ("bytes_per_record", "encode_us", "decode_us"):
+        result.setdefault("codec/dict", {})[name] = round(result["codec"][name] / result["dict"][name], 3)
+    print(json.dumps({k: {m: round(v, 2) for m, v in d.items()} for k, d in result.items()}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
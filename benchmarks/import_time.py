@@ -0,0 +1,121 @@
+# benchmarks/import_time.py
+"""
+Import-time budget check for the query-only entry point.
+
+Spawns fresh interpreters, measures how long `import query` takes on top of a
+bare interpreter start, and fails (exit 1) when the median exceeds the budget
+or when a heavy dependency sneaks back into the import graph.
+
+    python benchmarks/import_time.py [--budget-ms 150] [--runs 7] [--module query]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+
+# Modules that must never be imported just to answer a question.
+FORBIDDEN = [
+    "pypdf",
+    "chromadb",
+    "openai",
+    "httpx",
+    "ingestion.loader",
+    "ingestion.chunking",
+    "ingestion.embedder",
+]
+
+PROBE = """
+import json, sys, time
+t0 = time.perf_counter()
+import {module}
+elapsed = (time.perf_counter() - t0) * 1000.0
+print(json.dumps({{"ms": elapsed, "loaded": [m for m in {forbidden!r} if m in sys.modules]}}))
+"""
+
+
+def _env() -> Dict[str, str]:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(p for p in [str(SRC_DIR), env.get("PYTHONPATH", "")] if p)
+    return env
+
+
+def measure(module: str, runs: int) -> Dict[str, object]:
+    code = PROBE.format(module=module, forbidden=FORBIDDEN)
+    times: List[float] = []
+    loaded: List[str] = []
+    # first run warms the bytecode cache and is discarded
+    for i in range(runs + 1):
+        out = subprocess.run(
+            [sys.executable, "-c", code], cwd=str(SRC_DIR), env=_env(),
+            capture_output=True, text=True, check=True,
+        )
+        data = json.loads(out.stdout.strip().splitlines()[-1])
+        if i > 0:
+            times.append(float(data["ms"]))
+        loaded = sorted(set(loaded) | set(data["loaded"]))
+    return {
+        "module": module,
+        "runs": runs,
+        "median_ms": statistics.median(times),
+        "min_ms": min(times),
+        "max_ms": max(times),
+        "forbidden_loaded": loaded,
+    }
+
+
+def top_offenders(module: str, limit: int = 10) -> List[str]:
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=str(SRC_DIR), env=_env(), capture_output=True, text=True,
+    )
+    rows = []
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _self_us, cum_us, name = (p.strip() for p in line[len("import time:"):].split("|"))
+        rows.append((int(cum_us), name))
+    rows.sort(reverse=True)
+    return [f"{cum / 1000.0:8.1f} ms  {name}" for cum, name in rows[:limit]]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="query")
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--budget-ms", type=float, default=float(os.environ.get("IMPORT_BUDGET_MS", "150")))
+    parser.add_argument("--json", action="store_true", help="print the result as JSON only")
+    args = parser.parse_args()
+
+    result = measure(args.module, args.runs)
+    result["budget_ms"] = args.budget_ms
+    failures = []
+    if result["median_ms"] > args.budget_ms:
+        failures.append(f"median import time {result['median_ms']:.1f} ms exceeds budget {args.budget_ms:.1f} ms")
+    if result["forbidden_loaded"]:
+        failures.append(f"heavy modules imported at startup: {result['forbidden_loaded']}")
+    result["ok"] = not failures
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print(f"[import-time] {args.module}: median={result['median_ms']:.1f} ms "
+              f"min={result['min_ms']:.1f} ms max={result['max_ms']:.1f} ms budget={args.budget_ms:.1f} ms")
+        if failures:
+            print("\nSlowest imports (cumulative):")
+            for row in top_offenders(args.module):
+                print("  " + row)
+        for f in failures:
+            print("FAIL:", f)
+
+    if failures:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,385 @@
+# benchmarks/loadgen.py
+"""
+End-to-end load test of the serving pipeline against a local LLM stand-in.
+
+Starts a stand-in for the OpenAI embeddings and chat endpoints in a child
+process, indexes the policy corpus through it, then drives QuestionService
+(coalescing, admission control, stage limits, routing: all as configured by
+the usual env settings) with open-loop Poisson arrivals for --duration
+seconds and drains the requests still in flight.
+
+The stand-in answers with hashed embeddings and grounded JSON built from the
+excerpts in the prompt. Every call sleeps for a lognormal latency given as
+median:p95 ms, and fails with a 429 (Retry-After) or a 500 at the given rates.
+--bad-citation-rate makes some answers cite an unknown excerpt, so the hard
+gates have something to block.
+
+    python benchmarks/loadgen.py --rate 20 --duration 30
+    python benchmarks/loadgen.py --rate 50 --chat-latency 900:3000 --rate-limit-rate 0.05 --out run.json
+    python benchmarks/loadgen.py --standin-only --port 8900    # just the stand-in, for OPENAI_BASE_URL
+
+The report (stdout, or --out) is JSON: throughput, end-to-end and per-stage
+p50/p95/p99 latency, outcome counts, error/shed/block rates, the service's
+own metrics and the stand-in's counters.
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import math
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+sys.path.insert(0, str(ROOT / "benchmarks"))
+
+STANDIN_PREFIX = "/_standin"
+_EXCERPT_RE = re.compile(r"^\[([^\]\s]+)\] (.+)$", re.MULTILINE)
+
+
+# ---------------------------------------------------------------- stand-in
+
+def parse_latency(spec: str) -> Tuple[float, float]:
+    """"median:p95" in ms -> lognormal (mu, sigma) in seconds."""
+    median, _, p95 = spec.partition(":")
+    median_s = max(float(median), 0.001) / 1000.0
+    p95_s = max(float(p95 or median), median_s * 1000.0) / 1000.0
+    return math.log(median_s), math.log(p95_s / median_s) / 1.645
+
+
+class StandIn:
+    """OpenAI-compatible enough for this pipeline: /v1/embeddings and /v1/chat/completions."""
+
+    def __init__(self, embed_latency: str, chat_latency: str, rate_limit_rate: float,
+                 error_rate: float, bad_citation_rate: float, embed_dim: int, seed: int):
+        from retrieval_eval import HashingEmbedder
+
+        self.embedder = HashingEmbedder(embed_dim)
+        self.latency = {"embeddings": parse_latency(embed_latency), "chat": parse_latency(chat_latency)}
+        self.rate_limit_rate = rate_limit_rate
+        self.error_rate = error_rate
+        self.bad_citation_rate = bad_citation_rate
+        self.rng = random.Random(seed)
+        # indexing runs with faults off so the corpus loads fast and completely
+        self.faults = False
+        self.stats: Counter = Counter()
+
+    def _fault(self, endpoint: str) -> Optional[Tuple[int, Dict[str, Any], Dict[str, str]]]:
+        if not self.faults:
+            return None
+        r = self.rng.random()
+        if r < self.rate_limit_rate:
+            self.stats[f"{endpoint}.429"] += 1
+            return 429, {"error": {"message": "Rate limit reached (stand-in)", "type": "rate_limit_error"}}, {"Retry-After": "1"}
+        if r < self.rate_limit_rate + self.error_rate:
+            self.stats[f"{endpoint}.500"] += 1
+            return 500, {"error": {"message": "Internal error (stand-in)", "type": "server_error"}}, {}
+        return None
+
+    async def _sleep(self, endpoint: str) -> None:
+        if self.faults:
+            mu, sigma = self.latency[endpoint]
+            await asyncio.sleep(self.rng.lognormvariate(mu, sigma))
+
+    def embeddings(self, req: Dict[str, Any]) -> Dict[str, Any]:
+        inp = req.get("input", "")
+        texts = [inp] if isinstance(inp, str) else [str(x) for x in inp]
+        vectors = self.embedder.embed(texts)
+        tokens = sum(len(t) // 4 + 1 for t in texts)
+        return {
+            "object": "list", "model": req.get("model", ""),
+            "data": [{"object": "embedding", "index": i, "embedding": v} for i, v in enumerate(vectors)],
+            "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+        }
+
+    def chat(self, req: Dict[str, Any]) -> Dict[str, Any]:
+        messages = req.get("messages", [])
+        system = " ".join(str(m.get("content", "")) for m in messages if m.get("role") == "system")
+        prompt = "\n".join(str(m.get("content", "")) for m in messages if m.get("role") == "user")
+        if "verify" in system.lower():
+            content = {"claim_checks": [], "issues": [], "risk_level": "low", "confidence": 0.9, "is_compliant": True}
+        else:
+            claims = []
+            for cid, text in _EXCERPT_RE.findall(prompt)[:2]:
+                if self.faults and self.rng.random() < self.bad_citation_rate:
+                    cid = cid + "-missing"
+                claims.append({"text": " ".join(text.split()[:18]), "citations": [cid]})
+            content = {"claims": claims, "assumptions": [],
+                       "final_answer": " ".join(c["text"] for c in claims) or "Insufficient context."}
+        body = json.dumps(content)
+        prompt_tokens = len(prompt) // 4 + 1
+        completion_tokens = len(body) // 4 + 1
+        return {
+            "id": f"chatcmpl-standin-{self.stats['chat'] + 1}", "object": "chat.completion",
+            "created": int(time.time()), "model": req.get("model", ""),
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": body}}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                      "total_tokens": prompt_tokens + completion_tokens},
+        }
+
+    async def handle(self, method: str, path: str, body: bytes) -> Tuple[int, Dict[str, Any], Dict[str, str]]:
+        if path == f"{STANDIN_PREFIX}/stats":
+            return 200, dict(self.stats), {}
+        if path == f"{STANDIN_PREFIX}/faults" and method == "POST":
+            self.faults = bool(json.loads(body or b"{}").get("enabled", True))
+            return 200, {"faults": self.faults}, {}
+        endpoint = "embeddings" if path.endswith("/embeddings") else "chat" if path.endswith("/chat/completions") else None
+        if method != "POST" or endpoint is None:
+            return 404, {"error": {"message": f"no route for {method} {path}"}}, {}
+        self.stats[endpoint] += 1
+        await self._sleep(endpoint)
+        fault = self._fault(endpoint)
+        if fault is not None:
+            return fault
+        req = json.loads(body or b"{}")
+        return 200, (self.embeddings(req) if endpoint == "embeddings" else self.chat(req)), {}
+
+    async def on_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        # keep-alive: the OpenAI client pools connections
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    return
+                lines = head.decode("latin-1").split("\r\n")
+                method, path, _ = lines[0].split(" ", 2)
+                headers = {k.strip().lower(): v.strip() for k, _, v in (l.partition(":") for l in lines[1:] if l)}
+                length = int(headers.get("content-length", "0") or 0)
+                body = await reader.readexactly(length) if length else b""
+                status, payload, extra = await self.handle(method, path.split("?", 1)[0], body)
+                data = json.dumps(payload).encode("utf-8")
+                out = [f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}",
+                       "Content-Type: application/json", f"Content-Length: {len(data)}"]
+                out += [f"{k}: {v}" for k, v in extra.items()]
+                writer.write(("\r\n".join(out) + "\r\n\r\n").encode("latin-1") + data)
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    return
+        finally:
+            writer.close()
+
+
+def run_standin(config: Dict[str, Any], host: str, port: int, ready=None) -> None:
+    """Child-process entry point; sends the bound port through `ready` (a Connection) once listening."""
+    async def main() -> None:
+        standin = StandIn(**config)
+        server = await asyncio.start_server(standin.on_connection, host, port, backlog=1024)
+        bound = server.sockets[0].getsockname()[1]
+        if ready is not None:
+            ready.send(bound)
+        else:
+            print(f"[StandIn] http://{host}:{bound}/v1 (faults off; POST {STANDIN_PREFIX}/faults to enable)")
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
+
+
+def _standin_call(base: str, path: str, payload: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    import httpx
+
+    url = base.rsplit("/v1", 1)[0] + STANDIN_PREFIX + path
+    resp = httpx.post(url, json=payload) if payload is not None else httpx.post(url)
+    return resp.json()
+
+
+# ---------------------------------------------------------------- driver
+
+def load_questions(path: str) -> Tuple[List[str], List[float]]:
+    """JSONL with "question" and an optional "weight" (default 1)."""
+    questions, weights = [], []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                item = json.loads(line)
+                questions.append(item["question"])
+                weights.append(float(item.get("weight", 1.0)))
+    if not questions:
+        raise ValueError(f"No questions in {path}")
+    return questions, weights
+
+
+def percentiles(values: List[float]) -> Dict[str, Optional[float]]:
+    if not values:
+        return {"count": 0, "p50": None, "p95": None, "p99": None, "max": None, "mean": None}
+    v = sorted(values)
+
+    def rank(p: float) -> float:
+        return round(v[min(len(v) - 1, max(0, math.ceil(p * len(v)) - 1))], 2)
+
+    return {"count": len(v), "p50": rank(0.50), "p95": rank(0.95), "p99": rank(0.99),
+            "max": round(v[-1], 2), "mean": round(sum(v) / len(v), 2)}
+
+
+async def drive(service, questions: List[str], weights: List[float], rate: float, duration: float,
+                batch_fraction: float, tenants: int, seed: int) -> Dict[str, Any]:
+    from serving.admission import Overloaded, Priority
+
+    rng = random.Random(seed)
+    e2e: List[float] = []
+    stage_ms: Dict[str, List[float]] = {}
+    outcomes: Counter = Counter()
+    errors: Counter = Counter()
+    executions: Dict[int, Any] = {}
+
+    async def one(question: str, tenant: str, priority) -> None:
+        started = time.perf_counter()
+        try:
+            result = await service.ask(question, tenant=tenant, priority=priority)
+        except Overloaded:
+            outcomes["shed"] += 1
+            return
+        except Exception as e:
+            outcomes["error"] += 1
+            errors[type(e).__name__] += 1
+            return
+        e2e.append((time.perf_counter() - started) * 1000.0)
+        outcomes[result.decision.status.value] += 1
+        if id(result) not in executions:  # coalesced requests share one execution's stage timings
+            executions[id(result)] = result  # held so ids are not reused
+            for name, ms in result.timings.items():
+                stage_ms.setdefault(name, []).append(ms)
+
+    tasks = []
+    started = time.perf_counter()
+    next_at = 0.0
+    while next_at < duration:
+        delay = started + next_at - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        priority = Priority.BATCH if rng.random() < batch_fraction else Priority.INTERACTIVE
+        question = rng.choices(questions, weights)[0]
+        tenant = f"tenant-{rng.randrange(max(1, tenants))}"
+        tasks.append(asyncio.ensure_future(one(question, tenant, priority)))
+        next_at += rng.expovariate(rate)
+    issued_for = time.perf_counter() - started
+    await asyncio.gather(*tasks)
+    wall = time.perf_counter() - started
+
+    done = sum(outcomes[s] for s in ("safe_to_use", "review_required", "do_not_use"))
+    total = len(tasks)
+    return {
+        "requests": total,
+        "issued_seconds": round(issued_for, 3),
+        "wall_seconds": round(wall, 3),
+        "offered_rps": round(total / issued_for, 2) if issued_for > 0 else None,
+        "throughput_rps": round(done / wall, 2) if wall > 0 else None,
+        "latency_ms": {"end_to_end": percentiles(e2e), **{k: percentiles(v) for k, v in sorted(stage_ms.items())}},
+        "outcomes": dict(outcomes),
+        "errors": dict(errors),
+        "rates": {
+            "error": round(outcomes["error"] / total, 4) if total else 0.0,
+            "shed": round(outcomes["shed"] / total, 4) if total else 0.0,
+            "block": round(outcomes["do_not_use"] / done, 4) if done else 0.0,
+            "review": round(outcomes["review_required"] / done, 4) if done else 0.0,
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rate", type=float, default=10.0, help="mean arrivals per second (Poisson)")
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds of arrivals; in-flight requests are drained")
+    parser.add_argument("--questions", default=str(ROOT / "benchmarks" / "golden" / "vacation_policy.jsonl"),
+                        help="JSONL question mix: {\"question\": ..., \"weight\": n}")
+    parser.add_argument("--batch-fraction", type=float, default=0.0, help="share of requests sent as batch priority")
+    parser.add_argument("--tenants", type=int, default=1)
+    parser.add_argument("--data-dir", default=os.environ.get("POLICY_DATA_DIR", str(ROOT / "data" / "policies")))
+    parser.add_argument("--embed-latency", default="40:120", help="median:p95 ms")
+    parser.add_argument("--chat-latency", default="800:2500", help="median:p95 ms")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.02, help="share of calls answered 429")
+    parser.add_argument("--error-rate", type=float, default=0.005, help="share of calls answered 500")
+    parser.add_argument("--bad-citation-rate", type=float, default=0.05, help="share of answer claims citing unknown ids")
+    parser.add_argument("--embed-dim", type=int, default=256)
+    parser.add_argument("--no-coalesce", action="store_true")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--out", help="write the JSON report here instead of stdout")
+    parser.add_argument("--standin-only", action="store_true", help="only run the stand-in (foreground)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=0)
+    args = parser.parse_args()
+
+    standin_config = dict(
+        embed_latency=args.embed_latency, chat_latency=args.chat_latency,
+        rate_limit_rate=args.rate_limit_rate, error_rate=args.error_rate,
+        bad_citation_rate=args.bad_citation_rate, embed_dim=args.embed_dim, seed=args.seed,
+    )
+    if args.standin_only:
+        run_standin(standin_config, args.host, args.port)
+        return
+
+    import multiprocessing
+
+    parent, child = multiprocessing.Pipe()
+    proc = multiprocessing.Process(target=run_standin, args=(standin_config, args.host, args.port, child), daemon=True)
+    proc.start()
+    base_url = f"http://{args.host}:{parent.recv()}/v1"
+
+    tmp = tempfile.TemporaryDirectory(prefix="loadgen-", ignore_cleanup_errors=True)
+    os.environ.update({
+        "OPENAI_BASE_URL": base_url,
+        "OPENAI_API_KEY": os.environ.get("OPENAI_API_KEY") or "standin",
+        "CHROMA_DIR": os.path.join(tmp.name, "index"),
+        "AUDIT_DIR": os.environ.get("LOADGEN_AUDIT_DIR", ""),
+        "SERVE_COALESCE": "0" if args.no_coalesce else os.environ.get("SERVE_COALESCE", "1"),
+    })
+    embed_model = os.environ.setdefault("EMBED_MODEL", "text-embedding-3-small")
+    try:
+        from ingestion.indexer import build_index_version
+        from serving.service import QuestionService
+
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(sys.stderr):  # keep stdout for the report
+            build_index_version(args.data_dir, os.environ["CHROMA_DIR"], embed_model)
+        index_seconds = time.perf_counter() - started
+        _standin_call(base_url, "/faults", {"enabled": True})
+
+        questions, weights = load_questions(args.questions)
+
+        async def run() -> Dict[str, Any]:
+            service = QuestionService.from_env()
+            try:
+                report = await drive(service, questions, weights, args.rate, args.duration,
+                                     args.batch_fraction, args.tenants, args.seed)
+                report["service"] = service.metrics()
+                return report
+            finally:
+                service.close()
+
+        report = asyncio.run(run())
+        report["standin"] = _standin_call(base_url, "/stats")
+        report["config"] = {
+            **standin_config, "rate": args.rate, "duration": args.duration, "questions": args.questions,
+            "distinct_questions": len(questions), "batch_fraction": args.batch_fraction, "tenants": args.tenants,
+            "coalesce": not args.no_coalesce, "index_seconds": round(index_seconds, 2),
+        }
+    finally:
+        proc.terminate()
+        proc.join(timeout=5)
+        tmp.cleanup()
+
+    text = json.dumps(report, indent=2)
+    if args.out:
+        Path(args.out).write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+    lat = report["latency_ms"]["end_to_end"]
+    print(f"[LoadGen] {report['requests']} requests, {report['throughput_rps']} rps, "
+          f"p50={lat['p50']}ms p99={lat['p99']}ms, rates={report['rates']}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
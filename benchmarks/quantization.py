@@ -0,0 +1,166 @@
+# benchmarks/quantization.py
+"""
+Recall/latency trade-off of reduced-dimension and quantized embedding storage.
+
+Ground truth is exact float32 search at full dimension. For each dimension
+the "exact" row is a brute-force float32 scan, the baseline to beat; every
+(quantization x nprobe) setting is measured for recall@k against the ground
+truth, first-pass memory, the largest fraction of rows a query scans, and
+p50/p95 query latency including exact rescoring.
+
+    python benchmarks/quantization.py --n 100000 --dim 1536 --dims 1536,512,256 --nprobe 4,8,16
+    python benchmarks/quantization.py --embeddings vectors.npy   # real vectors
+
+Synthetic vectors have a decaying per-dimension variance so truncation behaves
+roughly like text-embedding-3's shortened outputs; use real vectors for
+numbers you intend to act on.
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from retrieval.quantized import QuantizedIndex  # noqa: E402
+
+
+def synthetic_corpus(n: int, dim: int, clusters: int, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    decay = (1.0 / np.sqrt(1.0 + np.arange(dim) / 64.0)).astype(np.float32)
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32) * decay
+    assign = rng.integers(0, clusters, size=n)
+    noise = rng.standard_normal((n, dim)).astype(np.float32) * decay * 0.6
+    return centers[assign] + noise
+
+
+def make_queries(corpus: np.ndarray, n_queries: int, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed + 1)
+    picks = rng.integers(0, corpus.shape[0], size=n_queries)
+    noise = rng.standard_normal((n_queries, corpus.shape[1])).astype(np.float32)
+    return corpus[picks] + noise * corpus.std() * 0.5
+
+
+def truncate(mat: np.ndarray, dims: int) -> np.ndarray:
+    out = mat[:, :dims].astype(np.float32)
+    norms = np.linalg.norm(out, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return out / norms
+
+
+def exact_top_k(corpus: np.ndarray, queries: np.ndarray, k: int) -> List[set]:
+    c = truncate(corpus, corpus.shape[1])
+    truth = []
+    for q in truncate(queries, queries.shape[1]):
+        scores = c @ q
+        top = np.argpartition(-scores, k - 1)[:k]
+        truth.append({int(i) for i in top})
+    return truth
+
+
+def exact_setting(corpus, queries, truth, dims, k) -> Dict[str, object]:
+    """Brute-force float32 scan at `dims`: the baseline every quantized setting has to beat."""
+    c = truncate(corpus, dims)
+    latencies: List[float] = []
+    recalls: List[float] = []
+    for q, expected in zip(truncate(queries, dims), truth):
+        t0 = time.perf_counter()
+        scores = c @ q
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        latencies.append((time.perf_counter() - t0) * 1000.0)
+        recalls.append(len({int(i) for i in top} & expected) / k)
+    return summarize(dims, "exact", 0, 0, 0, recalls, latencies, c.nbytes, 1.0)
+
+
+def run_setting(corpus, queries, truth, dims, quantization, k, rescore_factor, nprobe) -> Dict[str, object]:
+    ids = [str(i) for i in range(corpus.shape[0])]
+    full = truncate(corpus, dims)
+    index = QuantizedIndex.from_embeddings(ids, full, quantization, nprobe=nprobe)
+    qs = truncate(queries, dims)
+
+    def vectors(cids: List[str]) -> np.ndarray:
+        # stands in for the vector store's get(); its cost is part of the measured latency
+        return full[[int(c) for c in cids]]
+
+    latencies: List[float] = []
+    recalls: List[float] = []
+    for q, expected in zip(qs, truth):
+        t0 = time.perf_counter()
+        ranked = index.search(q, k, vectors, rescore_factor=rescore_factor)
+        latencies.append((time.perf_counter() - t0) * 1000.0)
+        got = {int(cid) for cid, _ in ranked}
+        recalls.append(len(got & expected) / k)
+    sizes = np.diff(index.offsets)
+    probed = np.sort(sizes)[::-1][:nprobe].sum() if index.lists > 1 else len(ids)
+    return summarize(dims, quantization, index.lists, nprobe, rescore_factor, recalls, latencies,
+                     index.nbytes_first_pass(), min(1.0, probed / len(ids)))
+
+
+def summarize(dims, quantization, lists, nprobe, rescore_factor, recalls, latencies, nbytes, scanned) -> Dict[str, object]:
+    latencies = sorted(latencies)
+    return {
+        "dims": dims,
+        "quantization": quantization,
+        "lists": lists,
+        "nprobe": nprobe,
+        "rescore_factor": rescore_factor,
+        "recall_at_k": round(statistics.mean(recalls), 4),
+        "first_pass_mb": round(nbytes / 1e6, 2),
+        "max_scanned_fraction": round(float(scanned), 4),
+        "p50_ms": round(latencies[len(latencies) // 2], 3),
+        "p95_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 3),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--embeddings", help=".npy file of corpus vectors (rows) instead of synthetic data")
+    parser.add_argument("--n", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--dims", default="1536,512,256", help="comma-separated output dimensions to test")
+    parser.add_argument("--quantizations", default="float32,float16,int8")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--rescore-factor", type=int, default=4)
+    parser.add_argument("--nprobe", default="8", help="comma-separated numbers of lists to probe")
+    parser.add_argument("--clusters", type=int, default=256)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    if args.embeddings:
+        corpus = np.load(args.embeddings).astype(np.float32)
+    else:
+        corpus = synthetic_corpus(args.n, args.dim, args.clusters, args.seed)
+    queries = make_queries(corpus, args.queries, args.seed)
+    truth = exact_top_k(corpus, queries, args.k)
+
+    results = []
+    for dims in [int(d) for d in args.dims.split(",") if d]:
+        dims = min(dims, corpus.shape[1])
+        results.append(exact_setting(corpus, queries, truth, dims, args.k))
+        for quantization in [q for q in args.quantizations.split(",") if q]:
+            for nprobe in [int(p) for p in args.nprobe.split(",") if p]:
+                results.append(run_setting(corpus, queries, truth, dims, quantization, args.k,
+                                           args.rescore_factor, nprobe))
+
+    if args.json:
+        print(json.dumps({"n": corpus.shape[0], "k": args.k, "results": results}, indent=2))
+        return
+
+    print(f"corpus={corpus.shape[0]} x {corpus.shape[1]}  queries={len(queries)}  k={args.k}")
+    print(f"{'dims':>6} {'quant':>8} {'lists':>6} {'nprobe':>6} {'recall@k':>9} {'1st-pass MB':>12} "
+          f"{'scanned':>8} {'p50 ms':>8} {'p95 ms':>8}")
+    for r in results:
+        print(f"{r['dims']:>6} {r['quantization']:>8} {r['lists']:>6} {r['nprobe']:>6} {r['recall_at_k']:>9.4f} "
+              f"{r['first_pass_mb']:>12.2f} {r['max_scanned_fraction']:>8.3f} {r['p50_ms']:>8.3f} {r['p95_ms']:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+# benchmarks/retrieval_eval.py
+"""
+Retrieval quality vs latency over a golden question set.
+
+Each golden line is {"question": ..., "expected": ["policy_id:section_id", ...]}
+with section ids as produced by the default chunking (chunk_size=1400,
+overlap=80). Every configuration (embed model x chunking x top-k) is indexed
+from scratch and reports recall@k, MRR, index size on disk, ingest time and
+p50/p95 retrieval latency.
+
+Chunk ids change with chunk_size/overlap, so under other chunkings a hit
+counts for an expected citation when their character spans in the policy
+text overlap by at least half of the shorter one.
+
+    python benchmarks/retrieval_eval.py                                   # local hashed embeddings
+    python benchmarks/retrieval_eval.py --chunking 1400:80,800:80,400:40 --top-k 3,5,8
+    python benchmarks/retrieval_eval.py --models hash-512,text-embedding-3-small   # needs OPENAI_API_KEY
+
+Models named hash-<dim> use a deterministic feature-hashing embedder, so CI
+runs need no network and produce identical numbers each time. Treat their
+absolute recall as a floor; compare configurations relative to each other.
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+from ingestion.chunking import TextChunk, chunk_text  # noqa: E402
+from ingestion.loader import load_policies  # noqa: E402
+
+REFERENCE_CHUNKING = (1400, 80)
+MIN_SPAN_OVERLAP = 0.5
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+class HashingEmbedder:
+    """Signed feature hashing of unigrams and bigrams, log-scaled and L2-normalised."""
+
+    def __init__(self, dim: int):
+        self.dim = dim
+
+    def _bucket(self, feature: str) -> Tuple[int, float]:
+        h = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+        return h % self.dim, (1.0 if (h >> 63) & 1 else -1.0)
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            tokens = _TOKEN_RE.findall(text.lower())
+            counts: Dict[str, int] = {}
+            for f in tokens + [a + " " + b for a, b in zip(tokens, tokens[1:])]:
+                counts[f] = counts.get(f, 0) + 1
+            for f, n in counts.items():
+                col, sign = self._bucket(f)
+                out[row, col] += sign * (1.0 + np.log(n))
+            norm = np.linalg.norm(out[row])
+            if norm > 0:
+                out[row] /= norm
+        return out.tolist()
+
+
+def make_embedder(model: str) -> Callable[[List[str]], List[List[float]]]:
+    if model.startswith("hash-"):
+        return HashingEmbedder(int(model.split("-", 1)[1])).embed
+
+    from ingestion.embedder import embed_texts
+
+    return lambda texts: embed_texts(texts, model)
+
+
+def load_golden(path: str) -> List[Dict[str, Any]]:
+    items = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                items.append(json.loads(line))
+    if not items:
+        raise ValueError(f"Golden set is empty: {path}")
+    return items
+
+
+def chunk_corpus(docs, chunk_size: int, overlap: int) -> Tuple[List[TextChunk], Dict[str, Tuple[str, int, int]]]:
+    """Chunks every doc and locates each chunk in its policy text: id -> (policy_id, start, end)."""
+    chunks: List[TextChunk] = []
+    spans: Dict[str, Tuple[str, int, int]] = {}
+    for doc in docs:
+        doc_chunks = chunk_text(doc.policy_id, doc.text, doc.metadata, chunk_size=chunk_size, overlap=overlap)
+        cursor = 0
+        for c in doc_chunks:
+            pos = doc.text.find(c.text, cursor)
+            if pos < 0:
+                pos = doc.text.find(c.text)
+            if pos >= 0:
+                spans[f"{c.policy_id}:{c.section_id}"] = (c.policy_id, pos, pos + len(c.text))
+                cursor = pos + 1
+        chunks.extend(doc_chunks)
+    return chunks, spans
+
+
+def _covers(hit: Optional[Tuple[str, int, int]], want: Optional[Tuple[str, int, int]]) -> bool:
+    if hit is None or want is None or hit[0] != want[0]:
+        return False
+    overlap = min(hit[2], want[2]) - max(hit[1], want[1])
+    return overlap > 0 and overlap >= MIN_SPAN_OVERLAP * min(hit[2] - hit[1], want[2] - want[1])
+
+
+def score(hit_ids: List[str], expected: List[str], spans, ref_spans, same_chunking: bool) -> Tuple[float, float]:
+    """Returns (recall, reciprocal rank) for one question."""
+    covered: Set[str] = set()
+    first_rank = 0
+    for rank, hid in enumerate(hit_ids, start=1):
+        hits = {e for e in expected if (hid == e if same_chunking else _covers(spans.get(hid), ref_spans.get(e)))}
+        if hits and not first_rank:
+            first_rank = rank
+        covered |= hits
+    return len(covered) / len(expected), (1.0 / first_rank if first_rank else 0.0)
+
+
+def _dir_bytes(path: str) -> int:
+    return sum(p.stat().st_size for p in Path(path).rglob("*") if p.is_file())
+
+
+def _pct(values: List[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+def run_config(docs, golden, model, chunk_size, overlap, top_ks, ref_spans, repeat) -> List[Dict[str, Any]]:
+    from retrieval.retriever import _query
+    from retrieval.store import build_or_load_chroma
+
+    embed = make_embedder(model)
+    results = []
+    with tempfile.TemporaryDirectory(prefix="retrieval-eval-") as tmp:
+        started = time.perf_counter()
+        chunks, spans = chunk_corpus(docs, chunk_size, overlap)
+        embeddings = embed([c.text for c in chunks])
+        collection = build_or_load_chroma(tmp)
+        collection.upsert(
+            ids=[f"{c.policy_id}:{c.section_id}" for c in chunks],
+            documents=[c.text for c in chunks],
+            metadatas=[c.metadata for c in chunks],
+            embeddings=embeddings,
+        )
+        ingest_s = time.perf_counter() - started
+        size = _dir_bytes(tmp)
+        same_chunking = (chunk_size, overlap) == REFERENCE_CHUNKING
+
+        for k in top_ks:
+            recalls, rrs, total_ms, search_ms = [], [], [], []
+            for item in golden:
+                for _ in range(repeat):
+                    t0 = time.perf_counter()
+                    q_emb = embed([item["question"]])[0]
+                    t1 = time.perf_counter()
+                    res = _query(collection, q_emb, min(k, len(chunks)))
+                    t2 = time.perf_counter()
+                    total_ms.append((t2 - t0) * 1000.0)
+                    search_ms.append((t2 - t1) * 1000.0)
+                recall, rr = score(res["ids"][0], item["expected"], spans, ref_spans, same_chunking)
+                recalls.append(recall)
+                rrs.append(rr)
+            results.append({
+                "model": model,
+                "chunk_size": chunk_size,
+                "overlap": overlap,
+                "top_k": k,
+                "chunks": len(chunks),
+                "recall_at_k": round(statistics.mean(recalls), 4),
+                "mrr": round(statistics.mean(rrs), 4),
+                "index_mb": round(size / 1e6, 3),
+                "ingest_s": round(ingest_s, 3),
+                "p50_ms": round(_pct(total_ms, 0.50), 3),
+                "p95_ms": round(_pct(total_ms, 0.95), 3),
+                "search_p50_ms": round(_pct(search_ms, 0.50), 3),
+                "search_p95_ms": round(_pct(search_ms, 0.95), 3),
+            })
+    return results
+
+
+def _pairs(spec: str) -> List[Tuple[int, int]]:
+    out = []
+    for part in spec.split(","):
+        if part:
+            size, _, overlap = part.partition(":")
+            out.append((int(size), int(overlap or 0)))
+    return out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--golden", default=str(ROOT / "benchmarks" / "golden" / "vacation_policy.jsonl"))
+    parser.add_argument("--data-dir", default=os.environ.get("POLICY_DATA_DIR", str(ROOT / "data" / "policies")))
+    parser.add_argument("--models", default="hash-512", help="comma-separated; hash-<dim> is local and deterministic")
+    parser.add_argument("--chunking", default="1400:80,800:80,400:40", help="comma-separated chunk_size:overlap")
+    parser.add_argument("--top-k", default="3,5,8")
+    parser.add_argument("--repeat", type=int, default=5, help="timed queries per question")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    golden = load_golden(args.golden)
+    docs = load_policies(args.data_dir)
+    _, ref_spans = chunk_corpus(docs, *REFERENCE_CHUNKING)
+    missing = sorted({e for item in golden for e in item["expected"]} - set(ref_spans))
+    if missing:
+        raise ValueError(f"Golden citations not found under the reference chunking: {missing}")
+
+    top_ks = [int(k) for k in args.top_k.split(",") if k]
+    import chromadb  # noqa: F401  keep the one-off import cost out of the first ingest time
+
+    results = []
+    for model in [m for m in args.models.split(",") if m]:
+        for chunk_size, overlap in _pairs(args.chunking):
+            results.extend(run_config(docs, golden, model, chunk_size, overlap, top_ks, ref_spans, args.repeat))
+
+    if args.json:
+        print(json.dumps({"questions": len(golden), "golden": args.golden, "results": results}, indent=2))
+        return
+
+    print(f"questions={len(golden)}  docs={len(docs)}")
+    print(f"{'model':>24} {'chunk':>10} {'k':>3} {'chunks':>7} {'recall@k':>9} {'MRR':>7} {'index MB':>9} "
+          f"{'ingest s':>9} {'p50 ms':>8} {'p95 ms':>8}")
+    for r in results:
+        print(f"{r['model']:>24} {str(r['chunk_size']) + ':' + str(r['overlap']):>10} {r['top_k']:>3} {r['chunks']:>7} "
+              f"{r['recall_at_k']:>9.4f} {r['mrr']:>7.4f} {r['index_mb']:>9.3f} {r['ingest_s']:>9.3f} "
+              f"{r['p50_ms']:>8.3f} {r['p95_ms']:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,2 +1,15 @@
-from .answer_agent import *
-from .policy_agent import *
\ No newline at end of file
+# Submodules import openai; see lazy_exports.
+from lazy_exports import lazy_exports
+
+__getattr__, __dir__, __all__ = lazy_exports(__name__, {
+    "ANSWER_PROMPT": ".answer_agent",
+    "AnswerAgent": ".answer_agent",
+    "parse_proposal": ".answer_agent",
+    "VERIFY_PROMPT": ".policy_agent",
+    "PolicyAgent": ".policy_agent",
+    "parse_assessment": ".policy_agent",
+    "ModelRouter": ".routing",
+    "RouteDecision": ".routing",
+    "StageStats": ".routing",
+    "stage_model": ".routing",
+})
@@ -1,10 +1,9 @@
-import os
 import json
 from dataclasses import dataclass
-from typing import List
-
-from openai import OpenAI
+from typing import Any, Dict, List, Optional
 
+from agents.routing import StageStats, stage_model
+from llm.client import AsyncRateLimitedClient, RateLimitedClient, get_async_client, get_client
 from models.types import AnswerProposal
 
 ANSWER_PROMPT = """You are the Answer Agent for enterprise policy Q&A.
@@ -28,6 +27,7 @@ Rules (non-negotiable):
 12) Prefer refusing or returning 'insufficient context' instead of making A3 assumptions 
 13) if there is not assumption return [].
 14) Don't include ["policy-id:section-id", "..."] in the final answer. 
+15) Cite excerpt IDs exactly as shown in brackets, including any span suffix such as "#s2".
 Return ONLY valid JSON in this exact schema:
 {
   "claims": [
@@ -50,22 +50,20 @@ Policy excerpts:
 
 @dataclass
 class AnswerAgent:
-  client: OpenAI
+  client: RateLimitedClient
   model: str
+  async_client: Optional[AsyncRateLimitedClient] = None
+  stats: Optional[StageStats] = None
 
   @classmethod
   def from_env(cls) -> "AnswerAgent":
-    api_key = os.environ.get("OPENAI_API_KEY", "")
-    if not api_key:
-      raise RuntimeError("OPENAI_API_KEY is missing.")
-    model = os.environ.get("MODEL_ID","gpt-4.1-mini")
-    return cls(client=OpenAI(api_key=api_key),model=model)
+    model = stage_model("answer")
+    return cls(client=get_client(),model=model)
 
-  def run(self, question: str, context_lines: List[str]) -> AnswerProposal:
+  def _request(self, question: str, context_lines: List[str]) -> Dict[str, Any]:
     context = "\n".join(context_lines)
     prompt = ANSWER_PROMPT.replace("{{question}}", question).replace("{{context}}", context)
-
-    resp = self.client.chat.completions.create(
+    return dict(
       model = self.model,
       messages = [
         {"role":"system","content":"You answer policy questions using ONLY provided excerpts."},
@@ -74,24 +72,22 @@ class AnswerAgent:
       response_format = {"type":"json_object"},
     )
 
-    raw = resp.choices[0].message.content or {}
-    data = json.loads(raw)
+  def run(self, question: str, context_lines: List[str]) -> AnswerProposal:
+    resp = self.client.chat.completions.create(**self._request(question, context_lines))
+    if self.stats is not None:
+      self.stats.add(resp)
+    data = json.loads(resp.choices[0].message.content or "{}")
+    return parse_proposal(data)
+
+  async def arun(self, question: str, context_lines: List[str]) -> AnswerProposal:
+    client = self.async_client or get_async_client()
+    resp = await client.chat.completions.create(**self._request(question, context_lines))
+    if self.stats is not None:
+      self.stats.add(resp)
+    data = json.loads(resp.choices[0].message.content or "{}")
+    return parse_proposal(data)
+
 
-    print(data)
-    
-    #defensive parsing
-    claims = data.get("claims", [])
-    assumptions = data.get("assumptions", [])
-    final_answer = str(data.get("final_answer","")).strip()
-    
-    if not isinstance(claims, list):
-      claims=[]
-   
-    if not isinstance(assumptions, list):
-      assumptions = []
-    
-    return AnswerProposal(
-      claims=claims,
-      assumptions=assumptions,
-      final_answer = final_answer
-    )
\ No newline at end of file
+def parse_proposal(data: Dict[str, Any]) -> AnswerProposal:
+  # defensive parsing, once: later stages read typed records
+  return AnswerProposal.from_dict(data)
\ No newline at end of file
@@ -1,10 +1,12 @@
+import asyncio
 import os
 import json
 from dataclasses import dataclass
-from typing import List, Dict, Any
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
 
-from openai import OpenAI
-from models.types import PolicyAssessment, RiskLevel
+from agents.routing import StageStats, stage_model
+from llm.client import AsyncRateLimitedClient, RateLimitedClient, get_async_client, get_client
+from models.types import Claim, PolicyAssessment, RiskLevel
 
 VERIFY_PROMPT = """You are the Policy Verification Agent for enterprise policy Q&A.
 
@@ -54,22 +56,37 @@ Claims (with citations):
 """
 
 
+RISK_ORDER = ["low", "medium", "high", "critical"]
+
+# claim_checks issue for claims not sent to the verifier because a hard gate already failed them
+SKIPPED_ISSUE = "HARD_GATE_FAILED"
+
+
 @dataclass
 class PolicyAgent:
-    client: OpenAI
+    client: RateLimitedClient
     model: str
+    async_client: Optional[AsyncRateLimitedClient] = None
+    # 0 verifies all claims in one request; n > 0 sends n claims per request,
+    # each with only the excerpts they cite, up to max_concurrency at a time
+    claims_per_request: int = 0
+    max_concurrency: int = 4
+    # per-request usage sink; the pipeline sets it on a copy of the agent
+    stats: Optional[StageStats] = None
 
     @classmethod
     def from_env(cls) -> "PolicyAgent":
-        api_key = os.environ.get("OPENAI_API_KEY", "")
-        if not api_key:
-            raise RuntimeError("OPENAI API KEY is missing.")
-        model = os.environ.get("MODEL_ID", "gpt-4.1-mini")
-        return cls(client=OpenAI(api_key=api_key), model=model)
+        model = stage_model("verify")
+        return cls(
+            client=get_client(),
+            model=model,
+            claims_per_request=int(os.environ.get("VERIFY_CLAIMS_PER_REQUEST", "0")),
+            max_concurrency=int(os.environ.get("VERIFY_MAX_CONCURRENCY", "4")),
+        )
 
-    def run(self, question: str, context_lines: List[str], claims: List[Dict[str, Any]]) -> PolicyAssessment:
+    def _request(self, question: str, context_lines: List[str], claims: List[Claim]) -> Dict[str, Any]:
         context = "\n".join(context_lines)
-        claims_json = json.dumps(claims, ensure_ascii=False)
+        claims_json = json.dumps([c.to_dict() for c in claims], ensure_ascii=False)
 
         prompt = (
             VERIFY_PROMPT
@@ -78,7 +95,7 @@ class PolicyAgent:
             .replace("{{claims}}", claims_json)
         )
 
-        resp = self.client.chat.completions.create(
+        return dict(
             model=self.model,
             messages=[
                 {"role": "system", "content": "You verify claims against policy excerpts and enforce strict grounding."},
@@ -87,43 +104,172 @@ class PolicyAgent:
             response_format={"type": "json_object"},
         )
 
-        raw = resp.choices[0].message.content or "{}"
-        data = json.loads(raw)
-
-        issues = data.get("issues", [])
-        risk_level = data.get("risk_level", "medium")
-        confidence = float(data.get("confidence", 0.0))
-        is_compliant = bool(data.get("is_compliant", False))
-
-        if not isinstance(issues, list):
-            issues = []
-
-        # Enforce claim_checks
-        claim_checks = data.get("claim_checks", [])
-        if isinstance(claim_checks, list) and claim_checks:
-            for cc in claim_checks:
-                supported = cc.get("supported", True)
-                cc_issues = cc.get("issues", []) or []
-                if supported is False:
-                    is_compliant = False
-                    if cc_issues:
-                        issues.extend([str(x) for x in cc_issues])
-                    else:
-                        issues.append("UNSUPPORTED_CLAIM")
-
-        # Normalize risk level
-        risk_level = risk_level if risk_level in {"low", "medium", "high", "critical"} else "medium"
-
-        # Confidence sanity
-        if issues and confidence >= 0.85:
-            confidence = 0.84
-        if not is_compliant and confidence > 0.8:
-            confidence = 0.8
-        confidence = max(0.0, min(1.0, confidence))
-
-        return PolicyAssessment(
-            issues=[str(i) for i in issues],
-            risk_level=RiskLevel(risk_level),
-            confidence=confidence,
-            is_compliant=is_compliant,
-        )
\ No newline at end of file
+    def _record(self, resp: Any) -> None:
+        if self.stats is not None:
+            self.stats.add(resp)
+
+    def run(self, question: str, context_lines: List[str], claims: List[Claim]) -> PolicyAssessment:
+        resp = self.client.chat.completions.create(**self._request(question, context_lines, claims))
+        self._record(resp)
+        return parse_assessment(json.loads(resp.choices[0].message.content or "{}"))
+
+    async def arun(self, question: str, context_lines: List[str], claims: List[Claim]) -> PolicyAssessment:
+        client = self.async_client or get_async_client()
+        resp = await client.chat.completions.create(**self._request(question, context_lines, claims))
+        self._record(resp)
+        return parse_assessment(json.loads(resp.choices[0].message.content or "{}"))
+
+    def _shards(
+        self, claims: List[Claim], retrieved_map: Dict[str, str], skip: Iterable[int]
+    ) -> List[Tuple[List[int], List[str], List[Claim]]]:
+        """Groups the claims to verify: (global claim indices, cited excerpt lines, claims)."""
+        skip = set(skip)
+        todo = [i for i in range(len(claims)) if i not in skip]
+        size = max(1, self.claims_per_request)
+        shards = []
+        for start in range(0, len(todo), size):
+            indices = todo[start:start + size]
+            shard_claims = [claims[i] for i in indices]
+            shards.append((indices, cited_context_lines(shard_claims, retrieved_map), shard_claims))
+        return shards
+
+    def run_claims(
+        self, question: str, claims: List[Claim], retrieved_map: Dict[str, str], skip: Iterable[int] = ()
+    ) -> PolicyAssessment:
+        """
+        Verifies claims in small groups, each with only its cited excerpts,
+        skipping claims in `skip` (already failed by hard gates). The per-group
+        verdicts are merged and then held to the same rules as a single call.
+        """
+        skip = sorted(set(skip))
+        shards = self._shards(claims, retrieved_map, skip)
+
+        def verify(shard):
+            indices, lines, shard_claims = shard
+            resp = self.client.chat.completions.create(**self._request(question, lines, shard_claims))
+            self._record(resp)
+            return indices, json.loads(resp.choices[0].message.content or "{}")
+
+        if len(shards) <= 1 or self.max_concurrency <= 1:
+            results = [verify(sh) for sh in shards]
+        else:
+            from concurrent.futures import ThreadPoolExecutor
+
+            with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(shards))) as pool:
+                results = list(pool.map(verify, shards))
+        return parse_assessment(merge_claim_results(results, skip))
+
+    async def arun_claims(
+        self, question: str, claims: List[Claim], retrieved_map: Dict[str, str], skip: Iterable[int] = ()
+    ) -> PolicyAssessment:
+        client = self.async_client or get_async_client()
+        skip = sorted(set(skip))
+        gate = asyncio.Semaphore(max(1, self.max_concurrency))
+
+        async def verify(shard):
+            indices, lines, shard_claims = shard
+            async with gate:
+                resp = await client.chat.completions.create(**self._request(question, lines, shard_claims))
+            self._record(resp)
+            return indices, json.loads(resp.choices[0].message.content or "{}")
+
+        results = await asyncio.gather(*(verify(sh) for sh in self._shards(claims, retrieved_map, skip)))
+        return parse_assessment(merge_claim_results(results, skip))
+
+
+def cited_context_lines(claims: List[Claim], retrieved_map: Dict[str, str]) -> List[str]:
+    """Excerpt lines for the retrieved IDs the claims cite, in first-cited order."""
+    lines = []
+    seen = set()
+    for c in claims:
+        for cid in c.citations:
+            if cid in retrieved_map and cid not in seen:
+                seen.add(cid)
+                lines.append(f"[{cid}] {' '.join((retrieved_map[cid] or '').split())}")
+    return lines
+
+
+def merge_claim_results(results: Sequence[Tuple[List[int], Dict[str, Any]]], skipped: Iterable[int] = ()) -> Dict[str, Any]:
+    """
+    Combines per-group verifier outputs into one response-shaped dict:
+    claim_index is mapped back to the full claim list (checks whose index is
+    outside the group are dropped), issues are unioned,
+    the highest risk and lowest confidence win, and every group must be compliant.
+    Skipped claims count as unsupported.
+    """
+    claim_checks: List[Dict[str, Any]] = []
+    issues: List[str] = []
+    risks: List[str] = []
+    confidences: List[float] = []
+    compliant = True
+
+    for indices, data in results:
+        for cc in data.get("claim_checks", []) or []:
+            if not isinstance(cc, dict):
+                continue
+            local = cc.get("claim_index")
+            if not isinstance(local, int) or isinstance(local, bool) or not 0 <= local < len(indices):
+                continue  # names no claim this group was asked about; never let it land on another group's claim
+            claim_checks.append({**cc, "claim_index": indices[local]})
+        group_issues = data.get("issues", [])
+        if isinstance(group_issues, list):
+            issues.extend(str(x) for x in group_issues if str(x) not in issues)
+        risk = data.get("risk_level", "medium")
+        risks.append(risk if risk in RISK_ORDER else "medium")
+        try:
+            confidences.append(float(data.get("confidence", 0.0)))
+        except (TypeError, ValueError):
+            confidences.append(0.0)
+        compliant = compliant and bool(data.get("is_compliant", False))
+
+    for i in skipped:
+        claim_checks.append({"claim_index": i, "supported": False, "issues": [SKIPPED_ISSUE]})
+
+    claim_checks.sort(key=lambda cc: cc["claim_index"])
+    return {
+        "claim_checks": claim_checks,
+        "issues": issues,
+        "risk_level": max(risks, key=RISK_ORDER.index) if risks else "high",
+        "confidence": min(confidences) if confidences else 0.0,
+        "is_compliant": compliant and bool(results),
+    }
+
+
+def parse_assessment(data: Dict[str, Any]) -> PolicyAssessment:
+    issues = data.get("issues", [])
+    risk_level = data.get("risk_level", "medium")
+    confidence = float(data.get("confidence", 0.0))
+    is_compliant = bool(data.get("is_compliant", False))
+
+    if not isinstance(issues, list):
+        issues = []
+
+    # Enforce claim_checks
+    claim_checks = data.get("claim_checks", [])
+    if isinstance(claim_checks, list) and claim_checks:
+        for cc in claim_checks:
+            supported = cc.get("supported", True)
+            cc_issues = cc.get("issues", []) or []
+            if supported is False:
+                is_compliant = False
+                if cc_issues:
+                    issues.extend([str(x) for x in cc_issues])
+                else:
+                    issues.append("UNSUPPORTED_CLAIM")
+
+    # Normalize risk level
+    risk_level = risk_level if risk_level in {"low", "medium", "high", "critical"} else "medium"
+
+    # Confidence sanity
+    if issues and confidence >= 0.85:
+        confidence = 0.84
+    if not is_compliant and confidence > 0.8:
+        confidence = 0.8
+    confidence = max(0.0, min(1.0, confidence))
+
+    return PolicyAssessment(
+        issues=[str(i) for i in issues],
+        risk_level=RiskLevel(risk_level),
+        confidence=confidence,
+        is_compliant=is_compliant,
+    )
\ No newline at end of file
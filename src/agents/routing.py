@@ -0,0 +1,129 @@
+# src/agents/routing.py
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+DEFAULT_MODEL = "gpt-4.1-mini"
+
+TIER_FAST = "fast"
+TIER_STRONG = "strong"
+
+
+def stage_model(stage: str) -> str:
+    """Model for a pipeline stage: <STAGE>_MODEL_ID, falling back to MODEL_ID."""
+    return (
+        os.environ.get(f"{stage.upper()}_MODEL_ID")
+        or os.environ.get("MODEL_ID")
+        or DEFAULT_MODEL
+    )
+
+
+def parse_prices(spec: str) -> Dict[str, Tuple[float, float]]:
+    """
+    MODEL_PRICES format: "gpt-4.1-mini=0.4/1.6,gpt-4.1-nano=0.1/0.4",
+    USD per million input/output tokens. Malformed entries are ignored.
+    """
+    prices: Dict[str, Tuple[float, float]] = {}
+    for part in (spec or "").split(","):
+        name, _, rates = part.strip().partition("=")
+        inp, _, out = rates.partition("/")
+        try:
+            prices[name.strip()] = (float(inp), float(out or inp))
+        except ValueError:
+            continue
+    return prices
+
+
+@dataclass(slots=True)
+class StageStats:
+    """Token usage of one stage of one request; agents add to it after every call."""
+    model: str = ""
+    calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def add(self, resp: Any) -> None:
+        usage = getattr(resp, "usage", None)
+        with self._lock:  # sharded verification reports from worker threads
+            self.calls += 1
+            self.prompt_tokens += int(getattr(usage, "prompt_tokens", 0) or 0)
+            self.completion_tokens += int(getattr(usage, "completion_tokens", 0) or 0)
+
+
+@dataclass(slots=True)
+class RouteDecision:
+    stage: str
+    model: str
+    tier: str
+    reason: str
+    # the model the stage would have used without routing; savings are measured against it
+    baseline_model: str
+    latency_ms: float = 0.0
+    calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cost_usd: Optional[float] = None
+    saved_usd: Optional[float] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "stage": self.stage, "model": self.model, "tier": self.tier, "reason": self.reason,
+            "baseline_model": self.baseline_model, "latency_ms": round(self.latency_ms, 1),
+            "calls": self.calls, "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "cost_usd": self.cost_usd, "saved_usd": self.saved_usd,
+        }
+
+
+@dataclass
+class ModelRouter:
+    """
+    Picks the verifier model per request from the deterministic checks.
+    Claims that pass every gate cleanly go to fast_model; precheck warnings
+    escalate to the verifier's own (strong) model. Hard gate failures block
+    the answer whatever the verifier says, so they stay on fast_model too.
+    With no fast_model configured every request uses the strong model.
+    """
+    fast_model: Optional[str] = None
+    prices: Dict[str, Tuple[float, float]] = field(default_factory=dict)
+
+    @classmethod
+    def from_env(cls) -> "ModelRouter":
+        return cls(
+            fast_model=os.environ.get("VERIFY_FAST_MODEL_ID") or None,
+            prices=parse_prices(os.environ.get("MODEL_PRICES", "")),
+        )
+
+    def enabled(self, strong_model: str) -> bool:
+        return bool(self.fast_model) and self.fast_model != strong_model
+
+    def route(self, strong_model: str, precheck_issues: List[str], hard_issues: List[str]) -> RouteDecision:
+        if not self.enabled(strong_model):
+            model, tier, reason = strong_model, TIER_STRONG, "routing_disabled"
+        elif hard_issues:
+            model, tier, reason = self.fast_model, TIER_FAST, f"hard_gate_block:{len(hard_issues)}"
+        elif precheck_issues:
+            model, tier, reason = strong_model, TIER_STRONG, f"precheck_warnings:{len(precheck_issues)}"
+        else:
+            model, tier, reason = self.fast_model, TIER_FAST, "gates_clean"
+        return RouteDecision(stage="verify", model=model, tier=tier, reason=reason, baseline_model=strong_model)
+
+    def cost(self, model: str, prompt_tokens: int, completion_tokens: int) -> Optional[float]:
+        rates = self.prices.get(model)
+        if rates is None:
+            return None
+        return (prompt_tokens * rates[0] + completion_tokens * rates[1]) / 1_000_000
+
+    def settle(self, decision: RouteDecision, stats: StageStats, seconds: float) -> RouteDecision:
+        """Fills in latency and usage; savings price the same tokens at the baseline model."""
+        decision.latency_ms = seconds * 1000.0
+        decision.calls = stats.calls
+        decision.prompt_tokens = stats.prompt_tokens
+        decision.completion_tokens = stats.completion_tokens
+        decision.cost_usd = self.cost(decision.model, stats.prompt_tokens, stats.completion_tokens)
+        baseline = self.cost(decision.baseline_model, stats.prompt_tokens, stats.completion_tokens)
+        if decision.cost_usd is not None and baseline is not None:
+            decision.saved_usd = baseline - decision.cost_usd
+        return decision
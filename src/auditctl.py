@@ -0,0 +1,114 @@
+# src/auditctl.py
+"""
+Decision audit queries.
+
+  python src/auditctl.py query [--since ISO] [--until ISO] [--question TEXT | --question-hash H]
+                               [--policy-id ID] [--decision STATUS] [--count]
+  python src/auditctl.py segments     list sealed segments from the index
+  python src/auditctl.py replay [FILE ...] [--since ISO] [--until ISO] [--workers N] [--json]
+                               re-run the control layer over recorded decisions
+                               (default input: every segment in AUDIT_DIR)
+
+Records are printed one JSON object per line.
+"""
+import argparse
+import json
+import os
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from dotenv import load_dotenv
+
+from governance.logger import AuditStore
+
+load_dotenv()
+
+
+def _ts(value: Optional[str]) -> Optional[float]:
+    if value is None:
+        return None
+    return datetime.fromisoformat(value).timestamp()
+
+
+def _store() -> AuditStore:
+    return AuditStore(os.environ.get("AUDIT_DIR") or "audit", read_only=True)
+
+
+def cmd_query(args: argparse.Namespace) -> None:
+    store = _store()
+    matches = store.query(
+        start=_ts(args.since),
+        end=_ts(args.until),
+        question=args.question,
+        question_hash_=args.question_hash,
+        policy_id=args.policy_id,
+        decision=args.decision,
+    )
+    if args.count:
+        print(sum(1 for _ in matches))
+    else:
+        for r in matches:
+            sys.stdout.write(json.dumps(r, ensure_ascii=False) + "\n")
+
+
+def cmd_segments(args: argparse.Namespace) -> None:
+    for s in _store().segments():
+        span = " .. ".join(datetime.fromtimestamp(t).isoformat(timespec="seconds") for t in (s["ts_min"], s["ts_max"]))
+        print(f"{s['segment']}  {s['count']:>7} records  {span}  {s['decisions']}")
+
+
+def cmd_replay(args: argparse.Namespace) -> None:
+    from governance.replay import format_report, replay
+
+    paths = [Path(p) for p in args.files] or _store().files()
+    report = replay(
+        paths,
+        workers=args.workers,
+        batch_size=args.batch_size,
+        start=_ts(args.since),
+        end=_ts(args.until),
+        max_samples=args.samples,
+    )
+    print(json.dumps(report.to_dict(), indent=2) if args.json else format_report(report))
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Decision audit queries.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("query", help="print audit records matching all given filters")
+    p.add_argument("--since", help="ISO date/time, inclusive")
+    p.add_argument("--until", help="ISO date/time, exclusive")
+    g = p.add_mutually_exclusive_group()
+    g.add_argument("--question", help="exact question (whitespace and case are normalised)")
+    g.add_argument("--question-hash")
+    p.add_argument("--policy-id")
+    p.add_argument("--decision", choices=["safe_to_use", "review_required", "do_not_use"])
+    p.add_argument("--count", action="store_true", help="print only the number of matches")
+    p.set_defaults(func=cmd_query)
+
+    p = sub.add_parser("segments", help="list sealed segments")
+    p.set_defaults(func=cmd_segments)
+
+    p = sub.add_parser("replay", help="re-run the deterministic control layer over recorded decisions")
+    p.add_argument("files", nargs="*", help="audit JSONL files (.gz ok); default: every segment in AUDIT_DIR")
+    p.add_argument("--since", help="ISO date/time, inclusive")
+    p.add_argument("--until", help="ISO date/time, exclusive")
+    p.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count, 0: in-process)")
+    p.add_argument("--batch-size", type=int, default=500, help="records per worker task")
+    p.add_argument("--samples", type=int, default=20, help="changed records to list")
+    p.add_argument("--json", action="store_true", help="print the report as JSON")
+    p.set_defaults(func=cmd_replay)
+
+    return parser
+
+
+def main() -> None:
+    args = build_parser().parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,4 +2,5 @@ from .grounding_checks import *
 from .evaluator import *
 from .hard_gates import *
 from .assumption_gate import *
-from .assumption_detector import *
\ No newline at end of file
+from .assumption_detector import *
+from .rule_packs import *
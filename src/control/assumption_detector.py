@@ -1,25 +1,45 @@
 # src/control/assumption_detector.py
-from typing import List, Dict, Any
+from typing import Iterable, List, Optional, Set
 
-def detect_assumptions(question: str, claims: List[Dict[str, Any]], context_lines: List[str]) -> List[Dict[str, Any]]:
+from control.rule_packs import RuleSet, default_rules
+from models.types import Assumption, Chunk, Claim, EvidenceSpan
+
+
+def context_flags(
+    hits: Iterable[Chunk],
+    rules: Optional[RuleSet] = None,
+    evidence: Optional[Iterable[EvidenceSpan]] = None,
+) -> Set[str]:
     """
-    Deterministically add assumptions that are logically required but often omitted.
+    Union of the rule-pack flags of the context the models were shown: the
+    retrieved chunks (flags precomputed at ingest), or, when evidence spans
+    were selected, only those spans, so a flag from a sentence that was cut
+    from the prompt does not count as context.
     """
-    ctx = "\n".join(context_lines).lower()
-    assumptions: List[Dict[str, Any]] = []
-
-    # A1_SCOPE: if policy mentions exclusions/applicability and answer gives entitlement rules,
-    # assume subject is eligible.
-    scope_triggers = ["applies to", "this policy applies", "exception", "with the exception", "does not apply", "excluded"]
-    entitlement_triggers = ["entitlement", "vacation", "days per", "pro-rated", "prorated", "carry-over"]
+    rules = rules or default_rules()
+    flags: Set[str] = set()
+    if evidence:
+        for sp in evidence:
+            flags |= rules.text_flags(sp.text)
+        return flags
+    for h in hits:
+        flags |= rules.chunk_flags(h.text, h.metadata)
+    return flags
 
-    if any(t in ctx for t in scope_triggers) and any(
-        any(et in (c.get("text","").lower()) for et in entitlement_triggers) for c in claims
-    ):
-        assumptions.append({
-            "type": "A1_SCOPE",
-            "impact": "low",
-            "text": "The employee is eligible under this policy (i.e., not in an excluded category listed in the policy scope/applicability section)."
-        })
 
-    return assumptions
\ No newline at end of file
+def detect_assumptions(
+    question: str,
+    claims: List[Claim],
+    context_lines: List[str],
+    flags: Optional[Set[str]] = None,
+    rules: Optional[RuleSet] = None,
+) -> List[Assumption]:
+    """
+    Deterministically add assumptions that are logically required but often omitted.
+    Rules come from the rule packs (control.rule_packs). `flags` are the chunk
+    flags of the retrieved context; without them the context lines are scanned.
+    """
+    rules = rules or default_rules()
+    if flags is None:
+        flags = rules.text_flags("\n".join(context_lines))
+    return rules.detect([c.text for c in claims], flags)
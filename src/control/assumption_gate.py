@@ -1,6 +1,8 @@
-from typing import List, Dict, Any, Tuple
+from typing import List, Tuple
 
-def classify_assumptions(assumptions: List[Dict[str,Any]]) -> Tuple[str,float,list[str]]:
+from models.types import Assumption, AssumptionType
+
+def classify_assumptions(assumptions: List[Assumption]) -> Tuple[str,float,list[str]]:
     """
     Returns: (status_override, confidence_cap, issues)
     status_override: "BLOCK"|"REVIEW"|""  ("" means no override)
@@ -11,17 +13,17 @@ def classify_assumptions(assumptions: List[Dict[str,Any]]) -> Tuple[str,float,li
     if not assumptions:
         return "", 1.0, issues
     
-    types = {a.get("type") for a in assumptions if isinstance(a, dict)}
+    types = {a.type for a in assumptions}
 
-    if "A3_MISSING_CONTEXT" in types:
+    if AssumptionType.A3_MISSING_CONTEXT.value in types:
         issues.append("ASSUMPTION_A3_MISSING_CONTEXT")
         return "BLOCK", 0.7, issues
 
-    if "A2_INTERPRETATION" in types:
+    if AssumptionType.A2_INTERPRETATION.value in types:
         issues.append("ASSUMPTION_A2_INTERPRETATION")
         return "REVIEW", 0.8, issues
     
-    if "A1_SCOPE" in types:
+    if AssumptionType.A1_SCOPE.value in types:
         issues.append("ASSUMPTION_A1_SCOPE")
         return "", 0.85, issues
 
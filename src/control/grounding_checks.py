@@ -1,6 +1,8 @@
 # src/control/grounding_checks.py
 import re
-from typing import List, Dict, Any
+from typing import List
+
+from models.types import Claim
 
 STOPWORDS = {"the", "a", "an", "and", "or", "to", "of", "in", "on", "for", "is", "are", "by", "with"}
 
@@ -8,8 +10,8 @@ def keyword_set(text: str) -> set[str]:
     words = re.findall(r"[a-zA-Z]{4,}", text.lower())
     return {w for w in words if w not in STOPWORDS}
 
-def citations_in_retrieved(claim: Dict[str, Any], retrieved_ids: set[str]) -> List[str]:
-    bad = [c for c in claim.get("citations", []) if c not in retrieved_ids]
+def citations_in_retrieved(claim: Claim, retrieved_ids: set[str]) -> List[str]:
+    bad = [c for c in claim.citations if c not in retrieved_ids]
     return bad
 
 def citation_relevance_heuristic(claim_text: str, cited_texts: List[str], min_overlap: int = 2) -> bool:
@@ -1,6 +1,8 @@
 # src/control/hard_gates.py
 import re
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Tuple
+
+from models.types import Claim
 
 
 def extract_numbers(text: str) -> List[str]:
@@ -78,10 +80,10 @@ def breadth_gate(claim_text: str) -> tuple[bool, str]:
         return False, "CLAIM_TOO_BROAD"
     return True, ""
 
-def run_hard_gates(claim: Dict[str, Any], retrieved_map: Dict[str, str]) -> List[str]:
+def run_hard_gates(claim: Claim, retrieved_map: Dict[str, str]) -> List[str]:
     issues: List[str] = []
 
-    citations = claim.get("citations") or []
+    citations = claim.citations
     if not citations:
         issues.append("MISSING_CITATIONS")
         return issues
@@ -92,12 +94,12 @@ def run_hard_gates(claim: Dict[str, Any], retrieved_map: Dict[str, str]) -> List
         return issues
 
     # Gate 0: any numbers in claim must exist in cited text
-    ok, msg = must_contain_any_numbers_gate(claim.get("text", ""), cited_texts)
+    ok, msg = must_contain_any_numbers_gate(claim.text, cited_texts)
     if not ok:
         issues.append(msg)
 
     # Gate 1: numeric-heavy claims (3+ numbers) must be fully supported
-    ok, msg = must_contain_numbers_gate(claim.get("text", ""), cited_texts)
+    ok, msg = must_contain_numbers_gate(claim.text, cited_texts)
     if not ok:
         issues.append(msg)
 
@@ -112,12 +114,12 @@ def run_hard_gates(claim: Dict[str, Any], retrieved_map: Dict[str, str]) -> List
         "appendix a", "vacation schedule",
         "calendar year", "january 1", "december 31"
     ]
-    ok, msg = must_contain_phrases_gate(claim.get("text", ""), cited_texts, phrases)
+    ok, msg = must_contain_phrases_gate(claim.text, cited_texts, phrases)
     if not ok:
         issues.append(msg)
 
     # Gate 3: validate claim BROAD
-    ok, msg = breadth_gate(claim.get("text", ""))
+    ok, msg = breadth_gate(claim.text)
     if not ok:
         issues.append(msg)
 
@@ -0,0 +1,170 @@
+# src/control/rule_packs.py
+import hashlib
+import json
+import os
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from models.types import Assumption, Impact
+
+# A rule pack is a JSON file:
+#   "flags": {flag name: [trigger phrases]}   matched against chunk text at ingest
+#   "rules": [{"id", "context_flags": [...], "claim_triggers": [...],
+#              "type", "impact", "text"}]
+# A rule fires when any of its context_flags is set on a retrieved chunk (or it
+# lists none) and any claim contains one of its claim_triggers (or it lists none).
+DEFAULT_PACKS_DIR = Path(__file__).resolve().parents[1] / "config" / "rule_packs"
+
+FLAGS_KEY = "flags"
+FLAGS_REV_KEY = "flags_rev"
+
+
+class PhraseMatcher:
+    """
+    Case-insensitive substring matcher for many phrases at once: one compiled
+    alternation scanned at every offset, longest phrase first. A match also
+    reports the shorter phrases it starts with, so overlapping phrases that
+    share a start position are not lost.
+    """
+
+    def __init__(self, phrases: Dict[str, Iterable[str]]):
+        labels: Dict[str, Set[str]] = {}
+        for phrase, names in phrases.items():
+            p = phrase.strip().lower()
+            if p:
+                labels.setdefault(p, set()).update(names)
+        ordered = sorted(labels, key=len, reverse=True)
+        self._labels: Dict[str, FrozenSet[str]] = {
+            p: frozenset().union(*(labels[q] for q in ordered if p.startswith(q))) for p in ordered
+        }
+        self._rx = re.compile("(?=(" + "|".join(map(re.escape, ordered)) + "))") if ordered else None
+
+    def labels(self, text: str) -> Set[str]:
+        found: Set[str] = set()
+        if self._rx is None or not text:
+            return found
+        for m in self._rx.finditer(text.lower()):
+            found |= self._labels[m.group(1)]
+        return found
+
+
+@dataclass(frozen=True)
+class AssumptionRule:
+    id: str
+    context_flags: FrozenSet[str]
+    claim_triggers: Tuple[str, ...]
+    assumption: Assumption
+
+
+class RuleSet:
+    """All loaded packs, compiled: one matcher for chunk flags, one for claim triggers."""
+
+    def __init__(self, flags: Dict[str, List[str]], rules: List[AssumptionRule], fingerprint: str):
+        self.rules = rules
+        self.fingerprint = fingerprint
+        phrase_flags: Dict[str, Set[str]] = {}
+        for name, phrases in flags.items():
+            for p in phrases:
+                phrase_flags.setdefault(p, set()).add(name)
+        self.flag_matcher = PhraseMatcher(phrase_flags)
+        claim_rules: Dict[str, Set[str]] = {}
+        for r in rules:
+            for p in r.claim_triggers:
+                claim_rules.setdefault(p, set()).add(r.id)
+        self.claim_matcher = PhraseMatcher(claim_rules)
+
+    def text_flags(self, text: str) -> Set[str]:
+        return self.flag_matcher.labels(text)
+
+    def chunk_flags(self, text: str, metadata: Optional[dict]) -> Set[str]:
+        """Flags stored at ingest; recomputed for chunks indexed without them or under other packs."""
+        md = metadata or {}
+        stored = md.get(FLAGS_KEY)
+        if isinstance(stored, str) and md.get(FLAGS_REV_KEY) == self.fingerprint:
+            return decode_flags(stored)
+        return self.text_flags(text)
+
+    def ingest_metadata(self, text: str) -> Dict[str, str]:
+        return {FLAGS_KEY: encode_flags(self.text_flags(text)), FLAGS_REV_KEY: self.fingerprint}
+
+    def detect(self, claim_texts: List[str], context_flags: Set[str]) -> List[Assumption]:
+        matched: Set[str] = set()
+        for t in claim_texts:
+            matched |= self.claim_matcher.labels(t)
+        out = []
+        for r in self.rules:
+            if r.context_flags and not (r.context_flags & context_flags):
+                continue
+            if r.claim_triggers and r.id not in matched:
+                continue
+            a = r.assumption
+            out.append(Assumption(type=a.type, text=a.text, impact=a.impact))
+        return out
+
+
+def encode_flags(flags: Iterable[str]) -> str:
+    # chroma metadata values must be scalars
+    return ",".join(sorted(flags))
+
+
+def decode_flags(encoded: str) -> Set[str]:
+    return {f for f in encoded.split(",") if f}
+
+
+def pack_paths(spec: Optional[str] = None) -> List[Path]:
+    """ASSUMPTION_RULE_PACKS: os.pathsep-separated JSON files or directories; default config/rule_packs."""
+    spec = os.environ.get("ASSUMPTION_RULE_PACKS", "") if spec is None else spec
+    roots = [Path(p) for p in spec.split(os.pathsep) if p] or [DEFAULT_PACKS_DIR]
+    paths: List[Path] = []
+    for root in roots:
+        paths.extend(sorted(root.glob("*.json")) if root.is_dir() else [root])
+    return paths
+
+
+def compile_packs(packs: List[dict]) -> RuleSet:
+    flags: Dict[str, List[str]] = {}
+    rules: List[AssumptionRule] = []
+    for pack in packs:
+        name = str(pack.get("name", ""))
+        for flag, phrases in (pack.get("flags") or {}).items():
+            flags.setdefault(flag, []).extend(str(p) for p in phrases)
+        for i, raw in enumerate(pack.get("rules") or []):
+            assumption = Assumption.from_dict(raw)
+            if (
+                assumption is None or not assumption.text
+                or not assumption.known_type
+                or str(raw.get("impact", "")).lower() not in {x.value for x in Impact}
+            ):
+                raise ValueError(f"rule pack {name!r}: rule {i} needs a known type, an impact and text")
+            unknown = set(raw.get("context_flags") or []) - set(flags)
+            if unknown:
+                raise ValueError(f"rule pack {name!r}: rule {i} uses undefined flags {sorted(unknown)}")
+            rules.append(AssumptionRule(
+                id=str(raw.get("id") or f"{name}.{i}"),
+                context_flags=frozenset(raw.get("context_flags") or []),
+                claim_triggers=tuple(str(t) for t in raw.get("claim_triggers") or []),
+                assumption=assumption,
+            ))
+    digest = hashlib.sha256(json.dumps(packs, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+    return RuleSet(flags, rules, digest)
+
+
+def load_rule_packs(paths: Iterable[Path]) -> RuleSet:
+    packs = []
+    for p in paths:
+        with open(p, "r", encoding="utf-8") as f:
+            packs.append(json.load(f))
+    return compile_packs(packs)
+
+
+@lru_cache(maxsize=None)
+def _cached_rules(spec: str) -> RuleSet:
+    return load_rule_packs(pack_paths(spec))
+
+
+def default_rules() -> RuleSet:
+    """Packs named by ASSUMPTION_RULE_PACKS, compiled once per process."""
+    return _cached_rules(os.environ.get("ASSUMPTION_RULE_PACKS", ""))
@@ -0,0 +1,508 @@
+# src/governance/logger.py
+"""
+Append-only decision audit store.
+
+  AUDIT_DIR/active-<seq>.jsonl       segment being written (fsync'd per batch)
+  AUDIT_DIR/seg-<seq>.jsonl.gz       sealed, compressed segment
+  AUDIT_DIR/seg-<seq>.idx.json       question hashes in that segment
+  AUDIT_DIR/index.jsonl              one summary line per sealed segment:
+                                     time range, count, decisions, policy ids
+
+Requests only enqueue a record; a background thread writes, fsyncs and
+rotates, so request latency never includes disk I/O. A segment is sealed
+when it reaches AUDIT_SEGMENT_MAX_BYTES or AUDIT_SEGMENT_MAX_SECONDS.
+Queries read index.jsonl first and only decompress segments whose summary
+can match. Several processes may share AUDIT_DIR: each writes its own active
+segment and holds an exclusive lock on it. An unlocked active segment (its
+writer exited or crashed) is adopted by the next store that opens, or sealed
+if it is already due, so short CLI runs do not each leave a tiny segment.
+"""
+import atexit
+import gzip
+import hashlib
+import json
+import os
+import queue
+import re
+import shutil
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional
+
+from models import codec
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process segment locking
+    fcntl = None
+
+if TYPE_CHECKING:
+    from pipeline import QuestionResult
+
+INDEX_FILE = "index.jsonl"
+_ACTIVE_RE = re.compile(r"^active-(\d+)\.jsonl$")
+_SEALED_RE = re.compile(r"^seg-(\d+)\.jsonl\.gz$")
+_STOP = object()
+
+
+def question_hash(question: str) -> str:
+    """Stable key for a question: sha256 of its whitespace/case-normalised form."""
+    norm = " ".join((question or "").split()).lower()
+    return hashlib.sha256(norm.encode("utf-8")).hexdigest()
+
+
+def audit_record(result: "QuestionResult", **extra: Any) -> Dict[str, Any]:
+    """Everything compliance needs to reconstruct a decision, as one JSON-ready dict."""
+    proposal = result.proposal
+    policy_ids = sorted({h.policy_id for h in result.hits} | {c.split(":", 1)[0] for cl in proposal.claims for c in cl.citations})
+    record = {
+        "id": uuid.uuid4().hex,
+        "ts": time.time(),
+        "question": result.question,
+        "question_hash": question_hash(result.question),
+        "retrieved_ids": [h.id for h in result.hits],
+        "evidence_ids": [sp.id for sp in result.evidence],
+        "policy_ids": policy_ids,
+        "claims": [c.to_dict() for c in proposal.claims],
+        "assumptions": [a.to_dict() for a in proposal.assumptions],
+        "final_answer": proposal.final_answer,
+        "precheck_issues": list(result.precheck_issues),
+        "hard_issues": list(result.hard_issues),
+        "assumption_issues": list(result.assumption_issues),
+        "override": result.override,
+        "assessment": result.assessment.to_dict(),
+        "decision": result.decision.status.value,
+        "reasons": list(result.decision.reasons),
+        "routing": [r.to_dict() for r in result.routing],
+    }
+    if result.verifier_assessment is not None:
+        # what the deterministic control layer saw, so gate changes can be replayed (governance.replay)
+        # in models.codec form; replay workers unpack it without field names
+        record["inputs"] = {
+            "chunks": codec.pack_many(result.hits),
+            "evidence": codec.pack_many(result.evidence),
+            "assumptions": codec.pack_many(result.proposed_assumptions),
+            "assessment": codec.pack(result.verifier_assessment),
+        }
+    record.update(extra)
+    return record
+
+
+def _try_lock(f) -> bool:
+    if fcntl is None:
+        return True
+    try:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return True
+    except OSError:
+        return False
+
+
+class _Segment:
+    def __init__(self, path: Path, seq: int, f, opened: float, size: int):
+        self.path = path
+        self.seq = seq
+        self.f = f
+        self.opened = opened
+        self.bytes = size
+
+    @classmethod
+    def create(cls, root: Path) -> "_Segment":
+        # claim the next free sequence number; O_EXCL makes this safe across processes
+        while True:
+            seq = _next_seq(root)
+            path = root / f"active-{seq:08d}.jsonl"
+            try:
+                fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY | os.O_APPEND, 0o644)
+                break
+            except FileExistsError:
+                continue
+        f = os.fdopen(fd, "a", encoding="utf-8")
+        _try_lock(f)
+        return cls(path, seq, f, time.time(), 0)
+
+
+def _next_seq(root: Path) -> int:
+    seqs = [int(m.group(1)) for p in root.iterdir()
+            for m in [_ACTIVE_RE.match(p.name) or _SEALED_RE.match(p.name)] if m]
+    return max(seqs, default=0) + 1
+
+
+def _summarise(records: List[Dict[str, Any]]) -> Dict[str, Any]:
+    decisions: Dict[str, int] = {}
+    policies = set()
+    for r in records:
+        decisions[r.get("decision", "")] = decisions.get(r.get("decision", ""), 0) + 1
+        policies.update(r.get("policy_ids", []))
+    ts = [r["ts"] for r in records if "ts" in r]
+    return {
+        "count": len(records),
+        "ts_min": min(ts) if ts else None,
+        "ts_max": max(ts) if ts else None,
+        "decisions": decisions,
+        "policy_ids": sorted(policies),
+    }
+
+
+def _read_jsonl(lines) -> List[Dict[str, Any]]:
+    out = []
+    for line in lines:
+        try:
+            out.append(json.loads(line))
+        except ValueError:
+            break  # torn tail from a crash
+    return out
+
+
+def _fsync_dir(path: Path) -> None:
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return  # directories cannot be opened on Windows
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _fsync_write(path: Path, text: str) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+class AuditStore:
+    def __init__(
+        self,
+        root: str,
+        segment_max_bytes: int = 64 << 20,
+        segment_max_seconds: float = 3600.0,
+        flush_interval: float = 0.2,
+        queue_size: int = 10000,
+        read_only: bool = False,
+    ):
+        self.root = Path(root)
+        self._closed = read_only
+        if read_only:
+            return  # query() only: no writer thread, no recovery, nothing touched on disk
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.segment_max_bytes = segment_max_bytes
+        self.segment_max_seconds = segment_max_seconds
+        self.flush_interval = flush_interval
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=queue_size)
+        self._seal_lock = threading.Lock()
+        self._segment: Optional[_Segment] = self._recover()
+        self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    @classmethod
+    def from_env(cls) -> Optional["AuditStore"]:
+        """None when AUDIT_DIR is set to an empty string."""
+        root = os.environ.get("AUDIT_DIR", "audit")
+        if not root:
+            return None
+        return cls(
+            root,
+            segment_max_bytes=int(os.environ.get("AUDIT_SEGMENT_MAX_BYTES", str(64 << 20))),
+            segment_max_seconds=float(os.environ.get("AUDIT_SEGMENT_MAX_SECONDS", "3600")),
+        )
+
+    # writing
+
+    def append(self, record: Dict[str, Any]) -> None:
+        """Queues a record; blocks only if the writer is queue_size records behind."""
+        if self._closed:
+            raise RuntimeError("AuditStore is closed")
+        self._queue.put(record)
+
+    def record(self, result: "QuestionResult", **extra: Any) -> Dict[str, Any]:
+        rec = audit_record(result, **extra)
+        self.append(rec)
+        return rec
+
+    def flush(self, timeout: Optional[float] = None) -> None:
+        """Waits until everything queued so far is on disk. A closed store has nothing pending."""
+        if self._closed:
+            return
+        done = threading.Event()
+        self._queue.put(done)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not done.wait(self.flush_interval):
+            if not self._thread.is_alive():
+                return  # closed concurrently; the writer drained what it had before stopping
+            if deadline is not None and time.monotonic() >= deadline:
+                return
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join()
+
+    def _run(self) -> None:
+        while True:
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                self._maybe_rotate()
+                continue
+            batch, waiters, stop = [], [], False
+            while True:
+                if item is _STOP:
+                    stop = True
+                elif isinstance(item, threading.Event):
+                    waiters.append(item)
+                else:
+                    batch.append(item)
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            if batch:
+                self._write(batch)
+            self._maybe_rotate()
+            for w in waiters:
+                w.set()
+            if stop:
+                if self._segment is not None:
+                    # left unsealed and unlocked; the next store adopts or seals it
+                    self._segment.f.close()
+                    self._segment = None
+                return
+
+    def _write(self, batch: List[Dict[str, Any]]) -> None:
+        if self._segment is None:
+            self._segment = _Segment.create(self.root)
+        seg = self._segment
+        data = "".join(json.dumps(r, ensure_ascii=False, separators=(",", ":")) + "\n" for r in batch)
+        seg.f.write(data)
+        seg.f.flush()
+        os.fsync(seg.f.fileno())
+        seg.bytes += len(data.encode("utf-8"))
+
+    def _due(self, seg: _Segment) -> bool:
+        return seg.bytes >= self.segment_max_bytes or time.time() - seg.opened >= self.segment_max_seconds
+
+    def _maybe_rotate(self) -> None:
+        seg = self._segment
+        if seg is not None and self._due(seg):
+            self._seal(seg)
+            self._segment = None
+
+    def _seal(self, seg: _Segment) -> None:
+        # the flock is held until the active file is gone, so no other process can adopt it mid-seal
+        try:
+            self._seal_path(seg.path, seg.seq)
+        finally:
+            seg.f.close()
+
+    def _seal_path(self, active: Path, seq: int) -> None:
+        """
+        Order matters for crash safety: the .gz and .idx are made durable, the
+        active file is removed, and only then is the summary published. A crash
+        before the unlink leaves the active file to be sealed again; a crash
+        after it leaves a .gz without a summary, which _publish_missing adds.
+        """
+        with self._seal_lock:
+            with open(active, encoding="utf-8") as f:
+                records = _read_jsonl(f)
+            if not records:
+                active.unlink(missing_ok=True)
+                return
+            gz = self.root / f"seg-{seq:08d}.jsonl.gz"
+            tmp = gz.with_name(gz.name + ".tmp")
+            with open(active, "rb") as src, gzip.open(tmp, "wb", compresslevel=6) as dst:
+                shutil.copyfileobj(src, dst)
+            with open(tmp, "rb") as f:
+                os.fsync(f.fileno())
+            os.replace(tmp, gz)
+
+            hashes = sorted({r.get("question_hash", "") for r in records})
+            _fsync_write(self.root / f"seg-{seq:08d}.idx.json", json.dumps({"question_hashes": hashes}))
+            active.unlink()
+            _fsync_dir(self.root)
+            self._publish(seq, gz.name, records)
+
+    def _publish(self, seq: int, segment: str, records: List[Dict[str, Any]]) -> None:
+        """Appends the segment's summary to the index; a stale summary for the same seq is replaced."""
+        summary = {"seq": seq, "segment": segment, **_summarise(records)}
+        summaries = self._summaries()
+        if any(s["seq"] == seq for s in summaries):
+            kept = [s for s in summaries if s["seq"] != seq] + [summary]
+            kept.sort(key=lambda s: s["seq"])
+            _fsync_write(self.root / INDEX_FILE, "".join(json.dumps(s) + "\n" for s in kept))
+            return
+        with open(self.root / INDEX_FILE, "a", encoding="utf-8") as f:
+            f.write(json.dumps(summary) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _publish_missing(self) -> None:
+        """Summaries for sealed segments whose writer died between unlink and publish."""
+        seen = {s["seq"] for s in self._summaries()}
+        for p in sorted(self.root.iterdir()):
+            m = _SEALED_RE.match(p.name)
+            if not m or int(m.group(1)) in seen:
+                continue
+            seq = int(m.group(1))
+            if (self.root / f"active-{seq:08d}.jsonl").exists():
+                continue  # not finished sealing; _recover seals it again
+            with self._seal_lock, gzip.open(p, "rt", encoding="utf-8") as f:
+                self._publish(seq, p.name, _read_jsonl(f))
+
+    def _recover(self) -> Optional[_Segment]:
+        """Seals due orphaned segments; returns the newest one that can keep taking writes."""
+        adopted = None
+        for p in sorted(self.root.iterdir()):
+            m = _ACTIVE_RE.match(p.name)
+            if not m:
+                continue
+            try:
+                f = open(p, "r+", encoding="utf-8")
+            except FileNotFoundError:
+                continue
+            if not _try_lock(f):
+                f.close()  # a live writer owns it
+                continue
+            try:
+                same = os.fstat(f.fileno()).st_ino == os.stat(p).st_ino
+            except FileNotFoundError:
+                same = False
+            if not same:
+                f.close()  # sealed and removed between listing and locking
+                continue
+            records = _read_jsonl(f)
+            # drop a torn tail so appended lines start on a fresh line
+            valid = self._valid_prefix(p)
+            if valid != p.stat().st_size:
+                f.truncate(valid)
+            opened = min((r["ts"] for r in records if "ts" in r), default=time.time())
+            seq = int(m.group(1))
+            seg = _Segment(p, seq, f, opened, p.stat().st_size)
+            if (self.root / f"seg-{seq:08d}.jsonl.gz").exists():
+                self._seal(seg)  # crashed mid-seal: finish it rather than append to it
+                continue
+            if adopted is not None:
+                self._seal(adopted)
+            adopted = seg
+            if self._due(seg):
+                self._seal(seg)
+                adopted = None
+        self._publish_missing()
+        if adopted is not None:
+            adopted.f.seek(0, os.SEEK_END)
+        return adopted
+
+    @staticmethod
+    def _valid_prefix(path: Path) -> int:
+        """Byte length of the leading run of complete, parseable lines."""
+        n = 0
+        with open(path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    json.loads(line)
+                except ValueError:
+                    break
+                n += len(line)
+        return n
+
+    # reading
+
+    def segments(self) -> List[Dict[str, Any]]:
+        """Summaries of sealed segments, oldest first."""
+        return self._summaries()
+
+    def _summaries(self) -> List[Dict[str, Any]]:
+        path = self.root / INDEX_FILE
+        if not path.exists():
+            return []
+        with open(path, encoding="utf-8") as f:
+            return _read_jsonl(f)
+
+    def files(self) -> List[Path]:
+        """Segment files in write order: sealed segments, then active ones not yet sealed."""
+        if not self.root.exists():
+            return []
+        summaries = self._summaries()
+        seen = {s["seq"] for s in summaries}
+        active = sorted(int(m.group(1)) for p in self.root.iterdir() for m in [_ACTIVE_RE.match(p.name)] if m)
+        return [self.root / s["segment"] for s in summaries] + [
+            self.root / f"active-{seq:08d}.jsonl" for seq in active if seq not in seen
+        ]
+
+    def query(
+        self,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        question: Optional[str] = None,
+        question_hash_: Optional[str] = None,
+        policy_id: Optional[str] = None,
+        decision: Optional[str] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Yields matching records in write order. Sealed segments are skipped
+        using the index unless their time range, policy ids, decisions and
+        question hashes can match; the active segment is scanned directly.
+        """
+        qh = question_hash_ or (question_hash(question) if question is not None else None)
+
+        def match(r: Dict[str, Any]) -> bool:
+            ts = r.get("ts", 0)
+            return (
+                (start is None or ts >= start)
+                and (end is None or ts < end)
+                and (qh is None or r.get("question_hash") == qh)
+                and (policy_id is None or policy_id in r.get("policy_ids", []))
+                and (decision is None or r.get("decision") == decision)
+            )
+
+        def candidate(s: Dict[str, Any]) -> bool:
+            if s["ts_max"] is not None and start is not None and s["ts_max"] < start:
+                return False
+            if s["ts_min"] is not None and end is not None and s["ts_min"] >= end:
+                return False
+            if policy_id is not None and policy_id not in s["policy_ids"]:
+                return False
+            if decision is not None and not s["decisions"].get(decision):
+                return False
+            if qh is not None:
+                try:
+                    idx = json.loads((self.root / f"seg-{s['seq']:08d}.idx.json").read_text(encoding="utf-8"))
+                except FileNotFoundError:
+                    return True
+                return qh in set(idx["question_hashes"])
+            return True
+
+        def scan_sealed(s: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+            with gzip.open(self.root / s["segment"], "rt", encoding="utf-8") as f:
+                yield from (r for r in _read_jsonl(f) if match(r))
+
+        if not self.root.exists():
+            return
+        active = sorted(int(m.group(1)) for p in self.root.iterdir() for m in [_ACTIVE_RE.match(p.name)] if m)
+        summaries = self._summaries()
+        seen = {s["seq"] for s in summaries}
+        for s in summaries:
+            if candidate(s):
+                yield from scan_sealed(s)
+
+        for seq in active:
+            if seq in seen:
+                continue
+            try:
+                with open(self.root / f"active-{seq:08d}.jsonl", encoding="utf-8") as f:
+                    records = _read_jsonl(f)
+            except FileNotFoundError:
+                # sealed after we read the index; its summary may not be published yet
+                yield from scan_sealed({"segment": f"seg-{seq:08d}.jsonl.gz"})
+                continue
+            yield from (r for r in records if match(r))
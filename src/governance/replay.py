@@ -0,0 +1,242 @@
+# src/governance/replay.py
+"""
+Gate regression replay.
+
+Re-runs the deterministic control layer (claim checks, assumption detection
+and gate, hard gates, evaluate) over recorded audit records and reports how
+decisions would change under the current code. No LLM is called: the
+proposal and verifier assessment come from the record's "inputs" block,
+which audit_record writes for every pipeline result in models.codec form
+(bare rows in records audited before that are still read).
+
+Input files are audit segments or any JSONL (optionally gzipped) of audit
+records. The parent process only reads raw lines; parsing and replay run
+in worker processes, a batch of lines per task.
+"""
+import gzip
+import json
+import os
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from control.assumption_detector import context_flags
+from models import codec
+from models.types import AnswerProposal, Assumption, Chunk, Claim, EvidenceSpan, PolicyAssessment
+from pipeline import build_context_lines, check_claims, decide, evidence_context, retrieved_text_map
+
+DEFAULT_BATCH_SIZE = 500
+
+
+def _codes(reasons: Iterable[str]) -> Counter:
+    """Reason codes without the claim prefix ("CLAIM_3:NO_CITATIONS" -> "NO_CITATIONS")."""
+    out: Counter = Counter()
+    for r in reasons:
+        head, sep, rest = str(r).partition(":")
+        out[rest if sep and head.startswith("CLAIM_") else str(r)] += 1
+    return out
+
+
+def _is_packed(value: Any) -> bool:
+    # codec form is ["<tag>", row(s)]; records audited before it hold bare rows, whose first item is a list
+    return isinstance(value, list) and len(value) == 2 and isinstance(value[0], str)
+
+
+def _unpack_many(value: Any, cls: type) -> list:
+    if not value:
+        return []
+    return codec.unpack_many(value) if _is_packed(value) else [cls.from_row(r) for r in value]
+
+
+def replay_record(record: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Decision under the current control layer, or None when the record has no replay inputs."""
+    inputs = record.get("inputs")
+    if not isinstance(inputs, dict):
+        return None
+    question = record.get("question", "")
+    hits = _unpack_many(inputs.get("chunks"), Chunk)
+    evidence = _unpack_many(inputs.get("evidence"), EvidenceSpan)
+    if evidence:
+        lines, text_map = evidence_context(evidence)
+    else:
+        lines, text_map = build_context_lines(hits), retrieved_text_map(hits)
+
+    proposal = AnswerProposal(
+        claims=[c for c in map(Claim.from_dict, record.get("claims", [])) if c is not None],
+        assumptions=_unpack_many(inputs.get("assumptions"), Assumption),
+        final_answer=record.get("final_answer", ""),
+    )
+    packed = inputs["assessment"]
+    assessment = codec.unpack(packed) if _is_packed(packed) else PolicyAssessment.from_row(packed)
+
+    _, hard_issues, _ = check_claims(proposal.claims, text_map)
+    decision, _, _ = decide(question, lines, proposal, assessment, hard_issues, context_flags(hits, evidence=evidence))
+    return {"decision": decision.status.value, "reasons": list(decision.reasons)}
+
+
+@dataclass
+class ReplayReport:
+    records: int = 0
+    replayed: int = 0
+    skipped: int = 0        # no replay inputs (recorded before they were audited) or filtered out
+    errors: int = 0
+    changed: int = 0        # decision status differs
+    reasons_changed: int = 0  # same status, different reasons
+    transitions: Counter = field(default_factory=Counter)   # "old -> new" over every replayed record
+    reasons_added: Counter = field(default_factory=Counter)
+    reasons_removed: Counter = field(default_factory=Counter)
+    samples: List[Dict[str, Any]] = field(default_factory=list)
+    error_samples: List[str] = field(default_factory=list)
+    seconds: float = 0.0
+    workers: int = 0
+
+    def merge(self, other: "ReplayReport", max_samples: int) -> None:
+        for name in ("records", "replayed", "skipped", "errors", "changed", "reasons_changed"):
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+        self.transitions.update(other.transitions)
+        self.reasons_added.update(other.reasons_added)
+        self.reasons_removed.update(other.reasons_removed)
+        self.samples.extend(other.samples[: max(0, max_samples - len(self.samples))])
+        self.error_samples.extend(other.error_samples[: max(0, max_samples - len(self.error_samples))])
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "records": self.records, "replayed": self.replayed, "skipped": self.skipped, "errors": self.errors,
+            "changed": self.changed, "reasons_changed": self.reasons_changed,
+            "transitions": dict(self.transitions.most_common()),
+            "reasons_added": dict(self.reasons_added.most_common()),
+            "reasons_removed": dict(self.reasons_removed.most_common()),
+            "samples": self.samples, "error_samples": self.error_samples,
+            "seconds": round(self.seconds, 3), "workers": self.workers,
+            "records_per_second": round(self.records / self.seconds, 1) if self.seconds > 0 else None,
+        }
+
+
+def replay_lines(lines: List[str], start: Optional[float] = None, end: Optional[float] = None,
+                 max_samples: int = 20) -> ReplayReport:
+    """Replays one batch of raw JSONL lines (the unit of work handed to a worker)."""
+    report = ReplayReport()
+    for line in lines:
+        if not line.strip():
+            continue
+        report.records += 1
+        try:
+            record = json.loads(line)
+            ts = record.get("ts", 0)
+            if (start is not None and ts < start) or (end is not None and ts >= end):
+                report.skipped += 1
+                continue
+            new = replay_record(record)
+        except Exception as e:  # a bad record must not sink the batch
+            report.errors += 1
+            if len(report.error_samples) < max_samples:
+                report.error_samples.append(f"{type(e).__name__}: {e}")
+            continue
+        if new is None:
+            report.skipped += 1
+            continue
+
+        report.replayed += 1
+        old_status = record.get("decision", "")
+        report.transitions[f"{old_status} -> {new['decision']}"] += 1
+        old_codes, new_codes = _codes(record.get("reasons", [])), _codes(new["reasons"])
+        if old_status != new["decision"]:
+            report.changed += 1
+        elif old_codes != new_codes:
+            report.reasons_changed += 1
+        else:
+            continue
+        report.reasons_added.update(new_codes - old_codes)
+        report.reasons_removed.update(old_codes - new_codes)
+        if len(report.samples) < max_samples:
+            report.samples.append({
+                "id": record.get("id"), "question": record.get("question"),
+                "old": old_status, "new": new["decision"],
+                "old_reasons": record.get("reasons", []), "new_reasons": new["reasons"],
+            })
+    return report
+
+
+def iter_lines(paths: Iterable[Path]) -> Iterator[str]:
+    for p in paths:
+        opener = gzip.open if str(p).endswith(".gz") else open
+        try:
+            with opener(p, "rt", encoding="utf-8") as f:
+                yield from f
+        except FileNotFoundError:
+            continue  # an active segment sealed while we were listing
+
+
+def _batches(lines: Iterator[str], size: int) -> Iterator[List[str]]:
+    batch: List[str] = []
+    for line in lines:
+        batch.append(line)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def replay(
+    paths: Iterable[Path],
+    workers: Optional[int] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    max_samples: int = 20,
+) -> ReplayReport:
+    """
+    Replays every record in `paths` across `workers` processes (default: one
+    per CPU; 0 replays in this process). At most two batches per worker are
+    in flight, so memory stays flat however large the input is.
+    """
+    workers = (os.cpu_count() or 1) if workers is None else workers
+    report = ReplayReport(workers=workers)
+    started = time.perf_counter()
+    batches = _batches(iter_lines(paths), max(1, batch_size))
+
+    if workers <= 0:
+        for batch in batches:
+            report.merge(replay_lines(batch, start, end, max_samples), max_samples)
+    else:
+        from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = set()
+            for batch in batches:
+                pending.add(pool.submit(replay_lines, batch, start, end, max_samples))
+                if len(pending) >= 2 * workers:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for fut in done:
+                        report.merge(fut.result(), max_samples)
+            for fut in pending:
+                report.merge(fut.result(), max_samples)
+
+    report.seconds = time.perf_counter() - started
+    return report
+
+
+def format_report(report: ReplayReport) -> str:
+    d = report.to_dict()
+    out = [
+        f"records={d['records']} replayed={d['replayed']} skipped={d['skipped']} errors={d['errors']}",
+        f"decision changed={d['changed']} reasons changed={d['reasons_changed']}",
+        f"{d['seconds']:.2f}s with {d['workers']} workers, {d['records_per_second'] or 0:.0f} records/s",
+        "",
+        "Transitions (recorded -> replayed):",
+    ]
+    out += [f"  {n:>8}  {t}" for t, n in d["transitions"].items()]
+    for title, key in (("Reasons added:", "reasons_added"), ("Reasons removed:", "reasons_removed")):
+        if d[key]:
+            out += ["", title] + [f"  {n:>8}  {code}" for code, n in d[key].items()]
+    if d["samples"]:
+        out += ["", "Changed records:"]
+        for s in d["samples"]:
+            out.append(f"  {s['id']}  {s['old']} -> {s['new']}  {s['question']!r}")
+            out.append(f"      reasons: {s['old_reasons']} -> {s['new_reasons']}")
+    if d["error_samples"]:
+        out += ["", "Errors:"] + [f"  {e}" for e in d["error_samples"]]
+    return "\n".join(out)
@@ -0,0 +1,181 @@
+# src/indexctl.py
+"""
+Index maintenance commands.
+
+  python src/indexctl.py export <snapshot_dir>   snapshot the current index
+  python src/indexctl.py import <snapshot_dir>   load a snapshot as a new version and promote it
+  python src/indexctl.py ingest --shard i/n      ingest one slice of the corpus into a partial index
+  python src/indexctl.py ingest --workers N      ingest all N slices in parallel local processes, merge, promote
+                                                 (each process gets 1/N of the API rate limits)
+  python src/indexctl.py merge <out> <part>...   merge partial indexes (optionally --promote)
+  python src/indexctl.py jobs                    show unfinished (resumable) ingestion jobs
+  python src/indexctl.py jobs --reap             remove abandoned jobs and their half-built versions
+"""
+import argparse
+import os
+import time
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def _settings():
+    return (
+        os.environ.get("POLICY_DATA_DIR", "data/policies"),
+        os.environ.get("CHROMA_DIR", "vectorstore/index"),
+        os.environ.get("EMBED_MODEL", "text-embedding-3-small"),
+    )
+
+
+def cmd_export(args: argparse.Namespace) -> None:
+    from retrieval.snapshot import export_current
+
+    _, persist_dir, embed_model = _settings()
+    started = time.time()
+    manifest = export_current(persist_dir, args.snapshot_dir, embed_model)
+    print(f"[Snapshot] Wrote {manifest['count']} chunks (dim={manifest['dim']}, model={manifest['embed_model']}) "
+          f"to {args.snapshot_dir} in {time.time() - started:.1f}s")
+
+
+def cmd_import(args: argparse.Namespace) -> None:
+    from retrieval.snapshot import import_as_version
+
+    _, persist_dir, embed_model = _settings()
+    started = time.time()
+    version = import_as_version(args.snapshot_dir, persist_dir, embed_model)
+    print(f"[Snapshot] Imported {args.snapshot_dir} as {version} in {time.time() - started:.1f}s")
+
+
+def _ingest_shard(data_dir: str, out_dir: str, embed_model: str, spec: str, rate_share: float = 1.0):
+    from ingestion.indexer import build_partial
+    from ingestion.loader import ShardSpec
+
+    if rate_share < 1.0:
+        # local workers share one API key: each gets its slice of the RPM/TPM limits
+        from llm.client import reset_clients
+
+        os.environ["RATE_LIMIT_SHARE"] = str(rate_share * float(os.environ.get("RATE_LIMIT_SHARE", "1")))
+        reset_clients()
+    started = time.time()
+    manifest = build_partial(data_dir, out_dir, embed_model, ShardSpec.parse(spec))
+    return spec, manifest["count"], len(manifest["corpus"]), time.time() - started
+
+
+def cmd_ingest(args: argparse.Namespace) -> None:
+    from ingestion.indexer import partial_dir
+    from ingestion.loader import ShardSpec
+
+    data_dir, persist_dir, embed_model = _settings()
+
+    if args.shard:
+        shard = ShardSpec.parse(args.shard)
+        out_dir = args.out or partial_dir(persist_dir, shard)
+        spec, count, files, secs = _ingest_shard(data_dir, out_dir, embed_model, str(shard))
+        print(f"[Ingest] Shard {spec}: {count} chunks from {files} files in {secs:.1f}s -> {out_dir}")
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+    import shutil
+
+    workers = args.workers
+    started = time.time()
+    shards = [ShardSpec(i, workers) for i in range(workers)]
+    out_dirs = [partial_dir(persist_dir, sh) for sh in shards]
+    for d in out_dirs:
+        shutil.rmtree(d, ignore_errors=True)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_ingest_shard, data_dir, d, embed_model, str(sh), 1.0 / workers)
+                   for sh, d in zip(shards, out_dirs)]
+        for f in futures:
+            spec, count, files, secs = f.result()
+            print(f"[Ingest] Shard {spec}: {count} chunks from {files} files in {secs:.1f}s")
+    print(f"[Ingest] {workers} shards ingested in {time.time() - started:.1f}s")
+
+    merged = args.out or str(Path(persist_dir) / "partials" / f"merged-{int(time.time())}")
+    _merge(out_dirs, merged, promote=True, require_all_shards=True)
+
+
+def _merge(parts, out_dir: str, promote: bool, require_all_shards: bool) -> None:
+    from retrieval.snapshot import import_as_version, merge_snapshots
+
+    _, persist_dir, embed_model = _settings()
+    started = time.time()
+    manifest = merge_snapshots(parts, out_dir, require_all_shards=require_all_shards)
+    print(f"[Merge] {len(parts)} partials -> {manifest['count']} chunks in {out_dir} ({time.time() - started:.1f}s)")
+    if promote:
+        version = import_as_version(out_dir, persist_dir, embed_model)
+        print(f"[Merge] Promoted {version}")
+
+
+def cmd_merge(args: argparse.Namespace) -> None:
+    _merge(args.parts, args.out_dir, promote=args.promote, require_all_shards=not args.allow_missing)
+
+
+def cmd_jobs(args: argparse.Namespace) -> None:
+    from ingestion.indexer import jobs_dir, reap_jobs
+    from ingestion.jobs import job_status
+    from retrieval.versions import gc_versions
+
+    _, persist_dir, _ = _settings()
+    if args.reap:
+        grace = args.grace if args.grace is not None else float(os.environ.get("INDEX_BUILD_GC_GRACE_SECONDS", "3600"))
+        reaped = reap_jobs(persist_dir, grace)
+        removed = gc_versions(persist_dir, float(os.environ.get("INDEX_GC_GRACE_SECONDS", "60")), grace)
+        print(f"[Jobs] Removed {len(reaped)} abandoned jobs and {len(removed)} retired or abandoned versions")
+    root = jobs_dir(persist_dir)
+    dirs = sorted(p for p in root.iterdir() if p.is_dir()) if root.exists() else []
+    if not dirs:
+        print("[Jobs] No unfinished ingestion jobs")
+        return
+    for d in dirs:
+        st = job_status(str(d))
+        batches = st["batches"] if st["batches"] is not None else "?"
+        print(f"[Jobs] {st['job']} -> {st['version']}: extracted {st['extracted']}/{st['files']} files, "
+              f"copied {st['copied']}, upserted {st['upserted']}/{batches} batches"
+              f"{' (completed)' if st['completed'] else ''}")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Index maintenance commands.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("export", help="write a portable snapshot of the current index")
+    p.add_argument("snapshot_dir")
+    p.set_defaults(func=cmd_export)
+
+    p = sub.add_parser("import", help="load a snapshot into a new index version and promote it")
+    p.add_argument("snapshot_dir")
+    p.set_defaults(func=cmd_import)
+
+    p = sub.add_parser("ingest", help="ingest a shard of the corpus, or all shards in parallel")
+    g = p.add_mutually_exclusive_group(required=True)
+    g.add_argument("--shard", help="shard spec i/n; files are assigned by a stable hash of their path")
+    g.add_argument("--workers", type=int, help="ingest n shards in n local processes, then merge and promote")
+    p.add_argument("--out", help="output directory (default: CHROMA_DIR/partials/...)")
+    p.set_defaults(func=cmd_ingest)
+
+    p = sub.add_parser("merge", help="merge partial indexes into one snapshot")
+    p.add_argument("out_dir")
+    p.add_argument("parts", nargs="+")
+    p.add_argument("--promote", action="store_true", help="load the merged snapshot as the current index version")
+    p.add_argument("--allow-missing", action="store_true", help="merge even if some shards are absent")
+    p.set_defaults(func=cmd_merge)
+
+    p = sub.add_parser("jobs", help="show unfinished ingestion jobs; rerun ingestion to resume them")
+    p.add_argument("--reap", action="store_true", help="first remove jobs idle past the grace period and their versions")
+    p.add_argument("--grace", type=float, help="idle seconds before a job counts as abandoned "
+                                               "(default INDEX_BUILD_GC_GRACE_SECONDS or 3600)")
+    p.set_defaults(func=cmd_jobs)
+
+    return parser
+
+
+def main() -> None:
+    args = build_parser().parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
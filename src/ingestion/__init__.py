@@ -1,3 +1,26 @@
-from .chunking import *
-from .embedder import *
-from .loader import *
\ No newline at end of file
+# Submodules import pypdf, chromadb, openai; see lazy_exports.
+from lazy_exports import lazy_exports
+
+__getattr__, __dir__, __all__ = lazy_exports(__name__, {
+    "TextChunk": ".chunking",
+    "HEADING_REGEXES": ".chunking",
+    "is_heading": ".chunking",
+    "split_into_sections": ".chunking",
+    "naive_chunk": ".chunking",
+    "chunk_text": ".chunking",
+    "build_or_load_chroma": ".embedder",
+    "embed_texts": ".embedder",
+    "index_chunks": ".embedder",
+    "LoadedDoc": ".loader",
+    "slugify": ".loader",
+    "SUPPORTED_EXTENSIONS": ".loader",
+    "ShardSpec": ".loader",
+    "policy_files": ".loader",
+    "load_policy_file": ".loader",
+    "load_policies": ".loader",
+    "clean_pdf_text": ".loader",
+    "IngestJob": ".jobs",
+    "IngestJournal": ".jobs",
+    "ProgressReporter": ".jobs",
+    "job_status": ".jobs",
+})
@@ -1,7 +1,9 @@
 # src/ingestion/chunking.py
 import re
 from dataclasses import dataclass
-from typing import List, Dict, Any
+from typing import Any, Callable, Dict, List, Optional
+
+from models.spans import encode_spans, sentence_spans
 
 
 @dataclass
@@ -89,9 +91,12 @@ def chunk_text(
     base_metadata: Dict[str, Any],
     chunk_size: int = 1400,
     overlap: int = 80,
+    annotate: Optional[Callable[[str], Dict[str, Any]]] = None,
 ) -> List[TextChunk]:
     """
     Section-aware chunking (generic). Prevents Frankenstein chunks.
+    annotate(chunk_text) returns extra metadata for each chunk (e.g. rule
+    pack flags), so callers can precompute query-time work at ingest.
     """
     if not text:
         return []
@@ -105,7 +110,10 @@ def chunk_text(
         for sc in subchunks:
             section_id = f"sec{idx:04d}"
             md = dict(base_metadata)
-            md.update({"policy_id": policy_id, "section_id": section_id, "chunk_index": idx})
+            md.update({"policy_id": policy_id, "section_id": section_id, "chunk_index": idx,
+                       "spans": encode_spans(sentence_spans(sc))})
+            if annotate is not None:
+                md.update(annotate(sc))
             chunks.append(TextChunk(policy_id=policy_id, section_id=section_id, text=sc, metadata=md))
             idx += 1
 
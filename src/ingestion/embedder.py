@@ -2,15 +2,30 @@
 import os
 from typing import List
 
-from openai import OpenAI
-import chromadb
-
 from ingestion.chunking import TextChunk
+from llm.client import embedding_options, get_client
+from retrieval.store import build_or_load_chroma
+
+UPSERT_BATCH_SIZE = 1000
 
 
-def build_or_load_chroma(persist_dir: str) -> chromadb.api.models.Collection.Collection:
-    client = chromadb.PersistentClient(path=persist_dir)
-    return client.get_or_create_collection(name="policies")
+def embed_texts(texts: List[str], model: str, batch_size: int = 0) -> List[List[float]]:
+    """
+    Embeds texts in order, EMBED_BATCH_SIZE inputs per request
+    (the API caps inputs per call).
+    """
+    oai = get_client()
+    batch_size = batch_size or int(os.environ.get("EMBED_BATCH_SIZE", "256"))
+
+    embeddings: List[List[float]] = []
+    for start in range(0, len(texts), batch_size):
+        resp = oai.embeddings.create(
+            model=model,
+            input=texts[start:start + batch_size],
+            **embedding_options(),
+        )
+        embeddings.extend(d.embedding for d in resp.data)
+    return embeddings
 
 
 def index_chunks(
@@ -21,28 +36,21 @@ def index_chunks(
     """
     Stores chunks in Chroma with deterministic IDs and embeddings from OpenAI.
     """
-    api_key = os.environ.get("OPENAI_API_KEY", "")
-    if not api_key:
-        raise RuntimeError("OPENAI_API_KEY is missing. Cannot embed.")
-
-    oai = OpenAI(api_key=api_key)
-
     texts = [c.text for c in chunks]
     ids = [f"{c.policy_id}:{c.section_id}" for c in chunks]
     metadatas = [c.metadata for c in chunks]
 
     # OpenAI embeddings call (batched)
-    resp = oai.embeddings.create(
-        model=model,
-        input=texts,
-    )
-    embeddings = [d.embedding for d in resp.data]
-
-    collection.upsert(
-        ids=ids,
-        documents=texts,
-        metadatas=metadatas,
-        embeddings=embeddings,
-    )
+    embeddings = embed_texts(texts, model)
+
+    # vector stores cap the batch size of a single write
+    for start in range(0, len(ids), UPSERT_BATCH_SIZE):
+        end = start + UPSERT_BATCH_SIZE
+        collection.upsert(
+            ids=ids[start:end],
+            documents=texts[start:end],
+            metadatas=metadatas[start:end],
+            embeddings=embeddings[start:end],
+        )
 
     return len(ids)
\ No newline at end of file
@@ -0,0 +1,261 @@
+# src/ingestion/indexer.py
+import hashlib
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+
+from control.rule_packs import default_rules
+from ingestion.chunking import TextChunk, chunk_text
+from ingestion.embedder import embed_texts
+from ingestion.jobs import JOURNAL, IngestJob, IngestJournal
+from ingestion.loader import ShardSpec, load_policy_file, policy_files
+from retrieval.store import build_or_load_chroma
+from retrieval.versions import (
+    build_in_progress,
+    current_version,
+    index_settings,
+    lock_build,
+    new_version,
+    promote,
+    read_manifest,
+    release_build,
+    version_dir,
+    write_manifest,
+)
+
+
+def file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def stat_signature(data_dir: str) -> Dict[str, tuple]:
+    """Cheap change detector: (size, mtime_ns) per policy file."""
+    sig = {}
+    for path in policy_files(data_dir):
+        st = path.stat()
+        sig[path.name] = (st.st_size, st.st_mtime_ns)
+    return sig
+
+
+def corpus_manifest(data_dir: str, shard: Optional[ShardSpec] = None) -> Dict[str, Dict[str, Any]]:
+    files = {}
+    for path in policy_files(data_dir, shard):
+        st = path.stat()
+        files[path.name] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": file_sha256(path)}
+    return files
+
+
+def jobs_dir(persist_dir: str) -> Path:
+    return Path(persist_dir) / "jobs"
+
+
+def reap_jobs(persist_dir: str, grace_seconds: float = 3600.0) -> List[str]:
+    """
+    Removes ingestion jobs nobody will resume: jobs whose version is already
+    complete (a crash between promote and cleanup), and jobs idle for
+    grace_seconds whose build is not running, typically because the corpus
+    changed after a crash and the rerun started a different job. The
+    unfinished version an abandoned job was building is removed with it.
+    Returns the removed job ids.
+    """
+    root = jobs_dir(persist_dir)
+    if not root.exists():
+        return []
+    removed = []
+    now = time.time()
+    for job_dir in sorted(p for p in root.iterdir() if p.is_dir()):
+        name = IngestJournal(str(job_dir)).replay().meta.get("version")
+        path = version_dir(persist_dir, name) if name else None
+        if path and read_manifest(path) is not None:
+            shutil.rmtree(job_dir, ignore_errors=True)
+            removed.append(job_dir.name)
+            continue
+        if path and build_in_progress(path):
+            continue
+        journal = job_dir / JOURNAL
+        try:
+            idle = now - max(job_dir.stat().st_mtime, journal.stat().st_mtime if journal.exists() else 0.0)
+        except FileNotFoundError:
+            continue
+        if idle < grace_seconds:
+            continue
+        if path and name != current_version(persist_dir):
+            shutil.rmtree(path, ignore_errors=True)  # the version first: a job without one is reaped next time
+        shutil.rmtree(job_dir, ignore_errors=True)
+        removed.append(job_dir.name)
+    return removed
+
+
+def _job_id(settings: Dict[str, Any], files: Dict[str, Dict[str, Any]], base: Optional[str]) -> str:
+    """Same corpus, settings and base version -> same job, so a rerun resumes it."""
+    key = {"settings": settings, "files": {k: v["sha256"] for k, v in files.items()}, "base": base}
+    return hashlib.sha256(json.dumps(key, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+
+def build_index_version(data_dir: str, persist_dir: str, embed_model: str, force: bool = False) -> Optional[str]:
+    """
+    Builds a complete new index version next to the current one and promotes it.
+    Files whose content hash is unchanged are copied from the current version
+    with their embeddings; only new or changed files are extracted and embedded.
+    Returns the new version name, or None when the corpus is unchanged.
+
+    The build runs as a journaled IngestJob under CHROMA_DIR/jobs/, so if it
+    is interrupted, the next call with the same corpus resumes into the same
+    unfinished version from the last upserted batch.
+    """
+    settings = index_settings(embed_model)
+    files = corpus_manifest(data_dir)
+    if not files:
+        raise ValueError(f"No supported policy files found in: {data_dir}")
+
+    prev = current_version(persist_dir)
+    prev_manifest = read_manifest(version_dir(persist_dir, prev)) if prev else None
+    reusable = prev_manifest is not None and prev_manifest.get("settings") == settings
+    prev_files = prev_manifest.get("files", {}) if reusable else {}
+
+    if not force and reusable and {k: v["sha256"] for k, v in prev_files.items()} == {k: v["sha256"] for k, v in files.items()}:
+        return None
+
+    started = time.time()
+    base = prev if reusable else None
+    job_dir = jobs_dir(persist_dir) / _job_id(settings, files, base)
+    name = IngestJournal(str(job_dir)).replay().meta.get("version")
+    if name and Path(version_dir(persist_dir, name)).is_dir() and read_manifest(version_dir(persist_dir, name)) is None:
+        path = version_dir(persist_dir, name)
+        print(f"[Index] Resuming interrupted build of {name}")
+    else:
+        shutil.rmtree(job_dir, ignore_errors=True)
+        name, path = new_version(persist_dir)
+    build_lock = lock_build(path)
+    try:
+        collection = build_or_load_chroma(path)
+        prev_collection = build_or_load_chroma(version_dir(persist_dir, prev)) if reusable else None
+
+        reuse = [
+            f for f, info in files.items()
+            if prev_collection is not None and prev_files.get(f, {}).get("sha256") == info["sha256"]
+        ]
+        job = IngestJob(
+            str(job_dir),
+            data_dir,
+            collection,
+            embed_model,
+            files=[f for f in files if f not in reuse],
+            reuse=reuse,
+            reuse_collection=prev_collection,
+            meta={"version": name, "base": base},
+            annotate=default_rules().ingest_metadata,
+        )
+        counts = job.run()
+        copied, embedded = counts["copied"], counts["embedded"]
+
+        if settings["vector_quantization"]:
+            from retrieval.quantized import build_from_collection, quantized_dir
+
+            build_from_collection(collection, quantized_dir(path), settings["vector_quantization"])
+
+        write_manifest(path, {
+            "version": name,
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "settings": settings,
+            "files": files,
+            "chunk_count": copied + embedded,
+            "build_seconds": round(time.time() - started, 3),
+        })
+        promote(persist_dir, name)
+        job.cleanup()
+    finally:
+        release_build(build_lock)
+    print(f"[Index] Promoted {name}: {embedded} chunks embedded, {copied} reused, {len(files)} files")
+    return name
+
+
+def partial_dir(persist_dir: str, shard: ShardSpec) -> str:
+    return str(Path(persist_dir) / "partials" / f"shard-{shard.index:04d}-of-{shard.count:04d}")
+
+
+def _partial_batches(data_dir: str, files: Dict[str, Any], batch_size: int) -> Iterator[List[TextChunk]]:
+    """Chunks the shard's files in order, batch_size chunks at a time; batch boundaries are stable across runs."""
+    batch: List[TextChunk] = []
+    annotate = default_rules().ingest_metadata
+    for file_name in files:
+        doc = load_policy_file(Path(data_dir) / file_name)
+        for chunk in chunk_text(doc.policy_id, doc.text, doc.metadata, annotate=annotate):
+            batch.append(chunk)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+    if batch:
+        yield batch
+
+
+def build_partial(data_dir: str, out_dir: str, embed_model: str, shard: ShardSpec, batch_size: int = 0) -> Dict[str, Any]:
+    """
+    Ingests only the files owned by `shard` into a partial index, written as a
+    snapshot so partials from many machines can be merged with merge_snapshots.
+
+    Chunks are embedded a batch at a time and streamed into the snapshot, so
+    memory holds one batch, not the shard. Each batch's embeddings are saved
+    under <out_dir>.job before they are used; a rerun after a crash reuses
+    them and only embeds what is missing. The checkpoint is removed once the
+    snapshot is in place.
+    """
+    from retrieval.snapshot import write_snapshot
+
+    settings = index_settings(embed_model)
+    files = corpus_manifest(data_dir, shard)
+    batch_size = batch_size or int(os.environ.get("EMBED_BATCH_SIZE", "256"))
+
+    work = Path(out_dir + ".job")
+    key = {"settings": settings, "files": {k: v["sha256"] for k, v in files.items()}, "batch_size": batch_size}
+    try:
+        resumable = json.loads((work / "meta.json").read_text(encoding="utf-8")) == key
+    except (FileNotFoundError, ValueError):
+        resumable = False
+    if not resumable:
+        shutil.rmtree(work, ignore_errors=True)
+        work.mkdir(parents=True)
+        (work / "meta.json").write_text(json.dumps(key, sort_keys=True), encoding="utf-8")
+
+    def pages() -> Iterator[Dict[str, Any]]:
+        reused = 0
+        for b, batch in enumerate(_partial_batches(data_dir, files, batch_size)):
+            texts = [c.text for c in batch]
+            path = work / f"{b:06d}.npy"
+            if path.exists():
+                embeddings = np.load(path)
+                reused += 1
+            else:
+                embeddings = np.asarray(embed_texts(texts, embed_model, batch_size=len(texts)), dtype=np.float32)
+                tmp = path.with_name(path.name + ".tmp")
+                with open(tmp, "wb") as f:
+                    np.save(f, embeddings)
+                os.replace(tmp, path)
+            yield {
+                "ids": [f"{c.policy_id}:{c.section_id}" for c in batch],
+                "documents": texts,
+                "metadatas": [c.metadata for c in batch],
+                "embeddings": embeddings,
+            }
+        if reused:
+            print(f"[Ingest] Shard {shard}: reused {reused} checkpointed batches")
+
+    manifest = write_snapshot(
+        out_dir,
+        pages(),
+        embed_model=settings["embed_model"],
+        embed_dimensions=settings["embed_dimensions"],
+        corpus=files,
+        extra={"shard": str(shard)},
+    )
+    shutil.rmtree(work, ignore_errors=True)
+    return manifest
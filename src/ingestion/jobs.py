@@ -0,0 +1,294 @@
+# src/ingestion/jobs.py
+"""
+Resumable ingestion jobs.
+
+A job writes a durable journal (journal.jsonl, fsync'd per event) next to its
+working files:
+
+  extracted  file was loaded and chunked; chunks saved under chunks/
+  copied     unchanged file's records were copied from the previous version
+  embedded   batch embeddings saved under batches/<n>.npy
+  upserted   batch written to the vector store
+  completed  job finished
+
+Artifacts are written before the event that refers to them, so after a crash
+a restart skips everything journaled and resumes from the first batch that
+was not upserted. Upserts are idempotent, so replaying a batch is safe.
+"""
+import json
+import os
+import shutil
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+import numpy as np
+
+from ingestion.chunking import TextChunk, chunk_text
+from ingestion.embedder import embed_texts, UPSERT_BATCH_SIZE
+from ingestion.loader import load_policy_file
+
+JOURNAL = "journal.jsonl"
+
+
+@dataclass
+class JobState:
+    meta: Dict[str, Any] = field(default_factory=dict)
+    extracted: Dict[str, int] = field(default_factory=dict)
+    copied: Dict[str, int] = field(default_factory=dict)
+    embedded: Set[int] = field(default_factory=set)
+    upserted: Set[int] = field(default_factory=set)
+    completed: bool = False
+
+
+class IngestJournal:
+    def __init__(self, job_dir: str):
+        self.job_dir = Path(job_dir)
+        self.job_dir.mkdir(parents=True, exist_ok=True)
+        self.path = self.job_dir / JOURNAL
+
+    def append(self, event: str, **fields: Any) -> None:
+        line = json.dumps({"event": event, "ts": time.time(), **fields}) + "\n"
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def replay(self) -> JobState:
+        state = JobState()
+        if not self.path.exists():
+            return state
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    ev = json.loads(line)
+                except ValueError:
+                    break  # torn write at the tail from a crash; everything before it is valid
+                kind = ev.get("event")
+                if kind == "started":
+                    state.meta = ev.get("meta", {})
+                elif kind == "extracted":
+                    state.extracted[ev["file"]] = int(ev["chunks"])
+                elif kind == "copied":
+                    state.copied[ev["file"]] = int(ev["records"])
+                elif kind == "embedded":
+                    state.embedded.add(int(ev["batch"]))
+                elif kind == "upserted":
+                    state.upserted.add(int(ev["batch"]))
+                elif kind == "completed":
+                    state.completed = True
+        return state
+
+
+def _write_atomic(path: Path, write: Callable[[Any], None], mode: str = "wb") -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, mode) as f:
+        write(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def copy_file_records(src_collection, dst_collection, file_name: str) -> int:
+    """Copies one file's records, embeddings included, between collections."""
+    res = src_collection.get(where={"file_name": file_name}, include=["embeddings", "documents", "metadatas"])
+    for start in range(0, len(res["ids"]), UPSERT_BATCH_SIZE):
+        end = start + UPSERT_BATCH_SIZE
+        dst_collection.upsert(
+            ids=res["ids"][start:end],
+            documents=res["documents"][start:end],
+            metadatas=res["metadatas"][start:end],
+            embeddings=res["embeddings"][start:end],
+        )
+    return len(res["ids"])
+
+
+def _fmt_seconds(secs: float) -> str:
+    secs = int(max(0, secs))
+    h, rem = divmod(secs, 3600)
+    m, s = divmod(rem, 60)
+    return f"{h}h{m:02d}m{s:02d}s" if h else f"{m}m{s:02d}s"
+
+
+class ProgressReporter:
+    """Prints progress with an ETA based on the throughput of this run."""
+
+    def __init__(self, total: int, done: int = 0, label: str = "chunks", every: float = 0.0):
+        self.total = total
+        self.done = done
+        self.label = label
+        self.every = every
+        self._start_done = done
+        self._started = time.monotonic()
+        self._last = 0.0
+
+    def advance(self, n: int) -> None:
+        self.done += n
+        now = time.monotonic()
+        if self.done < self.total and now - self._last < self.every:
+            return
+        self._last = now
+        elapsed = now - self._started
+        rate = (self.done - self._start_done) / elapsed if elapsed > 0 else 0.0
+        eta = (self.total - self.done) / rate if rate > 0 else float("inf")
+        pct = 100.0 * self.done / self.total if self.total else 100.0
+        eta_txt = _fmt_seconds(eta) if eta != float("inf") else "?"
+        print(f"[Ingest] {self.done}/{self.total} {self.label} ({pct:.0f}%), {rate:.1f} {self.label}/s, ETA {eta_txt}")
+
+
+def job_status(job_dir: str) -> Dict[str, Any]:
+    """Summarises a job's journal without touching its working files."""
+    state = IngestJournal(job_dir).replay()
+    meta = state.meta
+    batch_size = int(meta.get("batch_size") or 1)
+    chunks = sum(state.extracted.values())
+    return {
+        "job": Path(job_dir).name,
+        "version": meta.get("version"),
+        "files": meta.get("files", 0),
+        "extracted": len(state.extracted),
+        "copied": len(state.copied),
+        "batches": (chunks + batch_size - 1) // batch_size if len(state.extracted) == meta.get("files") else None,
+        "upserted": len(state.upserted),
+        "completed": state.completed,
+    }
+
+
+class IngestJob:
+    """
+    Ingests `files` from data_dir into `collection` with a durable journal in
+    job_dir. Files listed in `reuse` are copied from `reuse_collection`
+    instead of being re-embedded. annotate is passed to chunk_text.
+    """
+
+    def __init__(
+        self,
+        job_dir: str,
+        data_dir: str,
+        collection,
+        embed_model: str,
+        files: Iterable[str],
+        reuse: Iterable[str] = (),
+        reuse_collection=None,
+        batch_size: int = 0,
+        meta: Optional[Dict[str, Any]] = None,
+        annotate: Optional[Callable[[str], Dict[str, Any]]] = None,
+    ):
+        self.journal = IngestJournal(job_dir)
+        self.job_dir = Path(job_dir)
+        self.data_dir = data_dir
+        self.collection = collection
+        self.embed_model = embed_model
+        self.files = sorted(files)
+        self.reuse = sorted(reuse)
+        self.reuse_collection = reuse_collection
+        self.batch_size = batch_size or int(os.environ.get("EMBED_BATCH_SIZE", "256"))
+        self.meta = dict(meta or {})
+        self.annotate = annotate
+        (self.job_dir / "chunks").mkdir(exist_ok=True)
+        (self.job_dir / "batches").mkdir(exist_ok=True)
+
+    def _chunks_path(self, i: int) -> Path:
+        return self.job_dir / "chunks" / f"{i:06d}.jsonl"
+
+    def _batch_path(self, b: int) -> Path:
+        return self.job_dir / "batches" / f"{b:06d}.npy"
+
+    def _extract(self, state: JobState) -> None:
+        done = 0
+        for i, file_name in enumerate(self.files):
+            if file_name in state.extracted:
+                continue
+            doc = load_policy_file(Path(self.data_dir) / file_name)
+            chunks = chunk_text(doc.policy_id, doc.text, doc.metadata, annotate=self.annotate)
+            lines = "".join(
+                json.dumps({"policy_id": c.policy_id, "section_id": c.section_id, "text": c.text, "metadata": c.metadata},
+                           ensure_ascii=False) + "\n"
+                for c in chunks
+            )
+            _write_atomic(self._chunks_path(i), lambda f: f.write(lines), mode="w")
+            self.journal.append("extracted", file=file_name, chunks=len(chunks))
+            state.extracted[file_name] = len(chunks)
+            done += 1
+        if done:
+            print(f"[Ingest] Extracted {done} files")
+
+    def _load_chunks(self) -> List[TextChunk]:
+        chunks: List[TextChunk] = []
+        for i in range(len(self.files)):
+            with open(self._chunks_path(i), encoding="utf-8") as f:
+                for line in f:
+                    d = json.loads(line)
+                    chunks.append(TextChunk(policy_id=d["policy_id"], section_id=d["section_id"], text=d["text"], metadata=d["metadata"]))
+        return chunks
+
+    def _copy(self, state: JobState) -> int:
+        copied = 0
+        for file_name in self.reuse:
+            if file_name in state.copied:
+                copied += state.copied[file_name]
+                continue
+            n = copy_file_records(self.reuse_collection, self.collection, file_name)
+            self.journal.append("copied", file=file_name, records=n)
+            state.copied[file_name] = n
+            copied += n
+        return copied
+
+    def run(self) -> Dict[str, int]:
+        """Runs (or resumes) the job. Returns counts of embedded and copied records."""
+        state = self.journal.replay()
+        if state.completed:
+            return {"embedded": sum(state.extracted.values()), "copied": sum(state.copied.values()), "resumed_batches": 0}
+        if not state.meta:
+            meta = {**self.meta, "files": len(self.files), "reuse": len(self.reuse),
+                    "batch_size": self.batch_size, "embed_model": self.embed_model}
+            self.journal.append("started", meta=meta)
+            state.meta = meta
+        elif state.meta.get("batch_size") != self.batch_size:
+            # batch boundaries must not move under an existing journal
+            self.batch_size = int(state.meta["batch_size"])
+
+        copied = self._copy(state)
+        self._extract(state)
+        chunks = self._load_chunks()
+
+        n_batches = (len(chunks) + self.batch_size - 1) // self.batch_size
+        resumed = len(state.upserted)
+        if resumed:
+            print(f"[Ingest] Resuming: {resumed}/{n_batches} batches already committed")
+        progress = ProgressReporter(
+            total=len(chunks),
+            done=sum(min(self.batch_size, len(chunks) - b * self.batch_size) for b in state.upserted),
+            every=float(os.environ.get("INGEST_PROGRESS_SECONDS", "1.0")),
+        )
+
+        for b in range(n_batches):
+            if b in state.upserted:
+                continue
+            batch = chunks[b * self.batch_size:(b + 1) * self.batch_size]
+            texts = [c.text for c in batch]
+
+            if b in state.embedded and self._batch_path(b).exists():
+                embeddings = np.load(self._batch_path(b))
+            else:
+                embeddings = np.asarray(embed_texts(texts, self.embed_model, batch_size=len(texts)), dtype=np.float32)
+                _write_atomic(self._batch_path(b), lambda f: np.save(f, embeddings))
+                self.journal.append("embedded", batch=b, chunks=len(batch))
+
+            self.collection.upsert(
+                ids=[f"{c.policy_id}:{c.section_id}" for c in batch],
+                documents=texts,
+                metadatas=[c.metadata for c in batch],
+                embeddings=embeddings,
+            )
+            self.journal.append("upserted", batch=b)
+            state.upserted.add(b)
+            self._batch_path(b).unlink(missing_ok=True)
+            progress.advance(len(batch))
+
+        self.journal.append("completed", embedded=len(chunks), copied=copied)
+        return {"embedded": len(chunks), "copied": copied, "resumed_batches": resumed}
+
+    def cleanup(self) -> None:
+        shutil.rmtree(self.job_dir, ignore_errors=True)
@@ -1,11 +1,10 @@
 # src/ingestion/loader.py
+import hashlib
 import os
 import re
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Any, List, Tuple
-
-from pypdf import PdfReader
+from typing import Dict, Any, List, Optional, Tuple
 
 
 @dataclass
@@ -22,6 +21,8 @@ def slugify(s: str) -> str:
     return s
 
 def _load_pdf(path: Path) -> Tuple[str, Dict[str, Any]]:
+    from pypdf import PdfReader  # heavy; only needed when a PDF is actually read
+
     reader = PdfReader(str(path))
     pages = [p.extract_text() or "" for p in reader.pages]
     text = "\n\n".join(pages)
@@ -53,32 +54,73 @@ def _load_txt(path: Path) -> Tuple[str, Dict[str, Any]]:
     return text, {"title": path.stem, **md}
 
 
-def load_policies(data_dir: str) -> List[LoadedDoc]:
-    """
-    Loads all policy files from data_dir (pdf/txt/md).
-    policy_id is derived from filename stem.
-    """
+SUPPORTED_EXTENSIONS = {".pdf", ".txt", ".md"}
+
+
+@dataclass(frozen=True)
+class ShardSpec:
+    """Shard `index` of `count`; files are assigned by a stable hash of their path."""
+    index: int
+    count: int
+
+    def __post_init__(self):
+        if self.count < 1 or not 0 <= self.index < self.count:
+            raise ValueError(f"Invalid shard {self.index}/{self.count}")
+
+    @classmethod
+    def parse(cls, spec: str) -> "ShardSpec":
+        try:
+            i, n = spec.split("/")
+            return cls(int(i), int(n))
+        except ValueError:
+            raise ValueError(f"Shard spec must look like 'i/n' (e.g. 0/4), got: {spec!r}")
+
+    def owns(self, rel_path: str) -> bool:
+        digest = hashlib.sha1(rel_path.encode("utf-8")).digest()
+        return int.from_bytes(digest[:8], "big") % self.count == self.index
+
+    def __str__(self) -> str:
+        return f"{self.index}/{self.count}"
+
+
+def policy_files(data_dir: str, shard: Optional[ShardSpec] = None) -> List[Path]:
+    """Supported policy files directly under data_dir, in stable order."""
     root = Path(data_dir)
     if not root.exists():
         raise FileNotFoundError(f"Data directory not found: {data_dir}")
+    files = [p for p in sorted(root.glob("*")) if p.is_file() and p.suffix.lower() in SUPPORTED_EXTENSIONS]
+    if shard is not None:
+        files = [p for p in files if shard.owns(p.relative_to(root).as_posix())]
+    return files
+
+
+def load_policy_file(path: Path) -> LoadedDoc:
+    """
+    Loads one policy file (pdf/txt/md).
+    policy_id is derived from filename stem.
+    """
+    ext = path.suffix.lower()
+    if ext == ".pdf":
+        text, md = _load_pdf(path)
+    elif ext in {".txt", ".md"}:
+        text, md = _load_txt(path)
+    else:
+        raise ValueError(f"Unsupported policy file type: {path.name}")
+
+    policy_id = slugify(path.stem)
+    title = md.get("title", path.stem)
+    return LoadedDoc(policy_id=policy_id, title=title, text=text, metadata=md)
+
+
+def load_policies(data_dir: str, shard: Optional[ShardSpec] = None) -> List[LoadedDoc]:
+    """
+    Loads all policy files from data_dir (pdf/txt/md), or only the files
+    owned by `shard` when one is given.
+    policy_id is derived from filename stem.
+    """
+    docs = [load_policy_file(path) for path in policy_files(data_dir, shard)]
 
-    docs: List[LoadedDoc] = []
-    for path in sorted(root.glob("*")):
-        if path.is_dir():
-            continue
-        ext = path.suffix.lower()
-        if ext == ".pdf":
-            text, md = _load_pdf(path)
-        elif ext in {".txt", ".md"}:
-            text, md = _load_txt(path)
-        else:
-            continue  # ignore unknown formats
-
-        policy_id = slugify(path.stem)
-        title = md.get("title", path.stem)
-        docs.append(LoadedDoc(policy_id=policy_id, title=title, text=text, metadata=md))
-
-    if not docs:
+    if not docs and shard is None:
         raise ValueError(f"No supported policy files found in: {data_dir}")
 
     return docs
@@ -0,0 +1,121 @@
+# src/ingestion/watcher.py
+import threading
+import time
+import traceback
+from typing import Callable, Dict, Optional
+
+from ingestion.indexer import build_index_version, reap_jobs, stat_signature
+from retrieval.versions import gc_versions
+
+
+class PolicyWatcher:
+    """
+    Polls data_dir and rebuilds the index in a background worker whenever the
+    policy files change. Changes are debounced (a burst of uploads becomes one
+    rebuild), each rebuild goes into a fresh index version that is promoted
+    only when complete, and retired versions are removed after gc_grace seconds
+    (abandoned, never-completed builds after build_gc_grace seconds).
+    """
+
+    def __init__(
+        self,
+        data_dir: str,
+        persist_dir: str,
+        embed_model: str,
+        poll_interval: float = 2.0,
+        debounce: float = 5.0,
+        gc_grace: float = 60.0,
+        build_gc_grace: float = 3600.0,
+        on_swap: Optional[Callable[[str], None]] = None,
+    ):
+        self.data_dir = data_dir
+        self.persist_dir = persist_dir
+        self.embed_model = embed_model
+        self.poll_interval = poll_interval
+        self.debounce = debounce
+        self.gc_grace = gc_grace
+        self.build_gc_grace = build_gc_grace
+        self.on_swap = on_swap
+
+        self._stop = threading.Event()
+        self._rebuild = threading.Event()
+        self._built_sig: Optional[Dict[str, tuple]] = None
+        self._pending_sig: Optional[Dict[str, tuple]] = None
+        self._stable_since = 0.0
+        self._threads = []
+
+    def start(self) -> None:
+        # build (or confirm) the initial version before watching
+        self._rebuild.set()
+        self._threads = [
+            threading.Thread(target=self._poll_loop, name="policy-watcher", daemon=True),
+            threading.Thread(target=self._worker_loop, name="policy-indexer", daemon=True),
+        ]
+        for t in self._threads:
+            t.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        self._rebuild.set()
+        for t in self._threads:
+            t.join(timeout)
+
+    def run_forever(self) -> None:
+        self.start()
+        try:
+            while not self._stop.is_set():
+                time.sleep(0.5)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    def _poll_loop(self) -> None:
+        while not self._stop.wait(self.poll_interval):
+            removed = gc_versions(self.persist_dir, self.gc_grace, self.build_gc_grace)
+            if removed:
+                print(f"[Watcher] Removed retired or abandoned index versions: {removed}")
+            reaped = reap_jobs(self.persist_dir, self.build_gc_grace)
+            if reaped:
+                print(f"[Watcher] Removed abandoned ingestion jobs: {reaped}")
+
+            try:
+                sig = stat_signature(self.data_dir)
+            except Exception as e:
+                print(f"[Watcher] Cannot scan {self.data_dir}: {e}")
+                continue
+
+            if sig == self._built_sig:
+                self._pending_sig = None
+                continue
+            if sig != self._pending_sig:
+                # still changing; restart the debounce window
+                self._pending_sig = sig
+                self._stable_since = time.monotonic()
+                continue
+            if time.monotonic() - self._stable_since >= self.debounce:
+                self._rebuild.set()
+
+    def _worker_loop(self) -> None:
+        while not self._stop.is_set():
+            self._rebuild.wait()
+            if self._stop.is_set():
+                return
+            self._rebuild.clear()
+
+            try:
+                sig = stat_signature(self.data_dir)
+                version = build_index_version(self.data_dir, self.persist_dir, self.embed_model)
+                self._built_sig = sig
+                if version and self.on_swap is not None:
+                    self.on_swap(version)
+            except Exception as e:
+                # keep serving the current version; the poller retries after the debounce window
+                print(f"[Watcher] Rebuild failed: {e}")
+                traceback.print_exc()
+                self._built_sig = None
+                self._stable_since = time.monotonic()
+            # drop requests the poller made while this build ran: after a success
+            # it re-arms only if the files changed since `sig`, after a failure
+            # once the debounce window restarted above has passed
+            self._rebuild.clear()
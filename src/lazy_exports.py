@@ -0,0 +1,29 @@
+# src/lazy_exports.py
+"""
+PEP 562 lazy exports for packages whose submodules import heavy third-party
+packages (openai, chromadb, pypdf, httpx). Names are resolved on first
+attribute access instead of at package import, so the query-only entry point
+stays within the benchmarks/import_time.py budget.
+
+    __getattr__, __dir__, __all__ = lazy_exports(__name__, {"Name": ".submodule"})
+"""
+import importlib
+import sys
+from typing import Any, Callable, Dict, List, Tuple
+
+
+def lazy_exports(package: str, exports: Dict[str, str]) -> Tuple[Callable[[str], Any], Callable[[], List[str]], List[str]]:
+    """Returns (__getattr__, __dir__, __all__) for `package`; exports maps name -> relative submodule."""
+
+    def __getattr__(name: str) -> Any:
+        module = exports.get(name)
+        if module is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(module, package), name)
+        setattr(sys.modules[package], name, value)
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted(set(vars(sys.modules[package])) | set(exports))
+
+    return __getattr__, __dir__, list(exports)
@@ -0,0 +1,25 @@
+# Submodules import openai, httpx; see lazy_exports.
+from lazy_exports import lazy_exports
+
+__getattr__, __dir__, __all__ = lazy_exports(__name__, {
+    "ENDPOINT_EMBEDDINGS": ".rate_limiter",
+    "ENDPOINT_CHAT": ".rate_limiter",
+    "TokenBucket": ".rate_limiter",
+    "EndpointLimits": ".rate_limiter",
+    "EndpointLimiter": ".rate_limiter",
+    "RateLimiter": ".rate_limiter",
+    "estimate_tokens": ".rate_limiter",
+    "RETRYABLE_STATUS": ".client",
+    "RetryPolicy": ".client",
+    "parse_retry_after": ".client",
+    "classify_error": ".client",
+    "embedding_options": ".client",
+    "embedding_tokens": ".client",
+    "chat_tokens": ".client",
+    "RateLimitedClient": ".client",
+    "AsyncRateLimitedClient": ".client",
+    "shared_limiter": ".client",
+    "get_client": ".client",
+    "get_async_client": ".client",
+    "reset_clients": ".client",
+})
@@ -0,0 +1,322 @@
+# src/llm/client.py
+import asyncio
+import os
+import random
+import threading
+import time
+import weakref
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+from llm.rate_limiter import (
+    ENDPOINT_CHAT,
+    ENDPOINT_EMBEDDINGS,
+    RateLimiter,
+    estimate_tokens,
+)
+
+# openai/httpx are imported on first client construction; short-lived
+# gate-only runs never pay for them.
+if TYPE_CHECKING:
+    import httpx
+    from openai import OpenAI
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+
+@dataclass
+class RetryPolicy:
+    max_retries: int = 5
+    base_delay: float = 0.5
+    max_delay: float = 30.0
+
+    @classmethod
+    def from_env(cls) -> "RetryPolicy":
+        return cls(
+            max_retries=int(os.environ.get("OPENAI_MAX_RETRIES", "5")),
+            base_delay=float(os.environ.get("OPENAI_RETRY_BASE_DELAY", "0.5")),
+            max_delay=float(os.environ.get("OPENAI_RETRY_MAX_DELAY", "30")),
+        )
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        if retry_after is not None:
+            # server knows best; add a little jitter so waiters don't stampede together
+            return min(self.max_delay, retry_after) + random.uniform(0, self.base_delay)
+        # full jitter exponential backoff
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+
+def parse_retry_after(headers: Optional[Mapping[str, str]]) -> Optional[float]:
+    """Seconds to wait according to retry-after-ms / retry-after, or None."""
+    if not headers:
+        return None
+    ms = headers.get("retry-after-ms")
+    if ms:
+        try:
+            return max(0.0, float(ms) / 1000.0)
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def classify_error(exc: Exception) -> Tuple[bool, Optional[float]]:
+    """Returns (retryable, retry_after_seconds) for an OpenAI client error."""
+    from openai import APIConnectionError, APIStatusError
+
+    if isinstance(exc, APIStatusError):
+        retry_after = parse_retry_after(exc.response.headers if exc.response is not None else None)
+        return exc.status_code in RETRYABLE_STATUS, retry_after
+    if isinstance(exc, APIConnectionError):
+        return True, None
+    return False, None
+
+
+def embedding_options() -> Dict[str, Any]:
+    """
+    Extra embeddings.create arguments. EMBED_DIMENSIONS asks text-embedding-3
+    models for shortened vectors; index and queries must use the same value.
+    """
+    dims = os.environ.get("EMBED_DIMENSIONS", "")
+    return {"dimensions": int(dims)} if dims else {}
+
+
+def _usage_tokens(resp: Any) -> Optional[int]:
+    usage = getattr(resp, "usage", None)
+    return getattr(usage, "total_tokens", None) if usage is not None else None
+
+
+def embedding_tokens(kwargs: Dict[str, Any]) -> int:
+    inp = kwargs.get("input", "")
+    if isinstance(inp, str):
+        return estimate_tokens(inp)
+    return sum(estimate_tokens(str(x)) for x in inp)
+
+
+def chat_tokens(kwargs: Dict[str, Any]) -> int:
+    messages: List[Dict[str, Any]] = kwargs.get("messages", [])
+    prompt = sum(estimate_tokens(str(m.get("content", ""))) for m in messages)
+    completion = kwargs.get("max_tokens") or int(os.environ.get("OPENAI_COMPLETION_TOKEN_ESTIMATE", "1000"))
+    return prompt + int(completion)
+
+
+class RateLimitedClient:
+    """
+    Facade over a pooled OpenAI client. Exposes the same
+    `embeddings.create` / `chat.completions.create` surface the call sites use,
+    but paces every call through the shared limiter and retries transient errors.
+    """
+
+    def __init__(self, client: "OpenAI", limiter: RateLimiter, retry: RetryPolicy):
+        self.raw = client
+        self.limiter = limiter
+        self.retry = retry
+        self.embeddings = SimpleNamespace(create=self._create_embeddings)
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create_chat))
+
+    def _call(self, endpoint: str, est_tokens: int, fn: Callable[[], Any]) -> Any:
+        limiter = self.limiter.endpoint(endpoint)
+        attempt = 0
+        while True:
+            limiter.acquire(est_tokens)
+            try:
+                resp = fn()
+            except Exception as e:
+                limiter.release(est_tokens)
+                retryable, retry_after = classify_error(e)
+                if not retryable or attempt >= self.retry.max_retries:
+                    raise
+                wait = self.retry.delay(attempt, retry_after)
+                if retry_after is not None:
+                    # everyone sharing this endpoint backs off, not just this caller
+                    limiter.pause(wait)
+                time.sleep(wait)
+                attempt += 1
+                continue
+            limiter.settle(est_tokens, _usage_tokens(resp))
+            return resp
+
+    def _create_embeddings(self, **kwargs: Any) -> Any:
+        return self._call(ENDPOINT_EMBEDDINGS, embedding_tokens(kwargs),
+                          lambda: self.raw.embeddings.create(**kwargs))
+
+    def _create_chat(self, **kwargs: Any) -> Any:
+        return self._call(ENDPOINT_CHAT, chat_tokens(kwargs),
+                          lambda: self.raw.chat.completions.create(**kwargs))
+
+
+class AsyncRateLimitedClient(RateLimitedClient):
+    """
+    asyncio twin of RateLimitedClient. Shares the same limiter, so sync and
+    async callers in one process draw from the same quota.
+    """
+
+    closer: Any = None  # async generator that closes the pool when its loop shuts down
+
+    async def _call(self, endpoint: str, est_tokens: int, fn: Callable[[], Any]) -> Any:
+        limiter = self.limiter.endpoint(endpoint)
+        attempt = 0
+        while True:
+            wait = limiter.reserve(est_tokens)
+            if wait > 0:
+                await asyncio.sleep(wait)
+            try:
+                resp = await fn()
+            except Exception as e:
+                limiter.release(est_tokens)
+                retryable, retry_after = classify_error(e)
+                if not retryable or attempt >= self.retry.max_retries:
+                    raise
+                wait = self.retry.delay(attempt, retry_after)
+                if retry_after is not None:
+                    limiter.pause(wait)
+                await asyncio.sleep(wait)
+                attempt += 1
+                continue
+            limiter.settle(est_tokens, _usage_tokens(resp))
+            return resp
+
+    async def _create_embeddings(self, **kwargs: Any) -> Any:
+        return await self._call(ENDPOINT_EMBEDDINGS, embedding_tokens(kwargs),
+                                lambda: self.raw.embeddings.create(**kwargs))
+
+    async def _create_chat(self, **kwargs: Any) -> Any:
+        return await self._call(ENDPOINT_CHAT, chat_tokens(kwargs),
+                                lambda: self.raw.chat.completions.create(**kwargs))
+
+
+def _api_key() -> str:
+    api_key = os.environ.get("OPENAI_API_KEY", "")
+    if not api_key:
+        raise RuntimeError("OPENAI_API_KEY is missing.")
+    return api_key
+
+
+def _http_limits() -> "httpx.Limits":
+    import httpx
+
+    return httpx.Limits(
+        max_connections=int(os.environ.get("OPENAI_MAX_CONNECTIONS", "32")),
+        max_keepalive_connections=int(os.environ.get("OPENAI_MAX_KEEPALIVE", "16")),
+        keepalive_expiry=float(os.environ.get("OPENAI_KEEPALIVE_EXPIRY", "30")),
+    )
+
+
+def _http_timeout() -> "httpx.Timeout":
+    import httpx
+
+    return httpx.Timeout(float(os.environ.get("OPENAI_TIMEOUT", "60")), connect=10.0)
+
+
+_lock = threading.Lock()
+_clients: Dict[Tuple[str, str], RateLimitedClient] = {}
+# keyed by the loop object itself, so an entry goes away with its loop and a
+# recycled id() can never hand out a client bound to a closed loop
+_async_clients: "weakref.WeakKeyDictionary[Any, Dict[Tuple[str, str], AsyncRateLimitedClient]]" = weakref.WeakKeyDictionary()
+_limiter: Optional[RateLimiter] = None
+
+
+def shared_limiter() -> RateLimiter:
+    global _limiter
+    with _lock:
+        if _limiter is None:
+            _limiter = RateLimiter.from_env()
+        return _limiter
+
+
+def get_client() -> RateLimitedClient:
+    """
+    Process-wide OpenAI client with HTTP connection pooling and keep-alive.
+    OPENAI_BASE_URL points it at a different endpoint (e.g. a local stand-in).
+    """
+    import httpx
+    from openai import OpenAI
+
+    api_key = _api_key()
+    base_url = os.environ.get("OPENAI_BASE_URL", "")
+    limiter = shared_limiter()
+    key = (api_key, base_url)
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            raw = OpenAI(
+                api_key=api_key,
+                base_url=base_url or None,
+                http_client=httpx.Client(limits=_http_limits(), timeout=_http_timeout()),
+                max_retries=0,  # retries are ours, so they respect the limiter
+            )
+            client = RateLimitedClient(raw, limiter, RetryPolicy.from_env())
+            _clients[key] = client
+        return client
+
+
+def get_async_client() -> AsyncRateLimitedClient:
+    """
+    AsyncOpenAI counterpart of get_client(). Async connection pools belong to
+    the event loop that opened them, so there is one client per running loop,
+    held only as long as the loop lives. Loops shut down by asyncio.run (or
+    loop.shutdown_asyncgens) close their client's pool on the way out.
+    """
+    import httpx
+    from openai import AsyncOpenAI
+
+    api_key = _api_key()
+    base_url = os.environ.get("OPENAI_BASE_URL", "")
+    limiter = shared_limiter()
+    loop = asyncio.get_running_loop()
+    key = (api_key, base_url)
+    with _lock:
+        clients = _async_clients.setdefault(loop, {})
+        client = clients.get(key)
+        if client is None:
+            raw = AsyncOpenAI(
+                api_key=api_key,
+                base_url=base_url or None,
+                http_client=httpx.AsyncClient(limits=_http_limits(), timeout=_http_timeout()),
+                max_retries=0,
+            )
+            client = AsyncRateLimitedClient(raw, limiter, RetryPolicy.from_env())
+            # the loop finalizes live async generators at shutdown; this one closes the pool
+            client.closer = _close_on_shutdown(loop, key, raw)
+            try:
+                client.closer.asend(None).send(None)  # runs to the yield; registers with the loop
+            except StopIteration:
+                pass
+            clients[key] = client
+        return client
+
+
+async def _close_on_shutdown(loop: Any, key: Tuple[str, str], raw: Any):
+    try:
+        yield
+    finally:
+        with _lock:
+            clients = _async_clients.get(loop)
+            if clients is not None:
+                clients.pop(key, None)
+                if not clients:
+                    del _async_clients[loop]
+        await raw.close()
+
+
+def reset_clients() -> None:
+    """Close pooled connections and forget cached clients (config changes, tests)."""
+    global _limiter
+    with _lock:
+        for c in _clients.values():
+            c.raw.close()
+        _clients.clear()
+        # async pools are closed by their own loop; just drop the references
+        _async_clients.clear()
+        _limiter = None
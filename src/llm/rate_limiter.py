@@ -0,0 +1,148 @@
+# src/llm/rate_limiter.py
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+# Endpoint types the limiter knows about. Embeddings and chat completions have
+# separate quotas upstream, so they get separate buckets here.
+ENDPOINT_EMBEDDINGS = "embeddings"
+ENDPOINT_CHAT = "chat"
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket refilled continuously at rate_per_minute.
+
+    reserve() debits immediately and returns how long the caller must wait
+    before its reservation is covered, so sync and async callers can share it.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        if rate_per_minute <= 0:
+            raise ValueError("rate_per_minute must be > 0")
+        self.rate = rate_per_minute / 60.0
+        self.capacity = float(capacity if capacity is not None else rate_per_minute)
+        self._level = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._level = min(self.capacity, self._level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, amount: float) -> float:
+        # a request larger than the bucket could never be admitted; clamp it
+        amount = min(float(amount), self.capacity)
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._level -= amount
+            if self._level >= 0:
+                return 0.0
+            return -self._level / self.rate
+
+    def refund(self, amount: float) -> None:
+        with self._lock:
+            self._refill(time.monotonic())
+            self._level = min(self.capacity, self._level + amount)
+
+
+@dataclass
+class EndpointLimits:
+    rpm: float
+    tpm: float
+
+
+class EndpointLimiter:
+    """
+    Requests-per-minute and tokens-per-minute buckets for one endpoint type,
+    plus a shared pause used when the server tells us to back off.
+    """
+
+    def __init__(self, limits: EndpointLimits):
+        self.limits = limits
+        self.requests = TokenBucket(limits.rpm) if limits.rpm > 0 else None
+        self.tokens = TokenBucket(limits.tpm) if limits.tpm > 0 else None
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self, est_tokens: int) -> float:
+        waits = [0.0]
+        if self.requests is not None:
+            waits.append(self.requests.reserve(1))
+        if self.tokens is not None and est_tokens > 0:
+            waits.append(self.tokens.reserve(est_tokens))
+        with self._lock:
+            waits.append(self._paused_until - time.monotonic())
+        return max(waits)
+
+    def settle(self, est_tokens: int, actual_tokens: Optional[int]) -> None:
+        """Give back tokens we over-estimated once the real usage is known."""
+        if self.tokens is None or actual_tokens is None:
+            return
+        diff = est_tokens - actual_tokens
+        if diff > 0:
+            self.tokens.refund(diff)
+
+    def release(self, est_tokens: int) -> None:
+        """Give back a whole reservation for an attempt that failed; it is reserved again on retry."""
+        if self.requests is not None:
+            self.requests.refund(1)
+        if self.tokens is not None and est_tokens > 0:
+            self.tokens.refund(est_tokens)
+
+    def pause(self, seconds: float) -> None:
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def acquire(self, est_tokens: int) -> float:
+        wait = self.reserve(est_tokens)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+def _env_float(name: str, default: float) -> float:
+    return float(os.environ.get(name, str(default)))
+
+
+class RateLimiter:
+    """
+    Per-endpoint-type limiter. Limits come from the environment; 0 disables a bucket.
+
+      OPENAI_CHAT_RPM / OPENAI_CHAT_TPM
+      OPENAI_EMBED_RPM / OPENAI_EMBED_TPM
+      RATE_LIMIT_SHARE   fraction of those limits this process may use (default 1),
+                         for N processes sharing one API key: 1/N each
+    """
+
+    def __init__(self, limits: Dict[str, EndpointLimits]):
+        self._endpoints = {name: EndpointLimiter(l) for name, l in limits.items()}
+
+    @classmethod
+    def from_env(cls) -> "RateLimiter":
+        share = _env_float("RATE_LIMIT_SHARE", 1.0)
+        if not 0 < share <= 1:
+            raise ValueError(f"RATE_LIMIT_SHARE must be in (0, 1], got {share}")
+        return cls({
+            ENDPOINT_CHAT: EndpointLimits(
+                rpm=_env_float("OPENAI_CHAT_RPM", 500) * share,
+                tpm=_env_float("OPENAI_CHAT_TPM", 200_000) * share,
+            ),
+            ENDPOINT_EMBEDDINGS: EndpointLimits(
+                rpm=_env_float("OPENAI_EMBED_RPM", 3000) * share,
+                tpm=_env_float("OPENAI_EMBED_TPM", 1_000_000) * share,
+            ),
+        })
+
+    def endpoint(self, name: str) -> EndpointLimiter:
+        if name not in self._endpoints:
+            raise ValueError(f"Unknown endpoint type: {name}")
+        return self._endpoints[name]
+
+
+def estimate_tokens(text: str) -> int:
+    # ~4 characters per token for English text; good enough for pacing
+    return len(text or "") // 4 + 1
@@ -0,0 +1,57 @@
+# src/models/spans.py
+"""
+Sentence/clause span offsets inside chunk text. Computed at ingest and
+stored in chunk metadata, read back at query time to select evidence, so
+this lives below both the ingestion and retrieval layers.
+"""
+import re
+from typing import List, Tuple
+
+# sentence ends, clause-level semicolons, and line breaks before list items ("1.", "a.", "•", "-")
+SPAN_BREAK_RE = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9•(\"“])|(?<=;)\s+|\n(?=\s*(?:\d+\.|[a-z]\.|•|-|\([a-z0-9]+\))\s)")
+
+
+def sentence_spans(text: str, min_len: int = 25) -> List[Tuple[int, int]]:
+    """
+    Sentence/clause boundaries as (start, end) offsets into text, whitespace
+    trimmed. Fragments shorter than min_len (list markers, stray headings)
+    are merged into the following span.
+    """
+    spans: List[Tuple[int, int]] = []
+    pending = None
+    pos = 0
+    for m in list(SPAN_BREAK_RE.finditer(text or "")) + [None]:
+        end = m.start() if m else len(text or "")
+        raw = text[pos:end]
+        lead = len(raw) - len(raw.lstrip())
+        s, e = pos + lead, pos + len(raw.rstrip())
+        if e > s:
+            if pending is not None:
+                s = pending
+                pending = None
+            if e - s < min_len and m is not None:
+                pending = s
+            else:
+                spans.append((s, e))
+        if m:
+            pos = m.end()
+    if pending is not None:
+        if spans:
+            spans[-1] = (spans[-1][0], len(text.rstrip()))
+        else:
+            spans.append((pending, len(text.rstrip())))
+    return spans
+
+
+def encode_spans(spans: List[Tuple[int, int]]) -> str:
+    # vector store metadata must be scalar, so spans are kept as "start-end,start-end"
+    return ",".join(f"{s}-{e}" for s, e in spans)
+
+
+def decode_spans(value: str) -> List[Tuple[int, int]]:
+    out = []
+    for part in (value or "").split(","):
+        if part:
+            s, _, e = part.partition("-")
+            out.append((int(s), int(e)))
+    return out
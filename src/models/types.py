@@ -1,7 +1,17 @@
 from dataclasses import dataclass
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 from enum import Enum
 
+# Records are slotted (no per-instance __dict__) and validated once, when they
+# are built from LLM JSON or vector store results; later stages read
+# attributes without re-checking. to_row/from_row give the positional form
+# used by models.codec.
+
+
+def _str_list(value: Any) -> List[str]:
+    if not isinstance(value, list):
+        return []
+    return [str(v) for v in value if v is not None]
 
 
 class AssumptionType(str,Enum):
@@ -9,18 +19,48 @@ class AssumptionType(str,Enum):
     A2_INTERPRETATION = "A2_INTERPRETATION"
     A3_MISSING_CONTEXT = "A3_MISSING_CONTEXT"
 
+_ASSUMPTION_TYPES = frozenset(t.value for t in AssumptionType)
+
 class Impact(str,Enum):
     LOW = "low"
     MEDIUM = "medium"
     HIGH = "high"
 
-@dataclass
+@dataclass(slots=True)
 class Assumption:
-    type: AssumptionType
+    # always the wire value (an AssumptionType value when known); unknown types
+    # from the model are kept as-is so the assumption gate can flag them
+    type: str
     text: str
     impact: Impact
 
-#######################################################################    
+    @classmethod
+    def from_dict(cls, data: Any) -> Optional["Assumption"]:
+        if not isinstance(data, dict):
+            return None
+        raw_type = data.get("type", "")
+        a_type = raw_type.value if isinstance(raw_type, AssumptionType) else str(raw_type).strip()
+        try:
+            impact = Impact(str(data.get("impact", "")).strip().lower())
+        except ValueError:
+            impact = Impact.MEDIUM
+        return cls(type=a_type, text=str(data.get("text", "")), impact=impact)
+
+    @property
+    def known_type(self) -> bool:
+        return self.type in _ASSUMPTION_TYPES
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"type": self.type, "text": self.text, "impact": self.impact.value}
+
+    def to_row(self) -> list:
+        return [self.type, self.text, self.impact.value]
+
+    @classmethod
+    def from_row(cls, row: list) -> "Assumption":
+        return cls.from_dict({"type": row[0], "text": row[1], "impact": row[2]})
+
+#######################################################################
 
 class RiskLevel(str, Enum):
     LOW = "low"
@@ -33,39 +73,140 @@ class DecisionStatus(str, Enum):
     REVIEW = "review_required"
     BLOCK = "do_not_use"
 
-@dataclass
+@dataclass(slots=True)
 class Chunk:
     id: str
     policy_id: str
     section_id: str
     text: str
     metadata: Dict [str, Any]
+    distance: Optional[float] = None
+
+    @classmethod
+    def from_hit(cls, chunk_id: str, text: Optional[str], metadata: Optional[Dict[str, Any]], distance: Optional[float] = None) -> "Chunk":
+        md = metadata or {}
+        policy_id, _, section_id = chunk_id.partition(":")
+        return cls(
+            id=chunk_id,
+            policy_id=str(md.get("policy_id", policy_id)),
+            section_id=str(md.get("section_id", section_id)),
+            text=text or "",
+            metadata=md,
+            distance=None if distance is None else float(distance),
+        )
+
+    def to_row(self) -> list:
+        return [self.id, self.policy_id, self.section_id, self.text, self.metadata, self.distance]
+
+    @classmethod
+    def from_row(cls, row: list) -> "Chunk":
+        return cls(*row)
+
+@dataclass(slots=True)
+class EvidenceSpan:
+    # id is "<policy_id>:<section_id>#s<index>"; start/end are offsets into the chunk text
+    id: str
+    chunk_id: str
+    index: int
+    start: int
+    end: int
+    text: str
+    score: float = 0.0
+
+    def to_row(self) -> list:
+        return [self.id, self.chunk_id, self.index, self.start, self.end, self.text, self.score]
 
-@dataclass
+    @classmethod
+    def from_row(cls, row: list) -> "EvidenceSpan":
+        return cls(*row)
+
+@dataclass(slots=True)
 class RetrievedContext:
     chunks: List[Chunk]
 
-@dataclass
+@dataclass(slots=True)
 class Claim:
     text: str
     citations: List[str]
 
-@dataclass
+    @classmethod
+    def from_dict(cls, data: Any) -> Optional["Claim"]:
+        if not isinstance(data, dict):
+            return None
+        return cls(text=str(data.get("text", "") or ""), citations=_str_list(data.get("citations")))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"text": self.text, "citations": list(self.citations)}
+
+    def to_row(self) -> list:
+        return [self.text, self.citations]
+
+    @classmethod
+    def from_row(cls, row: list) -> "Claim":
+        return cls(row[0], list(row[1]))
+
+@dataclass(slots=True)
 class AnswerProposal:
     claims: List[Claim]
     assumptions: List[Assumption]
     final_answer: str
 
-@dataclass
+    @classmethod
+    def from_dict(cls, data: Any) -> "AnswerProposal":
+        """Parses the answer model's JSON; malformed claims and assumptions are dropped."""
+        data = data if isinstance(data, dict) else {}
+        claims = data.get("claims", [])
+        assumptions = data.get("assumptions", [])
+        return cls(
+            claims=[c for c in map(Claim.from_dict, claims if isinstance(claims, list) else []) if c is not None],
+            assumptions=[a for a in map(Assumption.from_dict, assumptions if isinstance(assumptions, list) else []) if a is not None],
+            final_answer=str(data.get("final_answer", "")).strip(),
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "claims": [c.to_dict() for c in self.claims],
+            "assumptions": [a.to_dict() for a in self.assumptions],
+            "final_answer": self.final_answer,
+        }
+
+    def to_row(self) -> list:
+        return [[c.to_row() for c in self.claims], [a.to_row() for a in self.assumptions], self.final_answer]
+
+    @classmethod
+    def from_row(cls, row: list) -> "AnswerProposal":
+        return cls([Claim.from_row(c) for c in row[0]], [Assumption.from_row(a) for a in row[1]], row[2])
+
+@dataclass(slots=True)
 class PolicyAssessment:
     issues: List[str]
     risk_level: RiskLevel
     confidence: float
     is_compliant: bool
 
-@dataclass
+    def to_dict(self) -> Dict[str, Any]:
+        return {"issues": list(self.issues), "risk_level": self.risk_level.value,
+                "confidence": self.confidence, "is_compliant": self.is_compliant}
+
+    def to_row(self) -> list:
+        return [self.issues, self.risk_level.value, self.confidence, self.is_compliant]
+
+    @classmethod
+    def from_row(cls, row: list) -> "PolicyAssessment":
+        return cls(list(row[0]), RiskLevel(row[1]), float(row[2]), bool(row[3]))
+
+@dataclass(slots=True)
 class ComplianceDecision:
     status: DecisionStatus
     reasons: List[str]
     assessment: PolicyAssessment
 
+    def to_dict(self) -> Dict[str, Any]:
+        return {"status": self.status.value, "reasons": list(self.reasons), "assessment": self.assessment.to_dict()}
+
+    def to_row(self) -> list:
+        return [self.status.value, self.reasons, self.assessment.to_row()]
+
+    @classmethod
+    def from_row(cls, row: list) -> "ComplianceDecision":
+        return cls(DecisionStatus(row[0]), list(row[1]), PolicyAssessment.from_row(row[2]))
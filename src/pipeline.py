@@ -0,0 +1,407 @@
+# src/pipeline.py
+import asyncio
+import time
+from contextlib import nullcontext
+from dataclasses import dataclass, field, replace
+from typing import TYPE_CHECKING, Dict, List, Optional, Set, Tuple
+
+from agents.answer_agent import AnswerAgent
+from agents.policy_agent import PolicyAgent
+from agents.routing import ModelRouter, RouteDecision, StageStats
+from retrieval.evidence import select_evidence
+from retrieval.retriever import aretrieve_top_k, dedup_hits, retrieve_top_k
+from control.grounding_checks import citations_in_retrieved, citation_relevance_heuristic
+from control.evaluator import evaluate
+from control.hard_gates import run_hard_gates
+from control.assumption_gate import classify_assumptions
+from control.assumption_detector import context_flags, detect_assumptions
+from models.types import (
+    Assumption, AnswerProposal, Chunk, Claim, ComplianceDecision, DecisionStatus, EvidenceSpan, PolicyAssessment,
+)
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
+
+@dataclass
+class QuestionResult:
+    question: str
+    hits: List[Chunk]
+    proposal: AnswerProposal
+    assessment: PolicyAssessment
+    decision: ComplianceDecision
+    precheck_issues: List[str] = field(default_factory=list)
+    hard_issues: List[str] = field(default_factory=list)
+    override: str = ""
+    assumption_issues: List[str] = field(default_factory=list)
+    evidence: List[EvidenceSpan] = field(default_factory=list)
+    routing: List[RouteDecision] = field(default_factory=list)
+    # control-layer inputs as the agents returned them, before decide() merged
+    # detected assumptions and capped the assessment; kept for audit replay
+    proposed_assumptions: List[Assumption] = field(default_factory=list)
+    verifier_assessment: Optional[PolicyAssessment] = None
+    # wall time per stage in ms: retrieval (query embedding + vector search), answer, verify, control
+    timings: Dict[str, float] = field(default_factory=dict)
+
+
+def build_context_lines(hits: List[Chunk]) -> List[str]:
+    context_lines = []
+    for h in hits:
+        cid = h.id
+        txt = h.text.strip()
+        txt = " ".join(txt.split())
+        context_lines.append(f"[{cid}] {txt}")
+    return context_lines
+
+
+def retrieved_text_map(hits: List[Chunk]) -> Dict[str, str]:
+    return {h.id: h.text for h in hits}
+
+
+def build_context(
+    question: str, hits: List[Chunk], evidence_spans: int = 0
+) -> Tuple[List[str], Dict[str, str], List[EvidenceSpan]]:
+    """
+    Prompt lines and the id -> text map the gates check citations against.
+    With evidence_spans > 0 only the top spans of each hit are shown and
+    cited ("<chunk id>#s<n>"); a bare chunk id maps to just its shown spans.
+    """
+    if evidence_spans <= 0:
+        return build_context_lines(hits), retrieved_text_map(hits), []
+
+    evidence = select_evidence(question, hits, per_chunk=evidence_spans)
+    lines, text_map = evidence_context(evidence)
+    return lines, text_map, evidence
+
+
+def evidence_context(evidence: List[EvidenceSpan]) -> Tuple[List[str], Dict[str, str]]:
+    """Prompt lines and id -> text map for already selected evidence spans."""
+    lines = [f"[{sp.id}] {' '.join(sp.text.split())}" for sp in evidence]
+    text_map = {sp.id: sp.text for sp in evidence}
+    for sp in evidence:
+        text_map[sp.chunk_id] = (text_map.get(sp.chunk_id, "") + " " + sp.text).strip()
+    return lines, text_map
+
+
+def check_claims(claims: List[Claim], retrieved_map: Dict[str, str]) -> Tuple[List[str], List[str], List[int]]:
+    """
+    Deterministic claim checks. Returns (precheck_issues, hard_issues, failed):
+    prechecks are soft warnings, hard gate issues must block SAFE, and failed
+    lists the indices of claims with at least one hard gate issue.
+    """
+    retrieved_ids = set(retrieved_map.keys())
+
+    issues = []
+    for i, c in enumerate(claims):
+        bad = citations_in_retrieved(c, retrieved_ids)
+        if bad:
+            issues.append(f"CLAIM_{i}_CITES_UNKNOWN_IDS:{bad}")
+
+        cited_texts = [retrieved_map[x] for x in c.citations if x in retrieved_map]
+        if not citation_relevance_heuristic(c.text, cited_texts):
+            issues.append(f"CLAIM_{i}_CITATIONS_LOOK_WEAK")
+
+    hard_issues = []
+    failed = []
+    for i, c in enumerate(claims):
+        gate_issues = run_hard_gates(c, retrieved_map)
+        if gate_issues:
+            failed.append(i)
+        hard_issues.extend(f"CLAIM_{i}:{it}" for it in gate_issues)
+
+    return issues, hard_issues, failed
+
+
+def merge_assumptions(proposed: List[Assumption], detected: List[Assumption]) -> List[Assumption]:
+    # Merge + dedup by (type,text)
+    dedup = {}
+    for a in proposed + detected:
+        key = (a.type, a.text)
+        dedup[key] = a
+    return list(dedup.values())
+
+
+def _ms_since(started: float) -> float:
+    return (time.perf_counter() - started) * 1000.0
+
+
+def with_stats(agent):
+    """Per-request copy of an agent with a fresh usage sink, so shared agents don't mix requests."""
+    return replace(agent, stats=StageStats(model=agent.model))
+
+
+def answer_route(agent, router: ModelRouter, seconds: float) -> RouteDecision:
+    decision = RouteDecision(stage="answer", model=agent.model, tier="static", reason="stage_config",
+                             baseline_model=agent.model)
+    return router.settle(decision, agent.stats, seconds)
+
+
+def decide(
+    question: str,
+    context_lines: List[str],
+    proposal: AnswerProposal,
+    assessment: PolicyAssessment,
+    hard_issues: List[str],
+    flags: Optional[Set[str]] = None,
+) -> Tuple[ComplianceDecision, str, List[str]]:
+    """
+    Applies the deterministic control layer on top of the LLM assessment.
+    Precedence: assumption BLOCK > assumption REVIEW > hard gates > evaluator.
+    Mutates proposal.assumptions and assessment (confidence cap, issues) like the CLI always has.
+    `flags` are the rule-pack flags of the context shown (see context_flags).
+    Returns (decision, assumption_override, assumption_issues).
+    """
+    detected = detect_assumptions(question, proposal.claims, context_lines, flags)
+    proposal.assumptions = merge_assumptions(proposal.assumptions, detected)
+
+    override, cap, a_issues = classify_assumptions(proposal.assumptions)
+    if assessment.confidence > cap:
+        assessment.confidence = cap
+    if a_issues:
+        assessment.issues.extend(a_issues)
+
+    if override == "BLOCK":
+        return ComplianceDecision(status=DecisionStatus.BLOCK, reasons=list(a_issues), assessment=assessment), override, a_issues
+
+    decision = evaluate(assessment)
+
+    if override == "REVIEW":
+        return ComplianceDecision(status=DecisionStatus.REVIEW, reasons=list(a_issues), assessment=assessment), override, a_issues
+
+    # DECISION OVERRIDE: hard gates > LLM verifier
+    if hard_issues:
+        return ComplianceDecision(status=DecisionStatus.BLOCK, reasons=list(hard_issues), assessment=assessment), override, a_issues
+
+    return decision, override, a_issues
+
+
+def run_question(
+    question: str,
+    collection,
+    embed_model: str,
+    top_k: int = 5,
+    answer_agent: Optional[AnswerAgent] = None,
+    policy_agent: Optional[PolicyAgent] = None,
+    evidence_spans: int = 0,
+    router: Optional[ModelRouter] = None,
+) -> QuestionResult:
+    timings: Dict[str, float] = {}
+    started = time.perf_counter()
+    hits = retrieve_top_k(collection, question, embed_model, k=top_k)
+    timings["retrieval"] = _ms_since(started)
+    hits = dedup_hits(hits, max_results=top_k)
+    context_lines, retrieved_map, evidence = build_context(question, hits, evidence_spans)
+
+    router = router or ModelRouter.from_env()
+    agent = with_stats(answer_agent or AnswerAgent.from_env())
+    started = time.perf_counter()
+    proposal = agent.run(question, context_lines)
+    routing = [answer_route(agent, router, time.perf_counter() - started)]
+    timings["answer"] = routing[0].latency_ms
+
+    started = time.perf_counter()
+    precheck, hard_issues, failed = check_claims(proposal.claims, retrieved_map)
+    timings["control"] = _ms_since(started)
+
+    verifier = policy_agent or PolicyAgent.from_env()
+    route = router.route(verifier.model, precheck, hard_issues)
+    verifier = replace(verifier, model=route.model, stats=StageStats(model=route.model))
+    started = time.perf_counter()
+    if verifier.claims_per_request:
+        assessment = verifier.run_claims(question, proposal.claims, retrieved_map, skip=failed)
+    else:
+        assessment = verifier.run(question, context_lines, proposal.claims)
+    routing.append(router.settle(route, verifier.stats, time.perf_counter() - started))
+    timings["verify"] = routing[-1].latency_ms
+
+    started = time.perf_counter()
+    proposed, raw = list(proposal.assumptions), PolicyAssessment.from_row(assessment.to_row())
+    decision, override, a_issues = decide(
+        question, context_lines, proposal, assessment, hard_issues, context_flags(hits, evidence=evidence)
+    )
+    timings["control"] += _ms_since(started)
+    return QuestionResult(
+        question=question, hits=hits, proposal=proposal, assessment=decision.assessment, decision=decision,
+        precheck_issues=precheck, hard_issues=hard_issues, override=override, assumption_issues=a_issues,
+        evidence=evidence, routing=routing, proposed_assumptions=proposed, verifier_assessment=raw,
+        timings=timings,
+    )
+
+
+async def answer_question(
+    question: str,
+    collection,
+    embed_model: str,
+    top_k: int = 5,
+    answer_agent: Optional[AnswerAgent] = None,
+    policy_agent: Optional[PolicyAgent] = None,
+    executor: Optional["Executor"] = None,
+    evidence_spans: int = 0,
+    router: Optional[ModelRouter] = None,
+    stages=None,
+) -> QuestionResult:
+    """
+    asyncio version of run_question. Network stages await the async OpenAI
+    client; gate work runs in `executor` (default: the loop's thread pool) so
+    many questions can share one event loop. `stages` (serving.admission.StageLimits)
+    bounds how many pipelines are in each network stage at once.
+    """
+    loop = asyncio.get_running_loop()
+
+    def stage(name: str):
+        return stages.stage(name) if stages is not None else nullcontext()
+
+    timings: Dict[str, float] = {}
+    started = time.perf_counter()
+    async with stage("embedding"):
+        hits = await aretrieve_top_k(collection, question, embed_model, k=top_k)
+    timings["retrieval"] = _ms_since(started)
+    hits = dedup_hits(hits, max_results=top_k)
+    context_lines, retrieved_map, evidence = build_context(question, hits, evidence_spans)
+
+    router = router or ModelRouter.from_env()
+    agent = with_stats(answer_agent or AnswerAgent.from_env())
+    started = time.perf_counter()
+    async with stage("answer"):
+        proposal = await agent.arun(question, context_lines)
+    routing = [answer_route(agent, router, time.perf_counter() - started)]
+    timings["answer"] = routing[0].latency_ms
+
+    verifier = policy_agent or PolicyAgent.from_env()
+    gates = loop.run_in_executor(executor, check_claims, proposal.claims, retrieved_map)
+    if verifier.claims_per_request or router.enabled(verifier.model):
+        # per-claim verification skips claims the gates already failed and
+        # routing picks the model from their result, so both wait for them
+        started = time.perf_counter()
+        precheck, hard_issues, failed = await gates
+        timings["control"] = _ms_since(started)
+        route = router.route(verifier.model, precheck, hard_issues)
+        verifier = replace(verifier, model=route.model, stats=StageStats(model=route.model))
+        started = time.perf_counter()
+        async with stage("verify"):
+            if verifier.claims_per_request:
+                assessment = await verifier.arun_claims(question, proposal.claims, retrieved_map, skip=failed)
+            else:
+                assessment = await verifier.arun(question, context_lines, proposal.claims)
+    else:
+        # claim gates don't depend on the verifier, so run them while it is in flight
+        verifier = with_stats(verifier)
+        started = time.perf_counter()
+        async with stage("verify"):
+            assessment = await verifier.arun(question, context_lines, proposal.claims)
+        gated = time.perf_counter()
+        precheck, hard_issues, _ = await gates
+        timings["control"] = _ms_since(gated)  # only the part not hidden behind the verifier
+        route = router.route(verifier.model, precheck, hard_issues)
+    routing.append(router.settle(route, verifier.stats, time.perf_counter() - started))
+    timings["verify"] = routing[-1].latency_ms
+
+    started = time.perf_counter()
+    proposed, raw = list(proposal.assumptions), PolicyAssessment.from_row(assessment.to_row())
+    decision, override, a_issues = await loop.run_in_executor(
+        executor, decide, question, context_lines, proposal, assessment, hard_issues, context_flags(hits, evidence=evidence)
+    )
+    timings["control"] += _ms_since(started)
+    return QuestionResult(
+        question=question, hits=hits, proposal=proposal, assessment=decision.assessment, decision=decision,
+        precheck_issues=precheck, hard_issues=hard_issues, override=override, assumption_issues=a_issues,
+        evidence=evidence, routing=routing, proposed_assumptions=proposed, verifier_assessment=raw,
+        timings=timings,
+    )
+
+
+def print_result(result: QuestionResult) -> None:
+    proposal = result.proposal
+    assessment = result.assessment
+    decision = result.decision
+
+    print("\n=== Retrieved Policy Excerpts ===")
+    for h in result.hits:
+        preview = h.text.replace("\n", " ")
+        src = h.metadata.get("file_name")
+        dist = f"{h.distance:.4f}" if h.distance is not None else "n/a"
+        print(f"- [{h.policy_id}:{h.section_id}] dist={dist} src={src} | {preview}")
+
+    if result.evidence:
+        print("\n=== Evidence Spans ===")
+        for sp in result.evidence:
+            print(f"- [{sp.id}] score={sp.score:.2f} | {' '.join(sp.text.split())}")
+
+    if result.routing:
+        print("\n=== Model Routing ===")
+        for r in result.routing:
+            saved = f" saved=${r.saved_usd:.6f}" if r.saved_usd is not None else ""
+            print(f"- {r.stage}: {r.model} ({r.tier}, {r.reason}) {r.latency_ms:.0f}ms "
+                  f"tokens={r.prompt_tokens}+{r.completion_tokens}{saved}")
+
+    # Lightweight pre-checks (soft warnings)
+    print("\n Verify issues in the answer")
+    if result.precheck_issues:
+        print("\n[PreCheck Issues]")
+        for it in result.precheck_issues:
+            print("-", it)
+
+    print("\n=== Answer (Summary) ===")
+    if not proposal.claims:
+        print("- (no claims)")
+    for c in proposal.claims:
+        cites = " ".join([f"[{x}]" for x in c.citations])
+        print(f"- {c.text} {cites}")
+
+    # HARD GATES (must block SAFE)
+    hard_issues = result.hard_issues
+    if hard_issues:
+        print("\n=== Hard Gate Failures ===")
+        for it in hard_issues:
+            print("-", it)
+
+    print("\n=== Assumptions ===")
+    if proposal.assumptions:
+        for a in proposal.assumptions:
+            print(f"- {a.type} ({a.impact.value}): {a.text}")
+    else:
+        print("- None")
+    print("Override:", result.override or "(none)")
+
+    # override final decision
+    if result.override == "BLOCK":
+        print("\n=== Final Decision Override (Assumptions) ===")
+        print("do_not_use")
+        for it in result.assumption_issues:
+            print("-", it)
+        return
+
+    print(f"Confidence: {assessment.confidence:.2f}")
+
+    if result.override == "REVIEW":
+        print("\n=== Final Decision Override (Assumptions) ===")
+        print("review_required")
+        for it in result.assumption_issues:
+            print("-", it)
+        return
+
+    # DECISION OVERRIDE: hard gates > LLM verifier
+    print("\n=== Hard Gates Summary ===")
+    print("Hard issues count:", len(hard_issues))
+    if hard_issues:
+        print("\n=== Final Decision Override (Hard Gates) ===")
+        print("do_not_use")
+        for it in hard_issues:
+            print("-", it)
+        return
+
+    print("\n=== Policy Verification ===")
+    print("Compliant:", assessment.is_compliant)
+    print("Risk:", assessment.risk_level.value)
+    print("Confidence:", assessment.confidence)
+    print("Issues:", assessment.issues)
+
+    print("\n=== Final Decision ===")
+    print(decision.status.value)
+
+    if assessment.issues:
+        print("Notes:")
+        for it in assessment.issues:
+            print("-", it)
+    else:
+        print("- No issues detected. Answer is compliant.")
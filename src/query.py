@@ -0,0 +1,54 @@
+# src/query.py
+"""
+Query-only entry point: answers against an existing index and never imports
+the ingestion stack (pypdf, loader, chunking, embedder). Run `main.py` or the
+indexer first to build the index.
+"""
+import os
+import sys
+import traceback
+
+from dotenv import load_dotenv
+
+from governance.logger import AuditStore
+from retrieval.store import open_collection
+from retrieval.versions import current_version
+from pipeline import print_result, run_question
+
+load_dotenv()
+
+
+def main() -> None:
+    try:
+        if len(sys.argv) < 2:
+            print("Usage: python src/query.py \"<question>\"")
+            raise SystemExit(1)
+
+        question = sys.argv[1]
+
+        persist_dir = os.environ.get("CHROMA_DIR", "vectorstore/index")
+        embed_model = os.environ.get("EMBED_MODEL", "text-embedding-3-small")
+        top_k = int(os.environ.get("TOP_K", "5"))
+        evidence_spans = int(os.environ.get("EVIDENCE_SPANS", "0"))
+
+        collection = open_collection(persist_dir)
+        if collection.count() == 0:
+            print(f"No indexed policies found at {persist_dir}. Run src/main.py to build the index first.")
+            raise SystemExit(1)
+
+        result = run_question(question, collection, embed_model, top_k=top_k, evidence_spans=evidence_spans)
+        audit = AuditStore.from_env()
+        if audit is not None:
+            audit.record(result, index_version=current_version(persist_dir), embed_model=embed_model)
+            audit.close()
+        print_result(result)
+
+    except SystemExit:
+        raise
+    except Exception as e:
+        print(e)
+        traceback.print_exc()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+# src/retrieval/evidence.py
+"""
+Evidence spans: the sentences/clauses inside retrieved chunks that best match
+the question. Span offsets are recorded at ingest (metadata "spans"); chunks
+from older indexes are split on the fly with the same rules.
+
+A span is cited as "<policy_id>:<section_id>#s<n>", so the chunk id is
+always a prefix of the citation.
+"""
+import math
+from typing import Dict, List, Tuple
+
+from control.grounding_checks import keyword_set
+from models.spans import decode_spans, sentence_spans
+from models.types import Chunk, EvidenceSpan
+
+SPAN_SEP = "#s"
+
+
+def span_id(chunk_id: str, index: int) -> str:
+    return f"{chunk_id}{SPAN_SEP}{index}"
+
+
+def chunk_spans(chunk: Chunk) -> List[Tuple[int, int]]:
+    encoded = chunk.metadata.get("spans")
+    spans = decode_spans(encoded) if isinstance(encoded, str) and encoded else sentence_spans(chunk.text)
+    return spans or [(0, len(chunk.text))]
+
+
+def select_evidence(question: str, hits: List[Chunk], per_chunk: int = 3) -> List[EvidenceSpan]:
+    """
+    Scores every span of every hit by question keywords (weighted by how rare
+    they are among the candidate spans) and keeps the top `per_chunk` spans
+    of each hit, in hit order and then text order. A hit with no matching
+    span keeps its first span so no retrieved chunk disappears entirely.
+    """
+    qk = keyword_set(question)
+    candidates: List[Tuple[Chunk, int, int, int, set]] = []
+    df: Dict[str, int] = {}
+    for h in hits:
+        for i, (s, e) in enumerate(chunk_spans(h)):
+            kw = keyword_set(h.text[s:e]) & qk
+            candidates.append((h, i, s, e, kw))
+            for w in kw:
+                df[w] = df.get(w, 0) + 1
+
+    n = max(1, len(candidates))
+    by_chunk: Dict[str, List[EvidenceSpan]] = {}
+    for h, i, s, e, kw in candidates:
+        score = sum(math.log(1.0 + n / df[w]) for w in kw)
+        by_chunk.setdefault(h.id, []).append(
+            EvidenceSpan(id=span_id(h.id, i), chunk_id=h.id, index=i, start=s, end=e, text=h.text[s:e], score=round(score, 4))
+        )
+
+    selected: List[EvidenceSpan] = []
+    for h in hits:
+        spans = by_chunk.get(h.id, [])
+        if not spans:
+            continue
+        top = sorted(spans, key=lambda sp: (-sp.score, sp.index))[:max(1, per_chunk)]
+        if all(sp.score == 0 for sp in top):
+            top = top[:1]
+        selected.extend(sorted(top, key=lambda sp: sp.index))
+    return selected
@@ -0,0 +1,287 @@
+# src/retrieval/quantized.py
+"""
+Quantized inverted-list first pass with exact rescoring.
+
+Layout of an index directory:
+  meta.json      - dim, count, quantization, lists, format version
+  ids.json       - chunk ids in row order (rows are grouped by list)
+  quant.npy      - int8 or float16 vectors (L2-normalized before quantizing)
+  scales.npy     - per-row float32 scale (int8 only)
+  centroids.npy  - float32 list centroids (spherical k-means)
+  offsets.npy    - lists + 1 row offsets: list i is rows offsets[i]:offsets[i+1]
+
+Search scores the centroids, scans only the quantized rows of the nprobe
+closest lists and keeps the best k * rescore_factor candidates. Those are
+rescored exactly against the float32 vectors the vector store already holds,
+fetched together with their documents, so full-precision vectors are kept in
+one place only.
+
+Off unless VECTOR_QUANTIZATION is set. Measured with benchmarks/quantization.py
+(20k x 512 synthetic vectors in 2000 clusters, k=5): a float32 brute-force scan
+takes ~4.9 ms per query; int8 with nprobe=8 scans ~8% of the rows in ~0.5 ms,
+with a quarter of the first-pass memory, at recall@5 0.977 (0.996 with
+nprobe=32). float16 has to be upcast per block and is slower than int8. On
+vectors with no cluster structure recall falls to ~0.5, so measure with real
+vectors (--embeddings) before enabling it.
+"""
+import json
+import os
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+FORMAT_VERSION = 2
+QUANTIZATIONS = {"int8", "float16", "float32"}
+MIN_ROWS_PER_LIST = 64  # below this, probing lists costs more than scanning everything
+KMEANS_ITERATIONS = 10
+KMEANS_SAMPLE_PER_LIST = 64
+ASSIGN_ROWS = 8192
+
+
+def _normalize(mat: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(mat, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return mat / norms
+
+
+def quantize(mat: np.ndarray, quantization: str) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """Returns (quantized_matrix, per_row_scales or None)."""
+    if quantization == "int8":
+        scales = np.abs(mat).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        q = np.clip(np.rint(mat / scales[:, None]), -127, 127).astype(np.int8)
+        return q, scales.astype(np.float32)
+    if quantization == "float16":
+        return mat.astype(np.float16), None
+    if quantization == "float32":
+        return mat.astype(np.float32), None
+    raise ValueError(f"Unknown quantization: {quantization} (expected one of {sorted(QUANTIZATIONS)})")
+
+
+def default_lists(count: int) -> int:
+    # ~sqrt(N) lists of ~sqrt(N) rows each; one list (a plain scan) for small indexes
+    return max(1, min(int(round(np.sqrt(count))), count // MIN_ROWS_PER_LIST))
+
+
+def _assign(mat: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    out = np.empty(mat.shape[0], dtype=np.int64)
+    for start in range(0, mat.shape[0], ASSIGN_ROWS):
+        out[start:start + ASSIGN_ROWS] = np.argmax(mat[start:start + ASSIGN_ROWS] @ centroids.T, axis=1)
+    return out
+
+
+def train_lists(mat: np.ndarray, lists: int, seed: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+    """Spherical k-means on a sample of the (normalized) rows; returns (centroids, assignment of every row)."""
+    rng = np.random.default_rng(seed)
+    n = mat.shape[0]
+    sample = mat[rng.choice(n, size=min(n, lists * KMEANS_SAMPLE_PER_LIST), replace=False)]
+    centroids = sample[rng.choice(sample.shape[0], size=lists, replace=False)].copy()
+    for _ in range(KMEANS_ITERATIONS):
+        assign = _assign(sample, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, sample)
+        empty = ~np.bincount(assign, minlength=lists).astype(bool)
+        # an empty list is re-seeded from a random sample row
+        sums[empty] = sample[rng.choice(sample.shape[0], size=int(empty.sum()))]
+        centroids = _normalize(sums)
+    return centroids.astype(np.float32), _assign(mat, centroids)
+
+
+class QuantizedIndex:
+    def __init__(
+        self,
+        ids: List[str],
+        quant: np.ndarray,
+        scales: Optional[np.ndarray],
+        centroids: np.ndarray,
+        offsets: np.ndarray,
+        quantization: str,
+        nprobe: int = 8,
+    ):
+        self.ids = ids
+        self.quant = quant
+        self.scales = scales
+        self.centroids = centroids
+        self.offsets = offsets
+        self.quantization = quantization
+        self.nprobe = max(1, nprobe)
+
+    @property
+    def dim(self) -> int:
+        return int(self.quant.shape[1])
+
+    @property
+    def lists(self) -> int:
+        return int(self.centroids.shape[0])
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def nbytes_first_pass(self) -> int:
+        extra = self.scales.nbytes if self.scales is not None else 0
+        return int(self.quant.nbytes + extra + self.centroids.nbytes + self.offsets.nbytes)
+
+    @classmethod
+    def from_embeddings(
+        cls, ids: Sequence[str], embeddings: Any, quantization: str, lists: Optional[int] = None, nprobe: int = 8,
+    ) -> "QuantizedIndex":
+        if len(ids) == 0:
+            raise ValueError("No embeddings to index.")
+        full = _normalize(np.asarray(embeddings, dtype=np.float32).reshape(len(ids), -1))
+        lists = default_lists(len(ids)) if lists is None else max(1, min(lists, len(ids)))
+        if lists > 1:
+            centroids, assign = train_lists(full, lists)
+            order = np.argsort(assign, kind="stable")
+            offsets = np.concatenate([[0], np.cumsum(np.bincount(assign, minlength=lists))])
+        else:
+            centroids = _normalize(full.mean(axis=0, keepdims=True))
+            order = np.arange(len(ids))
+            offsets = np.array([0, len(ids)])
+        quant, scales = quantize(full[order], quantization)
+        return cls([ids[int(i)] for i in order], quant, scales, centroids,
+                   offsets.astype(np.int64), quantization, nprobe=nprobe)
+
+    def save(self, path: str) -> None:
+        root = Path(path)
+        root.mkdir(parents=True, exist_ok=True)
+        np.save(root / "quant.npy", self.quant)
+        if self.scales is not None:
+            np.save(root / "scales.npy", self.scales)
+        elif (root / "scales.npy").exists():
+            (root / "scales.npy").unlink()
+        np.save(root / "centroids.npy", self.centroids)
+        np.save(root / "offsets.npy", self.offsets)
+        (root / "ids.json").write_text(json.dumps(self.ids), encoding="utf-8")
+        meta = {
+            "format_version": FORMAT_VERSION,
+            "quantization": self.quantization,
+            "dim": self.dim,
+            "count": len(self.ids),
+            "lists": self.lists,
+        }
+        # meta.json last: its presence marks a complete index
+        (root / "meta.json").write_text(json.dumps(meta, indent=2), encoding="utf-8")
+
+    @classmethod
+    def load(cls, path: str, nprobe: int = 8) -> "QuantizedIndex":
+        root = Path(path)
+        meta = json.loads((root / "meta.json").read_text(encoding="utf-8"))
+        if meta.get("format_version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported quantized index format: {meta.get('format_version')}")
+        ids = json.loads((root / "ids.json").read_text(encoding="utf-8"))
+        quant = np.load(root / "quant.npy")
+        scales = np.load(root / "scales.npy") if (root / "scales.npy").exists() else None
+        return cls(ids, quant, scales, np.load(root / "centroids.npy"), np.load(root / "offsets.npy"),
+                   meta["quantization"], nprobe=nprobe)
+
+    @staticmethod
+    def exists(path: str) -> bool:
+        # sidecars in an older format (without lists) are ignored, not misread
+        try:
+            meta = json.loads((Path(path) / "meta.json").read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return False
+        return meta.get("format_version") == FORMAT_VERSION
+
+    def _query_vector(self, query: Sequence[float]) -> np.ndarray:
+        q = np.asarray(query, dtype=np.float32)
+        if q.shape[0] != self.dim:
+            raise ValueError(f"Query has dim {q.shape[0]} but index has dim {self.dim}")
+        norm = np.linalg.norm(q)
+        return q / norm if norm else q
+
+    def candidates(self, query: Sequence[float], n: int) -> List[str]:
+        """Ids of the n best rows by quantized score among the probed lists (at least n rows are scanned)."""
+        if not self.ids or n <= 0:
+            return []
+        q = self._query_vector(query)
+        order = np.argsort(-(self.centroids @ q)) if self.lists > 1 else np.zeros(1, dtype=np.int64)
+        rows: List[np.ndarray] = []
+        scores: List[np.ndarray] = []
+        scanned = 0
+        for probed, lst in enumerate(order):
+            if probed >= self.nprobe and scanned >= n:
+                break
+            lo, hi = int(self.offsets[lst]), int(self.offsets[lst + 1])
+            if lo == hi:
+                continue
+            s = self.quant[lo:hi].astype(np.float32, copy=False) @ q
+            if self.scales is not None:
+                s *= self.scales[lo:hi]
+            rows.append(np.arange(lo, hi))
+            scores.append(s)
+            scanned += hi - lo
+        all_rows, all_scores = np.concatenate(rows), np.concatenate(scores)
+        n = min(n, all_rows.shape[0])
+        top = np.argpartition(-all_scores, n - 1)[:n]
+        top = top[np.argsort(-all_scores[top])]
+        return [self.ids[int(all_rows[i])] for i in top]
+
+    def search(
+        self,
+        query: Sequence[float],
+        k: int,
+        vectors: Callable[[List[str]], Any],
+        rescore_factor: int = 4,
+    ) -> List[Tuple[str, float]]:
+        """Top-k (id, cosine similarity), best first; vectors(ids) returns their full-precision rows."""
+        cand = self.candidates(query, max(k, k * rescore_factor))
+        if not cand or k <= 0:
+            return []
+        q = self._query_vector(query)
+        exact = _normalize(np.asarray(vectors(cand), dtype=np.float32).reshape(len(cand), -1)) @ q
+        order = np.argsort(-exact)[:k]
+        return [(cand[int(i)], float(exact[i])) for i in order]
+
+
+class QuantizedCollection:
+    """
+    Wraps a Chroma collection so retrieve_top_k can use the quantized index for
+    the first pass. Candidates' documents, metadata and float32 embeddings (for
+    rescoring) come from Chroma in one get().
+    """
+
+    def __init__(self, collection, index: QuantizedIndex, rescore_factor: int = 4):
+        self.collection = collection
+        self.index = index
+        self.rescore_factor = rescore_factor
+
+    def count(self) -> int:
+        return self.collection.count()
+
+    def get(self, *args, **kwargs):
+        return self.collection.get(*args, **kwargs)
+
+    def query(self, query_embeddings, n_results: int = 10, include=None) -> Dict[str, Any]:
+        out: Dict[str, List[Any]] = {"ids": [], "documents": [], "metadatas": [], "distances": []}
+        for emb in query_embeddings:
+            fetched: Dict[str, Any] = {"ids": []}
+
+            def vectors(ids: List[str]) -> Any:
+                fetched.update(self.collection.get(ids=ids, include=["documents", "metadatas", "embeddings"]))
+                by_id = {cid: i for i, cid in enumerate(fetched["ids"])}
+                # ids the store no longer has score lowest and are dropped below
+                return [fetched["embeddings"][by_id[cid]] if cid in by_id else np.zeros(self.index.dim) for cid in ids]
+
+            ranked = self.index.search(emb, n_results, vectors, rescore_factor=self.rescore_factor)
+            by_id = {cid: i for i, cid in enumerate(fetched["ids"])}
+            keep = [(cid, score) for cid, score in ranked if cid in by_id]
+            out["ids"].append([cid for cid, _ in keep])
+            out["documents"].append([fetched["documents"][by_id[cid]] for cid, _ in keep])
+            out["metadatas"].append([fetched["metadatas"][by_id[cid]] for cid, _ in keep])
+            # cosine distance, so smaller is better like Chroma's
+            out["distances"].append([1.0 - score for _, score in keep])
+        return out
+
+
+def build_from_collection(collection, path: str, quantization: str) -> QuantizedIndex:
+    res = collection.get(include=["embeddings"])
+    index = QuantizedIndex.from_embeddings(res["ids"], res["embeddings"], quantization)
+    index.save(path)
+    return index
+
+
+def quantized_dir(index_dir: str) -> str:
+    # lives inside the index directory so it is versioned together with it
+    return os.path.join(index_dir, "quantized")
@@ -1,51 +1,51 @@
-import os
+import asyncio
 
 from dotenv import load_dotenv
-from openai import OpenAI
 from typing import List, Dict, Any
 
+from llm.client import embedding_options, get_async_client, get_client
+from models.types import Chunk
+
 load_dotenv()
 
 def embed_query(query: str, model:str) -> List[float]:
-    api_key = os.environ.get("OPENAI_API_KEY","")
-    if not api_key:
-        raise RuntimeError("OPENAI_API_KEY is missing. Cannot embed")
-    
-    oai = OpenAI(api_key=api_key)
-    resp = oai.embeddings.create(model=model, input=query)
+    oai = get_client()
+    resp = oai.embeddings.create(model=model, input=query, **embedding_options())
     return resp.data[0].embedding
 
-def retrieve_top_k(collection, question: str, embed_model: str, k: int = 5) -> List[Dict[str, Any]]:
-    
-    q_emb = embed_query(question, embed_model)
+async def aembed_query(query: str, model: str) -> List[float]:
+    oai = get_async_client()
+    resp = await oai.embeddings.create(model=model, input=query, **embedding_options())
+    return resp.data[0].embedding
 
-    res = collection.query(
+def _hits_from_result(res: Dict[str, Any]) -> List[Chunk]:
+    ids, docs, metas, dists = res["ids"][0], res["documents"][0], res["metadatas"][0], res["distances"][0]
+    return [Chunk.from_hit(ids[i], docs[i], metas[i], dists[i]) for i in range(len(ids))]
+
+def _query(collection, q_emb: List[float], k: int) -> Dict[str, Any]:
+    return collection.query(
         query_embeddings = [q_emb],
         n_results = k,
         include=["documents","metadatas","distances"]
     )
+
+def retrieve_top_k(collection, question: str, embed_model: str, k: int = 5) -> List[Chunk]:
     
-    hits = []
-
-    for i in range(len(res["ids"][0])):
-        chunk_id = res["ids"][0][i]
-        hits.append(
-            {
-                "id": chunk_id,
-                "text": res["documents"][0][i],
-                "metadata": res["metadatas"][0][i],
-                "distance": res["distances"][0][i]
-            }
-        )
-        
-    return hits
+    q_emb = embed_query(question, embed_model)
+    return _hits_from_result(_query(collection, q_emb, k))
+
+async def aretrieve_top_k(collection, question: str, embed_model: str, k: int = 5) -> List[Chunk]:
+    q_emb = await aembed_query(question, embed_model)
+    # the vector store client is synchronous; keep it off the event loop
+    res = await asyncio.to_thread(_query, collection, q_emb, k)
+    return _hits_from_result(res)
 
 def dedup_hits(hits, max_results=5):
     seen_ids = set()
     unique_hits = []
     for h in hits:
-        if h["id"] in seen_ids:
+        if h.id in seen_ids:
             continue
-        seen_ids.add(h["id"])
+        seen_ids.add(h.id)
         unique_hits.append(h)
     return unique_hits
\ No newline at end of file
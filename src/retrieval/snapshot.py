@@ -0,0 +1,345 @@
+# src/retrieval/snapshot.py
+"""
+Portable index snapshot, independent of the vector store's on-disk format.
+
+  manifest.json   format/version, embed model + dimensions, row count, corpus manifest
+  embeddings.f32  count x dim little-endian float32, row-major, contiguous
+  chunks.jsonl    one {"id", "text", "metadata"} object per row, same order
+  offsets.u64     count + 1 little-endian uint64 byte offsets into chunks.jsonl
+
+Everything is memory-mapped on open, so a node can serve queries from a
+snapshot (SnapshotCollection) or load it into Chroma without embedding calls.
+"""
+import json
+import mmap
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+SNAPSHOT_FORMAT = "policy-index-snapshot"
+SNAPSHOT_VERSION = 1
+MANIFEST = "manifest.json"
+EMBEDDINGS = "embeddings.f32"
+CHUNKS = "chunks.jsonl"
+OFFSETS = "offsets.u64"
+PAGE_SIZE = 1000
+
+
+def iter_collection(collection, page_size: int = PAGE_SIZE) -> Iterator[Dict[str, Any]]:
+    """Pages through a Chroma collection, yielding get() results with embeddings."""
+    offset = 0
+    while True:
+        res = collection.get(
+            include=["embeddings", "documents", "metadatas"], limit=page_size, offset=offset,
+        )
+        if not res["ids"]:
+            return
+        yield res
+        offset += len(res["ids"])
+
+
+def write_snapshot(
+    out_dir: str,
+    pages: Iterator[Dict[str, Any]],
+    embed_model: str,
+    embed_dimensions: str = "",
+    corpus: Optional[Dict[str, Any]] = None,
+    extra: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Writes a snapshot from pages shaped like Chroma get() results
+    (ids, documents, metadatas, embeddings). The snapshot is assembled in a
+    temp directory and renamed into place, so a reader never sees half of one.
+    """
+    final = Path(out_dir)
+    if final.exists():
+        raise FileExistsError(f"Snapshot already exists: {out_dir}")
+    tmp = final.with_name(final.name + f".tmp-{os.getpid()}")
+    tmp.mkdir(parents=True)
+
+    count, dim = 0, None
+    offsets: List[int] = [0]
+    seen = set()
+    try:
+        with open(tmp / EMBEDDINGS, "wb") as ef, open(tmp / CHUNKS, "wb") as cf:
+            for page in pages:
+                emb = np.asarray(page["embeddings"], dtype="<f4")
+                if dim is None:
+                    dim = int(emb.shape[1])
+                elif emb.shape[1] != dim:
+                    raise ValueError(f"Inconsistent embedding dim: {emb.shape[1]} != {dim}")
+                ef.write(emb.tobytes(order="C"))
+                for cid, doc, md in zip(page["ids"], page["documents"], page["metadatas"]):
+                    if cid in seen:
+                        raise ValueError(f"Duplicate chunk id in snapshot: {cid}")
+                    seen.add(cid)
+                    line = json.dumps({"id": cid, "text": doc, "metadata": md}, ensure_ascii=False) + "\n"
+                    cf.write(line.encode("utf-8"))
+                    offsets.append(offsets[-1] + len(line.encode("utf-8")))
+                count += len(page["ids"])
+        np.asarray(offsets, dtype="<u8").tofile(tmp / OFFSETS)
+
+        manifest = {
+            "format": SNAPSHOT_FORMAT,
+            "format_version": SNAPSHOT_VERSION,
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "embed_model": embed_model,
+            "embed_dimensions": embed_dimensions,
+            "dim": dim or 0,
+            "count": count,
+            "dtype": "float32",
+            "byte_order": "little",
+            "corpus": corpus or {},
+        }
+        if extra:
+            manifest.update(extra)
+        (tmp / MANIFEST).write_text(json.dumps(manifest, indent=2, sort_keys=True), encoding="utf-8")
+        os.replace(tmp, final)
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+    return manifest
+
+
+class Snapshot:
+    def __init__(self, path: str):
+        root = Path(path)
+        self.path = str(root)
+        self.manifest = json.loads((root / MANIFEST).read_text(encoding="utf-8"))
+        if self.manifest.get("format") != SNAPSHOT_FORMAT:
+            raise ValueError(f"Not an index snapshot: {path}")
+        if self.manifest.get("format_version") != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported snapshot version: {self.manifest.get('format_version')}")
+
+        self.count = int(self.manifest["count"])
+        self.dim = int(self.manifest["dim"])
+        if self.count:
+            self.embeddings = np.memmap(root / EMBEDDINGS, dtype="<f4", mode="r", shape=(self.count, self.dim))
+        else:
+            self.embeddings = np.zeros((0, self.dim), dtype="<f4")
+        self.offsets = np.fromfile(root / OFFSETS, dtype="<u8")
+        self._chunks_file = open(root / CHUNKS, "rb")
+        size = os.fstat(self._chunks_file.fileno()).st_size
+        self._chunks = mmap.mmap(self._chunks_file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        self._norms: Optional[np.ndarray] = None
+
+    @property
+    def embed_model(self) -> str:
+        return self.manifest.get("embed_model", "")
+
+    def close(self) -> None:
+        if isinstance(self._chunks, mmap.mmap):
+            self._chunks.close()
+        self._chunks_file.close()
+
+    def record(self, row: int) -> Dict[str, Any]:
+        start, end = int(self.offsets[row]), int(self.offsets[row + 1])
+        return json.loads(self._chunks[start:end].decode("utf-8"))
+
+    def records(self, rows: Sequence[int]) -> List[Dict[str, Any]]:
+        return [self.record(int(r)) for r in rows]
+
+    def pages(self, page_size: int = PAGE_SIZE) -> Iterator[Dict[str, Any]]:
+        for start in range(0, self.count, page_size):
+            rows = range(start, min(self.count, start + page_size))
+            recs = self.records(rows)
+            yield {
+                "ids": [r["id"] for r in recs],
+                "documents": [r["text"] for r in recs],
+                "metadatas": [r["metadata"] for r in recs],
+                "embeddings": np.asarray(self.embeddings[start:start + len(recs)]),
+            }
+
+    def search(self, query: Sequence[float], k: int) -> List[Tuple[int, float]]:
+        """Exact cosine top-k over the memory-mapped block: [(row, similarity)]."""
+        if self.count == 0 or k <= 0:
+            return []
+        if self._norms is None:
+            norms = np.linalg.norm(self.embeddings, axis=1)
+            norms[norms == 0] = 1.0
+            self._norms = norms.astype(np.float32)
+        q = np.asarray(query, dtype=np.float32)
+        qn = np.linalg.norm(q) or 1.0
+        scores = (self.embeddings @ q) / (self._norms * qn)
+        k = min(k, self.count)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(i), float(scores[i])) for i in top]
+
+    def load_into(self, collection, batch_size: int = PAGE_SIZE) -> int:
+        loaded = 0
+        for page in self.pages(batch_size):
+            collection.upsert(
+                ids=page["ids"],
+                documents=page["documents"],
+                metadatas=page["metadatas"],
+                embeddings=page["embeddings"],
+            )
+            loaded += len(page["ids"])
+        return loaded
+
+
+class SnapshotCollection:
+    """Serves retrieve_top_k straight from a memory-mapped snapshot."""
+
+    def __init__(self, snapshot: Snapshot):
+        self.snapshot = snapshot
+
+    def count(self) -> int:
+        return self.snapshot.count
+
+    def query(self, query_embeddings, n_results: int = 10, include=None) -> Dict[str, Any]:
+        out: Dict[str, List[Any]] = {"ids": [], "documents": [], "metadatas": [], "distances": []}
+        for emb in query_embeddings:
+            ranked = self.snapshot.search(emb, n_results)
+            recs = self.snapshot.records([row for row, _ in ranked])
+            out["ids"].append([r["id"] for r in recs])
+            out["documents"].append([r["text"] for r in recs])
+            out["metadatas"].append([r["metadata"] for r in recs])
+            out["distances"].append([1.0 - score for _, score in ranked])
+        return out
+
+
+def is_snapshot(path: str) -> bool:
+    try:
+        manifest = json.loads((Path(path) / MANIFEST).read_text(encoding="utf-8"))
+    except (FileNotFoundError, NotADirectoryError, ValueError):
+        return False
+    return manifest.get("format") == SNAPSHOT_FORMAT
+
+
+def merge_snapshots(part_dirs: Sequence[str], out_dir: str, require_all_shards: bool = True) -> Dict[str, Any]:
+    """
+    Combines partial indexes (snapshots) into one snapshot. Fails before
+    writing anything if the partials disagree on embed model/dimensions,
+    share a corpus file, repeat or miss a shard, or produce colliding chunk
+    IDs (policy_id:section_id) - e.g. two files that slugify to the same policy_id.
+    """
+    parts = [Snapshot(p) for p in part_dirs]
+    try:
+        if not parts:
+            raise ValueError("Nothing to merge.")
+
+        models = {(p.embed_model, p.manifest.get("embed_dimensions", "")) for p in parts}
+        if len(models) > 1:
+            raise ValueError(f"Partials use different embed settings: {sorted(models)}")
+        dims = {p.dim for p in parts if p.count}
+        if len(dims) > 1:
+            raise ValueError(f"Partials have different embedding dims: {sorted(dims)}")
+
+        shards = [p.manifest.get("shard") for p in parts]
+        if all(shards):
+            counts = {int(sh.split("/")[1]) for sh in shards}
+            indices = sorted(int(sh.split("/")[0]) for sh in shards)
+            if len(counts) > 1:
+                raise ValueError(f"Partials come from different shard counts: {sorted(counts)}")
+            if len(set(indices)) != len(indices):
+                raise ValueError(f"Duplicate shards in merge: {sorted(shards)}")
+            if require_all_shards and indices != list(range(counts.pop())):
+                raise ValueError(f"Missing shards; have {sorted(shards)}")
+
+        corpus: Dict[str, Any] = {}
+        owner: Dict[str, str] = {}
+        collisions: List[Tuple[str, str, str]] = []
+        for p in parts:
+            for file_name, info in p.manifest.get("corpus", {}).items():
+                if file_name in corpus:
+                    raise ValueError(f"File {file_name} appears in more than one partial")
+                corpus[file_name] = info
+            for row in range(p.count):
+                cid = p.record(row)["id"]
+                if cid in owner:
+                    collisions.append((cid, owner[cid], p.path))
+                else:
+                    owner[cid] = p.path
+        if collisions:
+            shown = "; ".join(f"{cid} in {a} and {b}" for cid, a, b in collisions[:20])
+            more = f" (+{len(collisions) - 20} more)" if len(collisions) > 20 else ""
+            raise ValueError(f"{len(collisions)} chunk ID collisions: {shown}{more}")
+
+        def pages() -> Iterator[Dict[str, Any]]:
+            for p in parts:
+                yield from p.pages()
+
+        embed_model, embed_dimensions = models.pop()
+        return write_snapshot(
+            out_dir,
+            pages(),
+            embed_model=embed_model,
+            embed_dimensions=embed_dimensions,
+            corpus=corpus,
+            extra={"merged_from": [os.path.abspath(p.path) for p in parts]},
+        )
+    finally:
+        for p in parts:
+            p.close()
+
+
+def export_current(persist_dir: str, out_dir: str, embed_model: str) -> Dict[str, Any]:
+    """Snapshots the currently promoted index version (or a legacy index)."""
+    from retrieval.store import build_or_load_chroma
+    from retrieval.versions import read_manifest, resolve_index_dir
+
+    index_dir = resolve_index_dir(persist_dir)
+    version_manifest = read_manifest(index_dir) or {}
+    settings = version_manifest.get("settings", {})
+    collection = build_or_load_chroma(index_dir)
+    return write_snapshot(
+        out_dir,
+        iter_collection(collection),
+        embed_model=settings.get("embed_model", embed_model),
+        embed_dimensions=settings.get("embed_dimensions", os.environ.get("EMBED_DIMENSIONS", "")),
+        corpus=version_manifest.get("files", {}),
+        extra={"source_version": version_manifest.get("version")},
+    )
+
+
+def import_as_version(snapshot_dir: str, persist_dir: str, embed_model: str) -> str:
+    """
+    Loads a snapshot into a new index version and promotes it. No embedding
+    calls are made; the snapshot must match the embed model queries will use.
+    """
+    from retrieval.store import build_or_load_chroma
+    from retrieval.versions import index_settings, lock_build, new_version, promote, release_build, write_manifest
+
+    snap = Snapshot(snapshot_dir)
+    try:
+        settings = index_settings(embed_model)
+        if snap.embed_model != settings["embed_model"] or snap.manifest.get("embed_dimensions", "") != settings["embed_dimensions"]:
+            raise ValueError(
+                f"Snapshot was embedded with {snap.embed_model} (dimensions={snap.manifest.get('embed_dimensions') or 'default'}), "
+                f"but queries use {settings['embed_model']} (dimensions={settings['embed_dimensions'] or 'default'})."
+            )
+
+        started = time.time()
+        name, path = new_version(persist_dir)
+        build_lock = lock_build(path)
+        try:
+            loaded = snap.load_into(build_or_load_chroma(path))
+
+            if settings["vector_quantization"] and snap.count:
+                # an empty index has nothing to quantize; readers fall back to the plain collection
+                from retrieval.quantized import QuantizedIndex, quantized_dir
+
+                ids = [snap.record(i)["id"] for i in range(snap.count)]
+                QuantizedIndex.from_embeddings(ids, snap.embeddings, settings["vector_quantization"]).save(quantized_dir(path))
+
+            write_manifest(path, {
+                "version": name,
+                "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "settings": settings,
+                "files": snap.manifest.get("corpus", {}),
+                "chunk_count": loaded,
+                "build_seconds": round(time.time() - started, 3),
+                "imported_from": os.path.abspath(snapshot_dir),
+            })
+        finally:
+            release_build(build_lock)
+    finally:
+        snap.close()
+    promote(persist_dir, name)
+    return name
@@ -0,0 +1,52 @@
+# src/retrieval/store.py
+import os
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from chromadb.api.models.Collection import Collection
+
+
+def build_or_load_chroma(persist_dir: str) -> "Collection":
+    # chromadb is slow to import; only pay for it when a collection is opened
+    import chromadb
+
+    client = chromadb.PersistentClient(path=persist_dir)
+    return client.get_or_create_collection(name="policies")
+
+
+def open_index(index_dir: str):
+    """
+    Collection to query for one concrete index directory. When
+    VECTOR_QUANTIZATION is set and a quantized sidecar exists, the first pass
+    goes through it (QUANT_NPROBE lists, QUANT_RESCORE_FACTOR candidates per
+    result, rescored exactly); otherwise this is the plain Chroma collection.
+    """
+    collection = build_or_load_chroma(index_dir)
+    if not os.environ.get("VECTOR_QUANTIZATION"):
+        return collection
+
+    from retrieval.quantized import QuantizedCollection, QuantizedIndex, quantized_dir
+
+    path = quantized_dir(index_dir)
+    if not QuantizedIndex.exists(path):
+        return collection
+    rescore_factor = int(os.environ.get("QUANT_RESCORE_FACTOR", "4"))
+    index = QuantizedIndex.load(path, nprobe=int(os.environ.get("QUANT_NPROBE", "8")))
+    return QuantizedCollection(collection, index, rescore_factor=rescore_factor)
+
+
+def open_collection(persist_dir: str):
+    """
+    Collection for the currently promoted index version under persist_dir.
+    INDEX_SNAPSHOT serves from a memory-mapped snapshot instead, with no
+    vector store involved.
+    """
+    snapshot = os.environ.get("INDEX_SNAPSHOT", "")
+    if snapshot:
+        from retrieval.snapshot import Snapshot, SnapshotCollection
+
+        return SnapshotCollection(Snapshot(snapshot))
+
+    from retrieval.versions import resolve_index_dir
+
+    return open_index(resolve_index_dir(persist_dir))
@@ -0,0 +1,235 @@
+# src/retrieval/versions.py
+"""
+Blue/green index versions under CHROMA_DIR:
+
+  CHROMA_DIR/CURRENT               name of the version readers should use
+  CHROMA_DIR/versions/<name>/      one complete index (Chroma + sidecars)
+  CHROMA_DIR/versions/<name>/manifest.json   written last; marks the build complete
+  CHROMA_DIR/versions/<name>/RETIRED         written when a newer version is promoted
+  CHROMA_DIR/versions/<name>/BUILDING        locked by the process building the version
+
+CURRENT is swapped with os.replace, so readers see either the old or the new
+version, never a half-built one. A directory without CURRENT is a legacy
+single index and is used as-is. A version that never got a manifest and is
+not locked by a live builder is an abandoned build; gc_versions removes it
+once it has been idle for build_grace_seconds.
+"""
+import json
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import IO, Any, Dict, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: abandoned builds are told apart by age alone
+    fcntl = None
+
+VERSIONS_DIR = "versions"
+CURRENT_FILE = "CURRENT"
+MANIFEST_FILE = "manifest.json"
+RETIRED_FILE = "RETIRED"
+BUILD_LOCK_FILE = "BUILDING"
+
+
+def _versions_root(persist_dir: str) -> Path:
+    return Path(persist_dir) / VERSIONS_DIR
+
+
+def index_settings(embed_model: str) -> Dict[str, Any]:
+    """Settings that make an index incompatible with another when they differ."""
+    return {
+        "embed_model": embed_model,
+        "embed_dimensions": os.environ.get("EMBED_DIMENSIONS", ""),
+        "vector_quantization": os.environ.get("VECTOR_QUANTIZATION", ""),
+    }
+
+
+def current_version(persist_dir: str) -> Optional[str]:
+    try:
+        name = (Path(persist_dir) / CURRENT_FILE).read_text(encoding="utf-8").strip()
+    except FileNotFoundError:
+        return None
+    return name or None
+
+
+def version_dir(persist_dir: str, version: str) -> str:
+    return str(_versions_root(persist_dir) / version)
+
+
+def resolve_index_dir(persist_dir: str) -> str:
+    version = current_version(persist_dir)
+    return version_dir(persist_dir, version) if version else persist_dir
+
+
+def new_version(persist_dir: str) -> Tuple[str, str]:
+    """Allocates an empty version directory. Returns (name, path)."""
+    name = time.strftime("v%Y%m%dT%H%M%S") + f"-{os.getpid()}-{time.monotonic_ns() % 100000:05d}"
+    path = _versions_root(persist_dir) / name
+    path.mkdir(parents=True, exist_ok=False)
+    return name, str(path)
+
+
+def lock_build(index_dir: str) -> IO[str]:
+    """
+    Marks index_dir as being built by this process until the returned handle
+    is closed (or the process dies). Raises RuntimeError if another process
+    is already building it.
+    """
+    f = open(Path(index_dir) / BUILD_LOCK_FILE, "a", encoding="utf-8")
+    if fcntl is not None:
+        try:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            f.close()
+            raise RuntimeError(f"Index version is already being built by another process: {index_dir}") from None
+    return f
+
+
+def release_build(lock: IO[str]) -> None:
+    path = Path(lock.name)
+    path.unlink(missing_ok=True)
+    lock.close()
+
+
+def build_in_progress(index_dir: str) -> bool:
+    """True while a live process holds lock_build on index_dir (always False without fcntl)."""
+    if fcntl is None:
+        return False
+    try:
+        f = open(Path(index_dir) / BUILD_LOCK_FILE, "r", encoding="utf-8")
+    except FileNotFoundError:
+        return False
+    with f:
+        try:
+            fcntl.flock(f.fileno(), fcntl.LOCK_SH | fcntl.LOCK_NB)
+        except OSError:
+            return True
+        return False
+
+
+def _last_modified(path: Path) -> float:
+    """Newest mtime in the tree: a build in progress keeps touching its files."""
+    latest = path.stat().st_mtime
+    for dirpath, _, filenames in os.walk(path):
+        for name in filenames:
+            try:
+                latest = max(latest, os.stat(os.path.join(dirpath, name)).st_mtime)
+            except FileNotFoundError:
+                continue
+    return latest
+
+
+def read_manifest(index_dir: str) -> Optional[Dict[str, Any]]:
+    try:
+        return json.loads((Path(index_dir) / MANIFEST_FILE).read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return None
+
+
+def write_manifest(index_dir: str, manifest: Dict[str, Any]) -> None:
+    path = Path(index_dir) / MANIFEST_FILE
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(manifest, indent=2, sort_keys=True), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def _atomic_write(path: Path, text: str) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def promote(persist_dir: str, version: str) -> Optional[str]:
+    """
+    Points readers at `version`. The version must be complete (have a manifest).
+    Returns the previously current version, now marked retired.
+    """
+    if read_manifest(version_dir(persist_dir, version)) is None:
+        raise ValueError(f"Refusing to promote incomplete index version: {version}")
+    previous = current_version(persist_dir)
+    _atomic_write(Path(persist_dir) / CURRENT_FILE, version + "\n")
+    if previous and previous != version:
+        retired = Path(version_dir(persist_dir, previous)) / RETIRED_FILE
+        if retired.parent.exists():
+            retired.write_text(str(time.time()), encoding="utf-8")
+    return previous
+
+
+def list_versions(persist_dir: str) -> List[str]:
+    root = _versions_root(persist_dir)
+    if not root.exists():
+        return []
+    return sorted(p.name for p in root.iterdir() if p.is_dir())
+
+
+def gc_versions(persist_dir: str, grace_seconds: float = 60.0, build_grace_seconds: float = 3600.0) -> List[str]:
+    """
+    Deletes retired versions once they have been retired for grace_seconds,
+    giving in-flight queries on the old version time to finish, and abandoned
+    builds (no manifest, not retired, not locked by a live builder) once they
+    have been idle for build_grace_seconds. That window is longer so an
+    interrupted build can still be resumed after a restart.
+    """
+    current = current_version(persist_dir)
+    removed = []
+    now = time.time()
+    for name in list_versions(persist_dir):
+        if name == current:
+            continue
+        path = Path(version_dir(persist_dir, name))
+        marker = path / RETIRED_FILE
+        try:
+            if marker.exists():
+                try:
+                    retired_at = float(marker.read_text(encoding="utf-8").strip() or 0)
+                except ValueError:
+                    retired_at = marker.stat().st_mtime
+                expired = now - retired_at >= grace_seconds
+            elif read_manifest(str(path)) is None:
+                expired = not build_in_progress(str(path)) and now - _last_modified(path) >= build_grace_seconds
+            else:
+                expired = False  # complete but never promoted: kept for an explicit promote
+        except FileNotFoundError:
+            continue  # removed by another collector
+        if expired:
+            shutil.rmtree(path, ignore_errors=True)
+            removed.append(name)
+    return removed
+
+
+class IndexRegistry:
+    """
+    Hands long-running readers the collection for the current version.
+    Re-reads CURRENT at most every check_interval seconds, so a swap is
+    picked up without restarting and without a lock on the query path.
+    """
+
+    def __init__(self, persist_dir: str, check_interval: float = 1.0):
+        self.persist_dir = persist_dir
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._version: Optional[str] = None
+        self._collection = None
+        self._checked = 0.0
+
+    def refresh(self) -> None:
+        from retrieval.store import open_index
+
+        with self._lock:
+            version = current_version(self.persist_dir)
+            if self._collection is None or version != self._version:
+                self._collection = open_index(resolve_index_dir(self.persist_dir))
+                self._version = version
+            self._checked = time.monotonic()
+
+    def current(self) -> Tuple[Optional[str], Any]:
+        """Returns (version, collection). version is None for a legacy index."""
+        if self._collection is None or time.monotonic() - self._checked >= self.check_interval:
+            self.refresh()
+        return self._version, self._collection
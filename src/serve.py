@@ -0,0 +1,133 @@
+# src/serve.py
+"""
+Long-running serving mode: a minimal JSON-over-HTTP front for QuestionService.
+
+  python src/serve.py [--host 127.0.0.1] [--port 8080]
+
+  POST /ask      {"question": "...", "tenant": "hr", "priority": "interactive"|"batch",
+                  "deadline": seconds}  ->  decision, answer, claims, reasons
+  GET  /metrics  coalescing, admission and stage counters
+
+Shed requests get 503 with Retry-After and a review_required body.
+
+Uses the same env settings as query.py (CHROMA_DIR, EMBED_MODEL, TOP_K,
+EVIDENCE_SPANS, AUDIT_DIR). SERVE_COALESCE=0 turns request coalescing off.
+Admission: SERVE_MAX_INFLIGHT, SERVE_BATCH_MAX_INFLIGHT, SERVE_TENANT_QUEUE,
+SERVE_DEADLINE_INTERACTIVE, SERVE_DEADLINE_BATCH, SERVE_STAGE_LIMITS.
+One request per connection; put a real proxy in front for TLS and keep-alive.
+"""
+import argparse
+import asyncio
+import json
+from typing import Any, Dict, Tuple
+
+from dotenv import load_dotenv
+
+from serving.admission import Overloaded, Priority
+from serving.service import QuestionService
+
+load_dotenv()
+
+MAX_BODY = 64 * 1024
+_REASONS = {
+    200: "OK", 400: "Bad Request", 404: "Not Found", 413: "Payload Too Large",
+    500: "Internal Server Error", 503: "Service Unavailable",
+}
+
+
+async def _read_request(reader: asyncio.StreamReader) -> Tuple[str, str, bytes]:
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    method, path, _ = lines[0].split(" ", 2)
+    length = 0
+    for line in lines[1:]:
+        name, _, value = line.partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value.strip())
+    if length > MAX_BODY:
+        raise ValueError("body too large")
+    body = await reader.readexactly(length) if length else b""
+    return method, path, body
+
+
+def _response(status: int, payload: Dict[str, Any]) -> bytes:
+    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    retry = f"Retry-After: {int(payload['retry_after'])}\r\n" if "retry_after" in payload else ""
+    head = (
+        f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+        "Content-Type: application/json\r\n"
+        f"{retry}"
+        f"Content-Length: {len(body)}\r\n"
+        "Connection: close\r\n\r\n"
+    )
+    return head.encode("latin-1") + body
+
+
+async def handle(service: QuestionService, method: str, path: str, body: bytes) -> Tuple[int, Dict[str, Any]]:
+    if method == "GET" and path == "/metrics":
+        return 200, service.metrics()
+    if method == "POST" and path == "/ask":
+        try:
+            req = json.loads(body or b"{}")
+            question = str(req.get("question", "")).strip()
+            priority = Priority[str(req.get("priority", "interactive")).upper()]
+            deadline = float(req["deadline"]) if req.get("deadline") is not None else None
+        except (ValueError, AttributeError, KeyError, TypeError):
+            return 400, {"error": "body must be a JSON object with a question; priority is interactive or batch"}
+        if not question:
+            return 400, {"error": "question is required"}
+        try:
+            result = await service.ask(question, tenant=str(req.get("tenant") or "default"),
+                                       priority=priority, deadline=deadline)
+        except Overloaded as e:
+            return 503, service.shed_payload(e)
+        return 200, service.payload(result)
+    return 404, {"error": f"no route for {method} {path}"}
+
+
+def make_handler(service: QuestionService):
+    async def on_connection(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            try:
+                method, path, body = await _read_request(reader)
+            except ValueError as e:
+                writer.write(_response(413 if "large" in str(e) else 400, {"error": str(e)}))
+                return
+            except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+                return
+            try:
+                status, payload = await handle(service, method, path, body)
+            except Exception as e:
+                status, payload = 500, {"error": f"{type(e).__name__}: {e}"}
+            writer.write(_response(status, payload))
+            await writer.drain()
+        finally:
+            writer.close()
+
+    return on_connection
+
+
+async def serve(host: str, port: int) -> None:
+    service = QuestionService.from_env()
+    server = await asyncio.start_server(make_handler(service), host, port)
+    print(f"[Serve] Listening on http://{host}:{port} (coalescing={'on' if service.coalesce else 'off'})")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve policy questions over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
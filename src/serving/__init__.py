@@ -0,0 +1,12 @@
+# Submodules import the question pipeline (openai, chromadb); see lazy_exports.
+from lazy_exports import lazy_exports
+
+__getattr__, __dir__, __all__ = lazy_exports(__name__, {
+    "SingleFlight": ".coalesce",
+    "QuestionService": ".service",
+    "AdmissionController": ".admission",
+    "Overloaded": ".admission",
+    "Priority": ".admission",
+    "PrioritySemaphore": ".admission",
+    "StageLimits": ".admission",
+})
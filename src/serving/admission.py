@@ -0,0 +1,286 @@
+# src/serving/admission.py
+"""
+Admission control for the serving mode.
+
+Questions enter through AdmissionController.run: a bounded queue per tenant,
+served round-robin across tenants and strictly by priority class
+(interactive before batch), with a cap on pipelines in flight. Batch work
+may only use part of that cap, so interactive requests always find
+headroom. A request is shed with Overloaded, instead of queued, when its
+tenant queue is full or the estimated queue wait already exceeds its
+deadline, and it is shed if it is still queued when the deadline passes.
+
+Inside an admitted pipeline, StageLimits bounds concurrency per stage
+(embedding, answer, verify). Stage waiters are also served by priority:
+the class of the running request is carried in a context variable.
+"""
+import asyncio
+import contextvars
+import heapq
+import itertools
+import os
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from enum import IntEnum
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+STAGES = ("embedding", "answer", "verify")
+
+
+class Priority(IntEnum):
+    INTERACTIVE = 0
+    BATCH = 1
+
+
+PRIORITY: contextvars.ContextVar = contextvars.ContextVar("serving_priority", default=Priority.INTERACTIVE)
+
+
+class Overloaded(Exception):
+    """Raised instead of queueing work that cannot finish in time; callers answer review_required."""
+
+    def __init__(self, reason: str, retry_after: float, priority: Priority):
+        super().__init__(f"load shed ({reason}), retry after {retry_after:.0f}s")
+        self.reason = reason
+        self.retry_after = retry_after
+        self.priority = priority
+
+
+class PrioritySemaphore:
+    """asyncio.Semaphore whose waiters are woken lowest priority value first, FIFO within a class."""
+
+    def __init__(self, value: int):
+        self._value = max(1, value)
+        self._waiters: List[Tuple[int, int, "asyncio.Future"]] = []
+        self._seq = itertools.count()
+        self.peak_waiting = 0
+
+    async def acquire(self, priority: Optional[Priority] = None) -> None:
+        if self._value > 0 and not self._waiters:
+            self._value -= 1
+            return
+        prio = PRIORITY.get() if priority is None else priority
+        fut = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (int(prio), next(self._seq), fut))
+        self.peak_waiting = max(self.peak_waiting, len(self._waiters))
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                self.release()  # the slot was handed over as we were cancelled
+            raise
+
+    def release(self) -> None:
+        while self._waiters:
+            _, _, fut = heapq.heappop(self._waiters)
+            if not fut.done():
+                fut.set_result(None)
+                return
+        self._value += 1
+
+    @property
+    def waiting(self) -> int:
+        return sum(1 for _, _, f in self._waiters if not f.done())
+
+
+def parse_limits(spec: str, defaults: Dict[str, int]) -> Dict[str, int]:
+    """SERVE_STAGE_LIMITS format: "embedding=16,answer=8,verify=8"; unknown stages are ignored."""
+    limits = dict(defaults)
+    for part in (spec or "").split(","):
+        name, _, value = part.strip().partition("=")
+        if name in limits and value.strip().isdigit():
+            limits[name] = int(value)
+    return limits
+
+
+class StageLimits:
+    """Per-stage concurrency caps, shared by every pipeline in the process."""
+
+    def __init__(self, limits: Dict[str, int]):
+        self.limits = dict(limits)
+        self._sems = {name: PrioritySemaphore(n) for name, n in limits.items()}
+
+    @classmethod
+    def from_env(cls) -> "StageLimits":
+        defaults = {"embedding": 16, "answer": 8, "verify": 8}
+        return cls(parse_limits(os.environ.get("SERVE_STAGE_LIMITS", ""), defaults))
+
+    @asynccontextmanager
+    async def stage(self, name: str):
+        sem = self._sems.get(name)
+        if sem is None:
+            yield
+            return
+        await sem.acquire()
+        try:
+            yield
+        finally:
+            sem.release()
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            name: {"limit": self.limits[name], "waiting": s.waiting, "peak_waiting": s.peak_waiting}
+            for name, s in self._sems.items()
+        }
+
+
+class AdmissionController:
+    """
+    Bounded admission in front of the question pipeline. Queue wait is
+    estimated from the requests ahead and an EWMA of pipeline run time.
+    """
+
+    def __init__(
+        self,
+        max_inflight: int = 32,
+        batch_max_inflight: Optional[int] = None,
+        tenant_queue: int = 100,
+        deadlines: Optional[Dict[Priority, float]] = None,
+        ewma_alpha: float = 0.2,
+    ):
+        self.max_inflight = max(1, max_inflight)
+        self.batch_max_inflight = max(1, batch_max_inflight if batch_max_inflight is not None else self.max_inflight // 2)
+        self.tenant_queue = max(1, tenant_queue)
+        self.deadlines = deadlines or {Priority.INTERACTIVE: 20.0, Priority.BATCH: 600.0}
+        self.ewma_alpha = ewma_alpha
+        self.service_seconds: Optional[float] = None
+        self._inflight = {p: 0 for p in Priority}
+        # per class, tenants in round-robin order, each with its FIFO of waiters
+        self._queues: Dict[Priority, "OrderedDict[str, Deque[asyncio.Future]]"] = {p: OrderedDict() for p in Priority}
+        self.admitted = {p.name.lower(): 0 for p in Priority}
+        self.shed: Dict[str, int] = {}
+        self.max_queue_wait = {p.name.lower(): 0.0 for p in Priority}
+
+    @classmethod
+    def from_env(cls) -> "AdmissionController":
+        max_inflight = int(os.environ.get("SERVE_MAX_INFLIGHT", "32"))
+        batch = os.environ.get("SERVE_BATCH_MAX_INFLIGHT")
+        return cls(
+            max_inflight=max_inflight,
+            batch_max_inflight=int(batch) if batch else None,
+            tenant_queue=int(os.environ.get("SERVE_TENANT_QUEUE", "100")),
+            deadlines={
+                Priority.INTERACTIVE: float(os.environ.get("SERVE_DEADLINE_INTERACTIVE", "20")),
+                Priority.BATCH: float(os.environ.get("SERVE_DEADLINE_BATCH", "600")),
+            },
+        )
+
+    @property
+    def inflight(self) -> int:
+        return sum(self._inflight.values())
+
+    def queued(self, priority: Optional[Priority] = None) -> int:
+        classes = [priority] if priority is not None else list(Priority)
+        return sum(len(q) for p in classes for q in self._queues[p].values())
+
+    def _can_start(self, priority: Priority) -> bool:
+        if self.inflight >= self.max_inflight:
+            return False
+        return priority == Priority.INTERACTIVE or self._inflight[priority] < self.batch_max_inflight
+
+    def estimated_wait(self, priority: Priority) -> float:
+        if not self.service_seconds:
+            return 0.0
+        ahead = sum(self.queued(p) for p in Priority if p <= priority)
+        slots = self.max_inflight if priority == Priority.INTERACTIVE else self.batch_max_inflight
+        return (ahead + 1) / slots * self.service_seconds
+
+    def deadline(self, priority: Priority, deadline: Optional[float] = None) -> float:
+        return self.deadlines[priority] if deadline is None else deadline
+
+    def reject(self, reason: str, priority: Priority) -> Overloaded:
+        """Counts a shed request and builds the Overloaded to raise for it."""
+        key = f"{priority.name.lower()}:{reason}"
+        self.shed[key] = self.shed.get(key, 0) + 1
+        return Overloaded(reason, max(1.0, round(self.estimated_wait(priority))), priority)
+
+    async def run(
+        self,
+        fn: Callable[[], Awaitable[Any]],
+        tenant: str = "default",
+        priority: Priority = Priority.INTERACTIVE,
+        deadline: Optional[float] = None,
+    ) -> Any:
+        """Runs fn() once admitted; raises Overloaded if it cannot start within the deadline (seconds)."""
+        deadline = self.deadline(priority, deadline)
+        started = time.monotonic()
+        if self.queued(priority) == 0 and self._can_start(priority):
+            self._inflight[priority] += 1
+        else:
+            await self._wait_turn(tenant, priority, deadline)
+        name = priority.name.lower()
+        self.admitted[name] += 1
+        self.max_queue_wait[name] = max(self.max_queue_wait[name], time.monotonic() - started)
+
+        token = PRIORITY.set(priority)
+        t0 = time.monotonic()
+        try:
+            return await fn()
+        finally:
+            PRIORITY.reset(token)
+            elapsed = time.monotonic() - t0
+            self.service_seconds = elapsed if self.service_seconds is None else (
+                self.ewma_alpha * elapsed + (1 - self.ewma_alpha) * self.service_seconds
+            )
+            self._inflight[priority] -= 1
+            self._dispatch()
+
+    async def _wait_turn(self, tenant: str, priority: Priority, deadline: float) -> None:
+        queues = self._queues[priority]
+        queue = queues.get(tenant)
+        if queue is not None and len(queue) >= self.tenant_queue:
+            raise self.reject("queue_full", priority)
+        if self.estimated_wait(priority) > deadline:
+            raise self.reject("deadline", priority)
+
+        fut = asyncio.get_running_loop().create_future()
+        queues.setdefault(tenant, deque()).append(fut)
+        try:
+            await asyncio.wait_for(fut, timeout=deadline)
+        except BaseException as e:
+            if fut.done() and not fut.cancelled():
+                # admitted just as we gave up: hand the slot on
+                self._inflight[priority] -= 1
+                self._dispatch()
+            else:
+                self._discard(priority, tenant, fut)
+            if isinstance(e, asyncio.TimeoutError):
+                raise self.reject("deadline", priority) from None
+            raise
+
+    def _discard(self, priority: Priority, tenant: str, fut: "asyncio.Future") -> None:
+        queue = self._queues[priority].get(tenant)
+        if queue is None:
+            return
+        try:
+            queue.remove(fut)
+        except ValueError:
+            pass
+        if not queue:
+            del self._queues[priority][tenant]
+
+    def _dispatch(self) -> None:
+        for priority in Priority:
+            queues = self._queues[priority]
+            while queues and self._can_start(priority):
+                tenant, queue = next(iter(queues.items()))
+                fut = queue.popleft()
+                if queue:
+                    queues.move_to_end(tenant)
+                else:
+                    del queues[tenant]
+                if fut.done():
+                    continue
+                self._inflight[priority] += 1
+                fut.set_result(None)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "inflight": {p.name.lower(): n for p, n in self._inflight.items()},
+            "queued": {p.name.lower(): self.queued(p) for p in Priority},
+            "tenants_queued": sorted({t for p in Priority for t in self._queues[p]}),
+            "admitted": dict(self.admitted),
+            "shed": dict(self.shed),
+            "max_queue_wait_seconds": {k: round(v, 3) for k, v in self.max_queue_wait.items()},
+            "service_seconds_ewma": round(self.service_seconds, 3) if self.service_seconds else None,
+        }
@@ -0,0 +1,59 @@
+# src/serving/coalesce.py
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key onto one execution.
+    The first caller starts fn() as a task; callers arriving while it is in
+    flight await the same task and get the same result (or exception). The key
+    is forgotten as soon as the task finishes, so this never serves stale
+    results: it only merges work that overlaps in time.
+    A caller being cancelled does not cancel the shared execution.
+    """
+
+    def __init__(self):
+        self._tasks: Dict[Hashable, "asyncio.Task"] = {}
+        self._waiters: Dict[Hashable, int] = {}
+        self.requests = 0
+        self.executions = 0
+        self.coalesced = 0
+        self.peak_waiters = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """Returns (result, coalesced); coalesced is True if another caller's execution was reused."""
+        self.requests += 1
+        task = self._tasks.get(key)
+        shared = task is not None
+        if shared:
+            self.coalesced += 1
+            self._waiters[key] += 1
+            self.peak_waiters = max(self.peak_waiters, self._waiters[key])
+        else:
+            self.executions += 1
+            task = asyncio.ensure_future(fn())
+            self._tasks[key] = task
+            self._waiters[key] = 1
+            task.add_done_callback(lambda _t, k=key: self._forget(k, _t))
+        return await asyncio.shield(task), shared
+
+    def in_flight(self, key: Hashable) -> bool:
+        return key in self._tasks
+
+    def _forget(self, key: Hashable, task: "asyncio.Task") -> None:
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+            del self._waiters[key]
+        if not task.cancelled():
+            task.exception()  # mark retrieved: every waiter may have gone away
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "coalesced_ratio": round(self.coalesced / self.requests, 4) if self.requests else 0.0,
+            "in_flight": len(self._tasks),
+            "peak_waiters": self.peak_waiters,
+        }
@@ -0,0 +1,203 @@
+# src/serving/service.py
+import asyncio
+import os
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple
+
+from agents.answer_agent import AnswerAgent
+from agents.policy_agent import PolicyAgent
+from agents.routing import ModelRouter
+from governance.logger import AuditStore, question_hash
+from models.types import DecisionStatus
+from pipeline import QuestionResult, answer_question
+from retrieval.versions import IndexRegistry
+from serving.admission import AdmissionController, Overloaded, Priority, StageLimits
+from serving.coalesce import SingleFlight
+
+
+@dataclass
+class QuestionService:
+    """
+    Long-running question answering on one event loop. Identical questions
+    (after whitespace/case normalisation) asked against the same index version
+    and in the same priority class while one is in flight share that single
+    pipeline execution. Results are
+    shared between coalesced callers and must be treated as read-only.
+    Every request is audited, with coalesced=True when it reused another's run.
+    Admission control (per-tenant queues, priority classes, per-stage limits)
+    applies per caller: a request that cannot start, or whose shared run
+    cannot start, before its deadline raises Overloaded, which callers answer
+    with shed_payload. Shed requests are audited with their LOAD_SHED reason.
+    """
+    registry: IndexRegistry
+    embed_model: str
+    top_k: int = 5
+    evidence_spans: int = 0
+    coalesce: bool = True
+    answer_agent: Optional[AnswerAgent] = None
+    policy_agent: Optional[PolicyAgent] = None
+    router: Optional[ModelRouter] = None
+    audit: Optional[AuditStore] = None
+    flight: SingleFlight = field(default_factory=SingleFlight)
+    admission: AdmissionController = field(default_factory=AdmissionController)
+    stages: Optional[StageLimits] = None
+    _gates: Dict[Tuple[str, str, int], asyncio.Event] = field(default_factory=dict, init=False, repr=False)
+
+    @classmethod
+    def from_env(cls) -> "QuestionService":
+        return cls(
+            registry=IndexRegistry(os.environ.get("CHROMA_DIR", "vectorstore/index")),
+            embed_model=os.environ.get("EMBED_MODEL", "text-embedding-3-small"),
+            top_k=int(os.environ.get("TOP_K", "5")),
+            evidence_spans=int(os.environ.get("EVIDENCE_SPANS", "0")),
+            coalesce=os.environ.get("SERVE_COALESCE", "1") != "0",
+            answer_agent=AnswerAgent.from_env(),
+            policy_agent=PolicyAgent.from_env(),
+            router=ModelRouter.from_env(),
+            audit=AuditStore.from_env(),
+            admission=AdmissionController.from_env(),
+            stages=StageLimits.from_env(),
+        )
+
+    async def ask(
+        self,
+        question: str,
+        tenant: str = "default",
+        priority: Priority = Priority.INTERACTIVE,
+        deadline: Optional[float] = None,
+    ) -> QuestionResult:
+        """Answers one question; raises Overloaded when it is shed. deadline is in seconds."""
+        version, collection = self.registry.current()
+        expires = time.monotonic() + self.admission.deadline(priority, deadline)
+        try:
+            result, coalesced = await self._ask(question, version, collection, tenant, priority, expires)
+        except Overloaded as exc:
+            if self.audit is not None:
+                self.audit.append(self.shed_record(exc, question, tenant, version))
+            raise
+        if self.audit is not None:
+            self.audit.record(result, question=question, index_version=version,
+                              embed_model=self.embed_model, coalesced=coalesced, tenant=tenant)
+        return result
+
+    async def _ask(
+        self, question: str, version: Optional[str], collection: Any,
+        tenant: str, priority: Priority, expires: float,
+    ) -> Tuple[QuestionResult, bool]:
+        """
+        Each caller's own tenant, class and deadline apply. A caller joining a
+        run that is still queued is shed itself if that run is not admitted
+        before the caller's deadline, and a caller whose leader was shed asks
+        again under its own limits while its deadline lasts.
+        """
+        def execute(gate: Optional[asyncio.Event] = None):
+            async def admitted():
+                if gate is not None:
+                    gate.set()
+                return await answer_question(
+                    question, collection, self.embed_model, top_k=self.top_k,
+                    answer_agent=self.answer_agent, policy_agent=self.policy_agent,
+                    evidence_spans=self.evidence_spans, router=self.router, stages=self.stages,
+                )
+            return self.admission.run(admitted, tenant=tenant, priority=priority,
+                                      deadline=max(0.0, expires - time.monotonic()))
+
+        if not self.coalesce:
+            return await execute(), False
+
+        # per class, so an interactive request never waits behind a queued batch run
+        key = (question_hash(question), version or "", int(priority))
+
+        led = False
+
+        def start():
+            # called by the flight when this caller leads; the gate opens once the run is admitted or over
+            nonlocal led
+            led = True
+            gate = self._gates[key] = asyncio.Event()
+
+            async def run():
+                try:
+                    return await execute(gate)
+                finally:
+                    gate.set()
+                    if self._gates.get(key) is gate:
+                        del self._gates[key]
+            return run()
+
+        while True:
+            gate = self._gates.get(key) if self.flight.in_flight(key) else None
+            if gate is None:
+                return await self.flight.do(key, start)
+            joined = asyncio.ensure_future(self.flight.do(key, start))
+            try:
+                if not gate.is_set():
+                    opened = asyncio.ensure_future(gate.wait())
+                    try:
+                        done, _ = await asyncio.wait(
+                            {joined, opened}, timeout=max(0.0, expires - time.monotonic()),
+                            return_when=asyncio.FIRST_COMPLETED,
+                        )
+                    finally:
+                        opened.cancel()
+                    if not done:
+                        expires = 0.0  # the shared run is still queued past our deadline
+                        raise self.admission.reject("deadline", priority)
+                return await joined
+            except Overloaded:
+                if led or time.monotonic() >= expires:
+                    raise
+            finally:
+                joined.cancel()  # only our wait on the shared run; a no-op once it is done
+                # the leader was shed under its own tenant or deadline; ours may still admit
+
+    def shed_record(self, exc: Overloaded, question: str, tenant: str, version: Optional[str]) -> Dict[str, Any]:
+        """Audit line for a shed request: no pipeline ran, so only the outcome is recorded."""
+        return {
+            "id": uuid.uuid4().hex,
+            "ts": time.time(),
+            "question": question,
+            "question_hash": question_hash(question),
+            "policy_ids": [],
+            "decision": DecisionStatus.REVIEW.value,
+            "reasons": [f"LOAD_SHED:{exc.reason}"],
+            "priority": exc.priority.name.lower(),
+            "retry_after": exc.retry_after,
+            "tenant": tenant,
+            "index_version": version,
+            "embed_model": self.embed_model,
+        }
+
+    @staticmethod
+    def payload(result: QuestionResult) -> Dict[str, Any]:
+        """The client-facing part of a result."""
+        return {
+            "decision": result.decision.status.value,
+            "final_answer": result.proposal.final_answer,
+            "claims": [c.to_dict() for c in result.proposal.claims],
+            "reasons": list(result.decision.reasons),
+            "confidence": result.assessment.confidence,
+        }
+
+    @staticmethod
+    def shed_payload(exc: Overloaded) -> Dict[str, Any]:
+        """Fast answer for shed load: never safe_to_use, and tells the client when to retry."""
+        return {
+            "decision": DecisionStatus.REVIEW.value,
+            "final_answer": "",
+            "claims": [],
+            "reasons": [f"LOAD_SHED:{exc.reason}"],
+            "retry_after": exc.retry_after,
+        }
+
+    def metrics(self) -> Dict[str, Any]:
+        out = {"coalescing": self.flight.metrics(), "admission": self.admission.metrics()}
+        if self.stages is not None:
+            out["stages"] = self.stages.metrics()
+        return out
+
+    def close(self) -> None:
+        if self.audit is not None:
+            self.audit.close()
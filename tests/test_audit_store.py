@@ -0,0 +1,146 @@
+import gzip
+import json
+import time
+
+import pytest
+
+from governance.logger import INDEX_FILE, AuditStore, question_hash
+
+
+def rec(i, decision="approved", policy="leave", question=None):
+    q = question or f"question {i}"
+    return {"id": str(i), "ts": 1000.0 + i, "question_hash": question_hash(q),
+            "decision": decision, "policy_ids": [policy]}
+
+
+def write_active(root, seq, records, tail=""):
+    path = root / f"active-{seq:08d}.jsonl"
+    path.write_text("".join(json.dumps(r) + "\n" for r in records) + tail, encoding="utf-8")
+    return path
+
+
+def summaries(root):
+    with open(root / INDEX_FILE, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+@pytest.fixture
+def store(tmp_path):
+    stores = []
+
+    def make(**kwargs):
+        s = AuditStore(str(tmp_path), flush_interval=0.01, **kwargs)
+        stores.append(s)
+        return s
+
+    yield make
+    for s in stores:
+        s.close()
+
+
+def test_rotation_seals_segment_and_publishes_summary(tmp_path, store):
+    s = store(segment_max_bytes=200)
+    for i in range(10):
+        s.append(rec(i))
+    s.flush()
+    s.close()
+
+    sealed = sorted(tmp_path.glob("seg-*.jsonl.gz"))
+    assert sealed
+    assert {x["segment"] for x in summaries(tmp_path)} == {p.name for p in sealed}
+    for p in sealed:
+        assert not (tmp_path / p.name.replace("seg-", "active-").replace(".gz", "")).exists()
+    assert [r["id"] for r in AuditStore(str(tmp_path), read_only=True).query()] == [str(i) for i in range(10)]
+
+
+def test_query_prunes_by_summary_and_question_index(tmp_path, store):
+    s = store(segment_max_bytes=1)
+    s.append(rec(1, decision="approved", policy="leave"))
+    s.append(rec(2, decision="review_required", policy="expenses"))
+    s.flush()
+    s.append(rec(3, question="parental leave"))
+    s.flush()
+    s.close()
+
+    reader = AuditStore(str(tmp_path), read_only=True)
+    assert [r["id"] for r in reader.query(policy_id="expenses")] == ["2"]
+    assert [r["id"] for r in reader.query(decision="approved")] == ["1", "3"]
+    assert [r["id"] for r in reader.query(question="parental leave")] == ["3"]
+    assert [r["id"] for r in reader.query(start=1002.0, end=1003.0)] == ["2"]
+
+
+def test_unlocked_active_segment_is_adopted(tmp_path, store):
+    write_active(tmp_path, 1, [rec(1)])
+    s = store(segment_max_seconds=float("inf"))
+    s.append(rec(2))
+    s.flush()
+    assert sorted(p.name for p in tmp_path.glob("active-*")) == ["active-00000001.jsonl"]
+    assert [r["id"] for r in s.query()] == ["1", "2"]
+
+
+def test_locked_active_segment_is_left_to_its_writer(tmp_path, store):
+    first = store()
+    first.append(rec(1))
+    first.flush()
+    second = store()
+    second.append(rec(2))
+    second.flush()
+    assert len(list(tmp_path.glob("active-*"))) == 2
+    assert sorted(r["id"] for r in second.query()) == ["1", "2"]
+
+
+def test_torn_tail_is_truncated_on_recovery(tmp_path, store):
+    path = write_active(tmp_path, 1, [rec(1)], tail='{"id": "2", "ts"')
+    s = store(segment_max_seconds=float("inf"))
+    s.append(rec(3))
+    s.flush()
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["id"] for line in lines] == ["1", "3"]
+
+
+def test_due_orphan_is_sealed_on_recovery(tmp_path, store):
+    write_active(tmp_path, 1, [rec(1)])
+    store(segment_max_seconds=0.0)
+    assert not list(tmp_path.glob("active-*"))
+    assert [x["seq"] for x in summaries(tmp_path)] == [1]
+
+
+def test_crash_after_gzip_before_unlink_is_resealed(tmp_path, store):
+    # the writer died mid-seal: gz and a stale summary exist, the active file was kept
+    write_active(tmp_path, 1, [rec(1)])
+    with gzip.open(tmp_path / "seg-00000001.jsonl.gz", "wt", encoding="utf-8") as f:
+        f.write(json.dumps(rec(1)) + "\n")
+    stale = {"seq": 1, "segment": "seg-00000001.jsonl.gz", "count": 1, "ts_min": 1001.0,
+             "ts_max": 1001.0, "decisions": {"approved": 1}, "policy_ids": ["leave"]}
+    (tmp_path / INDEX_FILE).write_text(json.dumps(stale) + "\n", encoding="utf-8")
+    with open(tmp_path / "active-00000001.jsonl", "a", encoding="utf-8") as f:
+        f.write(json.dumps(rec(5, decision="rejected", policy="expenses")) + "\n")
+
+    s = store()
+    assert not (tmp_path / "active-00000001.jsonl").exists()
+    [summary] = summaries(tmp_path)
+    assert summary["count"] == 2 and summary["policy_ids"] == ["expenses", "leave"]
+
+    s.append(rec(6))
+    s.flush()
+    assert [r["id"] for r in s.query(policy_id="expenses")] == ["5"]
+    assert [r["id"] for r in s.query()] == ["1", "5", "6"]
+
+
+def test_crash_after_unlink_before_summary_is_published(tmp_path, store):
+    with gzip.open(tmp_path / "seg-00000001.jsonl.gz", "wt", encoding="utf-8") as f:
+        f.write(json.dumps(rec(1)) + "\n")
+    s = store()
+    assert [x["seq"] for x in summaries(tmp_path)] == [1]
+    assert [r["id"] for r in s.query()] == ["1"]
+
+
+def test_flush_after_close_returns(tmp_path, store):
+    s = store()
+    s.append(rec(1))
+    s.close()
+    started = time.monotonic()
+    s.flush()
+    assert time.monotonic() - started < 1.0
+    with pytest.raises(RuntimeError):
+        s.append(rec(2))
@@ -0,0 +1,34 @@
+from agents.policy_agent import SKIPPED_ISSUE, merge_claim_results
+from models.types import Claim
+from pipeline import check_claims
+
+CONTEXT = {"vac:sec0001": "Employees accrue 1.5 days of vacation per month."}
+
+
+def test_check_claims_returns_failed_indices():
+    claims = [
+        Claim(text="Employees accrue 1.5 days per month.", citations=["vac:sec0001"]),
+        Claim(text="Vacation is unlimited.", citations=[]),
+        Claim(text="Employees accrue 3 days per month.", citations=["vac:sec0001"]),
+    ]
+    precheck, hard, failed = check_claims(claims, CONTEXT)
+    assert failed == [1, 2]
+    assert "CLAIM_1:MISSING_CITATIONS" in hard
+    assert all(not it.startswith("CLAIM_0:") for it in hard)
+
+
+def test_merge_claim_results_maps_indices_and_drops_out_of_range():
+    results = [
+        ([0, 2], {"claim_checks": [{"claim_index": 1, "supported": True, "issues": []},
+                                   {"claim_index": 5, "supported": False, "issues": ["X"]},
+                                   {"claim_index": True, "supported": False, "issues": ["Y"]}],
+                  "issues": ["A"], "risk_level": "low", "confidence": 0.9, "is_compliant": True}),
+        ([3], {"claim_checks": [{"claim_index": 0, "supported": False, "issues": ["WEAK"]},
+                                {"claim_index": -1, "supported": True, "issues": []}],
+               "issues": ["A", "B"], "risk_level": "high", "confidence": 0.4, "is_compliant": False}),
+    ]
+    merged = merge_claim_results(results, skipped=[1])
+    assert [(cc["claim_index"], cc["supported"]) for cc in merged["claim_checks"]] == [(1, False), (2, True), (3, False)]
+    assert merged["claim_checks"][0]["issues"] == [SKIPPED_ISSUE]
+    assert merged["issues"] == ["A", "B"]
+    assert (merged["risk_level"], merged["confidence"], merged["is_compliant"]) == ("high", 0.4, False)
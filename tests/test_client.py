@@ -0,0 +1,75 @@
+import asyncio
+import gc
+
+import pytest
+
+import llm.client as client_mod
+from llm.client import get_async_client, reset_clients
+
+
+@pytest.fixture(autouse=True)
+def fake_key(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    monkeypatch.setenv("OPENAI_BASE_URL", "http://127.0.0.1:9/v1")
+    reset_clients()
+    yield
+    reset_clients()
+
+
+def test_async_client_is_per_loop_and_closed_at_shutdown():
+    async def main():
+        first = get_async_client()
+        assert get_async_client() is first
+        return first
+
+    a = asyncio.run(main())
+    b = asyncio.run(main())
+    assert a is not b
+    assert a.raw.is_closed() and b.raw.is_closed()
+    gc.collect()
+    assert len(client_mod._async_clients) == 0
+
+
+def _flaky(failures: int, result):
+    import httpx
+    from openai import APIConnectionError
+
+    calls = {"n": 0}
+
+    def call():
+        calls["n"] += 1
+        if calls["n"] <= failures:
+            raise APIConnectionError(request=httpx.Request("POST", "http://127.0.0.1:9/v1/embeddings"))
+        return result
+
+    return call
+
+
+def test_failed_attempts_give_back_their_reservation():
+    from types import SimpleNamespace
+
+    from llm.client import AsyncRateLimitedClient, RateLimitedClient, RetryPolicy
+    from llm.rate_limiter import ENDPOINT_EMBEDDINGS, EndpointLimits, RateLimiter
+
+    resp = SimpleNamespace(usage=SimpleNamespace(total_tokens=100))
+    retry = RetryPolicy(max_retries=3, base_delay=0.0, max_delay=0.0)
+
+    limiter = RateLimiter({ENDPOINT_EMBEDDINGS: EndpointLimits(rpm=60, tpm=6000)})
+    sync = RateLimitedClient(None, limiter, retry)
+    assert sync._call(ENDPOINT_EMBEDDINGS, 100, _flaky(2, resp)) is resp
+    endpoint = limiter.endpoint(ENDPOINT_EMBEDDINGS)
+    # three attempts, but only the successful one stays debited
+    assert endpoint.requests._level == pytest.approx(59, abs=0.1)
+    assert endpoint.tokens._level == pytest.approx(5900, abs=5)
+
+    limiter = RateLimiter({ENDPOINT_EMBEDDINGS: EndpointLimits(rpm=60, tpm=6000)})
+    client = AsyncRateLimitedClient(None, limiter, retry)
+    flaky = _flaky(2, resp)
+
+    async def call():
+        return flaky()
+
+    assert asyncio.run(client._call(ENDPOINT_EMBEDDINGS, 100, call)) is resp
+    endpoint = limiter.endpoint(ENDPOINT_EMBEDDINGS)
+    assert endpoint.requests._level == pytest.approx(59, abs=0.1)
+    assert endpoint.tokens._level == pytest.approx(5900, abs=5)
@@ -0,0 +1,25 @@
+from control.assumption_gate import classify_assumptions
+from models import codec
+from models.types import AnswerProposal, Assumption, AssumptionType, Claim, Impact
+
+
+def test_assumption_type_is_normalised_to_its_value():
+    known = Assumption.from_dict({"type": AssumptionType.A2_INTERPRETATION, "text": "t", "impact": "HIGH"})
+    parsed = Assumption.from_dict({"type": " A2_INTERPRETATION ", "text": "t", "impact": "high"})
+    unknown = Assumption.from_dict({"type": "A9_GUESS", "text": "t", "impact": "low"})
+    assert known == parsed and type(known.type) is str and known.known_type
+    assert unknown.type == "A9_GUESS" and not unknown.known_type
+    assert classify_assumptions([parsed])[0] == "REVIEW"
+    assert classify_assumptions([unknown])[2] == ["ASSUMPTION_UNKNOWN_TYPE"]
+
+
+def test_round_trip_matches_dict_form():
+    proposal = AnswerProposal(
+        claims=[Claim("Employees accrue 1.5 days per month.", ["vac:sec0001#s0"])],
+        assumptions=[Assumption("A1_SCOPE", "Full-time staff.", Impact.LOW),
+                     Assumption("A9_GUESS", "Unknown type kept.", Impact.MEDIUM)],
+        final_answer="1.5 days per month.",
+    )
+    decoded = codec.loads(codec.dumps(proposal))
+    assert decoded == proposal == AnswerProposal.from_dict(proposal.to_dict())
+    assert codec.loads_many(codec.dumps_many([proposal, proposal])) == [proposal, proposal]
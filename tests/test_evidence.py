@@ -0,0 +1,53 @@
+from control.rule_packs import default_rules
+from ingestion.chunking import chunk_text
+from models.spans import decode_spans, encode_spans, sentence_spans
+from models.types import Chunk
+from retrieval.evidence import select_evidence
+
+TEXT = (
+    "Employees accrue vacation at 1.5 days per month of service. "
+    "Unused vacation carries over up to ten days; anything above that is forfeited. "
+    "Requests must be approved by a manager two weeks in advance."
+)
+
+
+def test_sentence_spans_round_trip():
+    spans = sentence_spans(TEXT)
+    assert [TEXT[s:e][:9] for s, e in spans] == ["Employees", "Unused va", "anything ", "Requests "]
+    assert decode_spans(encode_spans(spans)) == spans
+
+
+def test_chunk_text_records_spans_and_annotations():
+    [chunk] = chunk_text("vac", TEXT, {"file_name": "vac.md"}, annotate=lambda t: {"chars": len(t)})
+    assert decode_spans(chunk.metadata["spans"]) == sentence_spans(chunk.text)
+    assert chunk.metadata["chars"] == len(chunk.text)
+    [plain] = chunk_text("vac", TEXT, {})
+    assert "chars" not in plain.metadata
+
+
+def test_ingest_annotation_uses_rule_pack_flags():
+    rules = default_rules()
+    [chunk] = chunk_text("vac", TEXT, {}, annotate=rules.ingest_metadata)
+    assert chunk.metadata == {**chunk.metadata, **rules.ingest_metadata(chunk.text)}
+
+
+def test_select_evidence_keeps_best_spans_in_text_order():
+    [tc] = chunk_text("vac", TEXT, {})
+    hit = Chunk(id="vac:sec0000", text=tc.text, policy_id="vac", section_id="sec0000", metadata=tc.metadata)
+    spans = select_evidence("How many unused vacation days carry over?", [hit], per_chunk=1)
+    assert [sp.id for sp in spans] == ["vac:sec0000#s1"]
+    assert spans[0].text.startswith("Unused vacation carries over")
+
+
+def test_context_flags_count_only_shown_spans():
+    from control.assumption_detector import context_flags
+
+    text = TEXT + " Contractors are excluded from this policy."
+    [tc] = chunk_text("vac", text, {}, annotate=default_rules().ingest_metadata)
+    hit = Chunk(id="vac:sec0000", text=tc.text, policy_id="vac", section_id="sec0000", metadata=tc.metadata)
+    assert context_flags([hit]) == {"scope_exclusions"}
+
+    shown = select_evidence("How many unused vacation days carry over?", [hit], per_chunk=1)
+    assert context_flags([hit], evidence=shown) == set()
+    every = select_evidence("Are contractors excluded?", [hit], per_chunk=5)
+    assert context_flags([hit], evidence=every) == {"scope_exclusions"}
@@ -0,0 +1,96 @@
+import os
+import time
+
+from ingestion.indexer import jobs_dir, reap_jobs
+from ingestion.jobs import IngestJournal, job_status
+from retrieval.versions import lock_build, new_version, release_build, version_dir, write_manifest
+
+
+def make_job(persist_dir, job_id, version, idle=0.0):
+    journal = IngestJournal(str(jobs_dir(str(persist_dir)) / job_id))
+    journal.append("started", meta={"version": version, "files": 1, "batch_size": 8})
+    journal.append("extracted", file="leave.md", chunks=3)
+    old = time.time() - idle
+    os.utime(journal.path, (old, old))
+    os.utime(journal.job_dir, (old, old))
+    return journal.job_dir
+
+
+def test_journal_replay_and_status(tmp_path):
+    job = make_job(tmp_path, "a", "v1")
+    IngestJournal(str(job)).append("upserted", batch=0)
+    with open(job / "journal.jsonl", "a", encoding="utf-8") as f:
+        f.write('{"event": "upser')  # torn tail
+    st = job_status(str(job))
+    assert (st["version"], st["extracted"], st["batches"], st["upserted"], st["completed"]) == ("v1", 1, 1, 1, False)
+
+
+def test_reap_removes_abandoned_job_and_its_version(tmp_path):
+    name, path = new_version(str(tmp_path))
+    make_job(tmp_path, "abandoned", name, idle=7200)
+    fresh_name, _ = new_version(str(tmp_path))
+    make_job(tmp_path, "recent", fresh_name)
+
+    assert reap_jobs(str(tmp_path), grace_seconds=3600) == ["abandoned"]
+    assert not os.path.exists(path)
+    assert os.path.isdir(version_dir(str(tmp_path), fresh_name))
+    assert sorted(p.name for p in jobs_dir(str(tmp_path)).iterdir()) == ["recent"]
+
+
+def test_reap_keeps_running_build_and_drops_finished_job(tmp_path):
+    running, running_path = new_version(str(tmp_path))
+    make_job(tmp_path, "running", running, idle=7200)
+    done, done_path = new_version(str(tmp_path))
+    write_manifest(done_path, {"version": done})
+    make_job(tmp_path, "finished", done)
+
+    lock = lock_build(running_path)
+    try:
+        assert reap_jobs(str(tmp_path), grace_seconds=3600) == ["finished"]
+    finally:
+        release_build(lock)
+    assert os.path.isdir(done_path) and os.path.isdir(running_path)
+    assert reap_jobs(str(tmp_path), grace_seconds=0) == ["running"]
+
+
+def test_build_partial_streams_batches_and_resumes_from_checkpoint(tmp_path, monkeypatch):
+    import numpy as np
+    import pytest
+
+    import ingestion.indexer as indexer
+    from ingestion.loader import ShardSpec
+    from retrieval.snapshot import Snapshot
+
+    data = tmp_path / "policies"
+    data.mkdir()
+    for name in ("leave", "expenses", "travel"):
+        sections = "\n\n".join(f"## Section {i}\n" + f"{name} rule {i}. " * 40 for i in range(4))
+        (data / f"{name}.md").write_text(f"# {name} policy\n\n{sections}", encoding="utf-8")
+
+    calls = []
+
+    def embed(texts, model, batch_size=0):
+        calls.append(len(texts))
+        if fail_after is not None and len(calls) > fail_after:
+            raise RuntimeError("rate limited")
+        return [[float(len(t)), 1.0, 0.0] for t in texts]
+
+    monkeypatch.setattr(indexer, "embed_texts", embed)
+    out = str(tmp_path / "partial")
+    fail_after = 1
+    with pytest.raises(RuntimeError):
+        indexer.build_partial(str(data), out, "m", ShardSpec(0, 1), batch_size=2)
+    assert sorted(p.name for p in (tmp_path / "partial.job").glob("*.npy")) == ["000000.npy"]
+    assert max(calls) <= 2
+
+    calls.clear()
+    fail_after = None
+    manifest = indexer.build_partial(str(data), out, "m", ShardSpec(0, 1), batch_size=2)
+    assert sum(calls) == manifest["count"] - 2
+    assert not (tmp_path / "partial.job").exists()
+    snap = Snapshot(out)
+    try:
+        assert snap.count == manifest["count"]
+        assert np.allclose(snap.embeddings[:, 1], 1.0)
+    finally:
+        snap.close()
@@ -0,0 +1,92 @@
+import json
+
+import numpy as np
+import pytest
+
+from retrieval.quantized import FORMAT_VERSION, QuantizedCollection, QuantizedIndex
+
+
+def clustered(n=2000, dim=32, clusters=40, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    return centers[rng.integers(0, clusters, size=n)] + 0.2 * rng.standard_normal((n, dim)).astype(np.float32)
+
+
+def exact_top(vecs, q, k):
+    v = vecs / np.linalg.norm(vecs, axis=1, keepdims=True)
+    return [str(i) for i in np.argsort(-(v @ (q / np.linalg.norm(q))))[:k]]
+
+
+@pytest.mark.parametrize("quantization", ["int8", "float16"])
+def test_inverted_lists_scan_a_fraction_and_rescore_exactly(quantization):
+    vecs = clustered()
+    ids = [str(i) for i in range(len(vecs))]
+    index = QuantizedIndex.from_embeddings(ids, vecs, quantization, nprobe=4)
+    assert index.lists > 1 and sorted(index.ids) == sorted(ids)
+    assert int(index.offsets[-1]) == len(ids)
+
+    vectors = lambda cids: vecs[[int(c) for c in cids]]  # noqa: E731
+    hits = 0
+    for q in vecs[:50] + 0.05:
+        ranked = index.search(q, 5, vectors, rescore_factor=4)
+        assert [s for _, s in ranked] == sorted((s for _, s in ranked), reverse=True)
+        hits += len({cid for cid, _ in ranked} & set(exact_top(vecs, q, 5)))
+    assert hits / 250 >= 0.9
+
+
+def test_small_index_is_one_list_and_exact():
+    vecs = clustered(n=100)
+    index = QuantizedIndex.from_embeddings([str(i) for i in range(100)], vecs, "int8")
+    assert index.lists == 1
+    q = vecs[7]
+    ranked = index.search(q, 3, lambda cids: vecs[[int(c) for c in cids]])
+    assert [cid for cid, _ in ranked] == exact_top(vecs, q, 3)
+
+
+def test_save_load_round_trip_and_old_format_is_ignored(tmp_path):
+    vecs = clustered()
+    ids = [f"p:{i}" for i in range(len(vecs))]
+    index = QuantizedIndex.from_embeddings(ids, vecs, "int8")
+    index.save(str(tmp_path / "q"))
+    assert QuantizedIndex.exists(str(tmp_path / "q"))
+    loaded = QuantizedIndex.load(str(tmp_path / "q"), nprobe=3)
+    assert loaded.ids == index.ids and loaded.lists == index.lists and loaded.nprobe == 3
+    index.nprobe = 3
+    assert loaded.candidates(vecs[0], 10) == index.candidates(vecs[0], 10)
+
+    old = tmp_path / "old"
+    old.mkdir()
+    (old / "meta.json").write_text(json.dumps({"format_version": FORMAT_VERSION - 1}), encoding="utf-8")
+    assert not QuantizedIndex.exists(str(old))
+    assert not QuantizedIndex.exists(str(tmp_path / "missing"))
+
+
+class FakeCollection:
+    def __init__(self, ids, vecs):
+        self.rows = {cid: i for i, cid in enumerate(ids)}
+        self.vecs = vecs
+        self.calls = []
+
+    def get(self, ids=None, include=None):
+        self.calls.append((list(ids), list(include)))
+        found = [cid for cid in ids if cid in self.rows]
+        return {
+            "ids": found,
+            "documents": [f"doc {cid}" for cid in found],
+            "metadatas": [{"policy_id": "p"} for _ in found],
+            "embeddings": [self.vecs[self.rows[cid]] for cid in found],
+        }
+
+
+def test_collection_rescores_with_store_embeddings_in_one_get():
+    vecs = clustered()
+    ids = [str(i) for i in range(len(vecs))]
+    store = FakeCollection(ids[:-1], vecs)  # the last row was deleted from the store
+    coll = QuantizedCollection(store, QuantizedIndex.from_embeddings(ids, vecs, "int8"), rescore_factor=4)
+
+    res = coll.query([vecs[-1], vecs[3]], n_results=5)
+    assert len(store.calls) == 2 and all("embeddings" in inc for _, inc in store.calls)
+    assert ids[-1] not in res["ids"][0]
+    assert res["ids"][1][0] == "3" and res["distances"][1][0] == pytest.approx(0.0, abs=1e-5)
+    assert res["documents"][1][0] == "doc 3"
+    assert res["distances"][1] == sorted(res["distances"][1])
@@ -0,0 +1,26 @@
+import pytest
+
+from llm.rate_limiter import ENDPOINT_CHAT, ENDPOINT_EMBEDDINGS, RateLimiter, TokenBucket
+
+
+def test_token_bucket_waits_for_refill_and_refunds():
+    bucket = TokenBucket(rate_per_minute=60)
+    assert bucket.reserve(60) == 0.0
+    assert bucket.reserve(30) == pytest.approx(30.0, abs=0.1)
+    bucket.refund(30)
+    assert bucket.reserve(1) == pytest.approx(1.0, abs=0.1)
+
+
+def test_rate_limit_share_divides_limits(monkeypatch):
+    monkeypatch.setenv("OPENAI_EMBED_RPM", "3000")
+    monkeypatch.setenv("OPENAI_EMBED_TPM", "1000000")
+    monkeypatch.setenv("OPENAI_CHAT_RPM", "500")
+    monkeypatch.setenv("RATE_LIMIT_SHARE", "0.25")
+    limiter = RateLimiter.from_env()
+    assert limiter.endpoint(ENDPOINT_EMBEDDINGS).limits.rpm == 750
+    assert limiter.endpoint(ENDPOINT_EMBEDDINGS).limits.tpm == 250_000
+    assert limiter.endpoint(ENDPOINT_CHAT).limits.rpm == 125
+
+    monkeypatch.setenv("RATE_LIMIT_SHARE", "0")
+    with pytest.raises(ValueError):
+        RateLimiter.from_env()
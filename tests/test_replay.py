@@ -0,0 +1,71 @@
+import json
+
+from governance.logger import AuditStore
+from governance.replay import replay, replay_record
+from models import codec
+from models.types import (
+    AnswerProposal, Assumption, Chunk, Claim, ComplianceDecision, DecisionStatus, EvidenceSpan, Impact,
+    PolicyAssessment, RiskLevel,
+)
+from pipeline import QuestionResult
+
+TEXT = "Employees accrue 1.5 days of vacation per month."
+
+
+def make_result() -> QuestionResult:
+    chunk = Chunk("vac:sec0001", "vac", "sec0001", TEXT, {"policy_id": "vac", "flags": ""}, 0.12)
+    span = EvidenceSpan("vac:sec0001#s0", "vac:sec0001", 0, 0, len(TEXT), TEXT, 0.9)
+    verifier = PolicyAssessment(issues=[], risk_level=RiskLevel.LOW, confidence=0.9, is_compliant=True)
+    return QuestionResult(
+        question="How many vacation days do I get?",
+        hits=[chunk],
+        proposal=AnswerProposal([Claim("Employees accrue 1.5 days per month.", ["vac:sec0001#s0"])], [], "1.5 days."),
+        assessment=verifier,
+        decision=ComplianceDecision(DecisionStatus.SAFE, [], verifier),
+        evidence=[span],
+        proposed_assumptions=[Assumption("A1_SCOPE", "Full-time staff.", Impact.LOW)],
+        verifier_assessment=verifier,
+    )
+
+
+def test_audit_inputs_round_trip_through_the_store(tmp_path):
+    result = make_result()
+    store = AuditStore(str(tmp_path), flush_interval=0.01)
+    try:
+        store.record(result)
+        store.flush()
+        (record,) = list(store.query())
+    finally:
+        store.close()
+
+    inputs = record["inputs"]
+    assert codec.unpack_many(inputs["chunks"]) == result.hits
+    assert codec.unpack_many(inputs["evidence"]) == result.evidence
+    assert codec.unpack_many(inputs["assumptions"]) == result.proposed_assumptions
+    assert codec.unpack(inputs["assessment"]) == result.verifier_assessment
+
+    report = replay(store.files(), workers=0)
+    assert (report.replayed, report.errors) == (1, 0)
+    assert report.transitions == {f"{record['decision']} -> {replay_record(record)['decision']}": 1}
+
+
+def test_replay_reads_records_audited_as_bare_rows():
+    result = make_result()
+    store_record = json.loads(json.dumps({
+        "question": result.question,
+        "claims": [c.to_dict() for c in result.proposal.claims],
+        "final_answer": result.proposal.final_answer,
+        "inputs": {
+            "chunks": [h.to_row() for h in result.hits],
+            "evidence": [sp.to_row() for sp in result.evidence],
+            "assumptions": [a.to_row() for a in result.proposed_assumptions],
+            "assessment": result.verifier_assessment.to_row(),
+        },
+    }))
+    packed = json.loads(json.dumps({**store_record, "inputs": {
+        "chunks": codec.pack_many(result.hits),
+        "evidence": codec.pack_many(result.evidence),
+        "assumptions": codec.pack_many(result.proposed_assumptions),
+        "assessment": codec.pack(result.verifier_assessment),
+    }}))
+    assert replay_record(store_record) == replay_record(packed)
@@ -0,0 +1,73 @@
+import asyncio
+import json
+
+from models.types import (
+    AnswerProposal, Claim, ComplianceDecision, DecisionStatus, PolicyAssessment, RiskLevel,
+)
+from pipeline import QuestionResult
+from serve import handle
+from serving.admission import Overloaded, Priority
+from serving.service import QuestionService
+
+
+class StubService(QuestionService):
+    """QuestionService with ask() replaced; payload formatting is the real one."""
+
+    def __init__(self, outcome):
+        self.outcome = outcome
+        self.asked = []
+
+    async def ask(self, question, tenant="default", priority=Priority.INTERACTIVE, deadline=None):
+        self.asked.append((question, tenant, priority, deadline))
+        if isinstance(self.outcome, Exception):
+            raise self.outcome
+        return self.outcome
+
+
+def make_result() -> QuestionResult:
+    assessment = PolicyAssessment(issues=[], risk_level=RiskLevel.LOW, confidence=0.9, is_compliant=True)
+    return QuestionResult(
+        question="How many vacation days?",
+        hits=[],
+        proposal=AnswerProposal(
+            claims=[Claim("Employees accrue 1.5 days per month.", ["vac:sec0001"])],
+            assumptions=[],
+            final_answer="1.5 days per month.",
+        ),
+        assessment=assessment,
+        decision=ComplianceDecision(DecisionStatus.SAFE, ["OK"], assessment),
+    )
+
+
+def ask(service, body):
+    return asyncio.run(handle(service, "POST", "/ask", json.dumps(body).encode()))
+
+
+def test_ask_returns_the_decision_payload():
+    service = StubService(make_result())
+    status, payload = ask(service, {"question": " How many vacation days? ", "tenant": "hr", "priority": "batch"})
+    assert status == 200
+    assert payload == {
+        "decision": "safe_to_use",
+        "final_answer": "1.5 days per month.",
+        "claims": [{"text": "Employees accrue 1.5 days per month.", "citations": ["vac:sec0001"]}],
+        "reasons": ["OK"],
+        "confidence": 0.9,
+    }
+    assert service.asked == [("How many vacation days?", "hr", Priority.BATCH, None)]
+
+
+def test_shed_request_gets_503_with_retry_after():
+    service = StubService(Overloaded("queue_full", 7.0, Priority.INTERACTIVE))
+    status, payload = ask(service, {"question": "q", "deadline": 2})
+    assert status == 503
+    assert payload["decision"] == "review_required"
+    assert payload["reasons"] == ["LOAD_SHED:queue_full"] and payload["retry_after"] == 7.0
+
+
+def test_bad_requests_are_rejected_before_asking():
+    service = StubService(make_result())
+    assert ask(service, {"question": "q", "priority": "urgent"})[0] == 400
+    assert ask(service, {"question": "  "})[0] == 400
+    assert asyncio.run(handle(service, "GET", "/nope", b""))[0] == 404
+    assert service.asked == []
@@ -0,0 +1,287 @@
+import asyncio
+
+import pytest
+
+import serving.service as service_mod
+from serving.admission import AdmissionController, Overloaded, Priority, PrioritySemaphore
+from serving.coalesce import SingleFlight
+from serving.service import QuestionService
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+# SingleFlight
+
+def test_single_flight_shares_one_execution():
+    async def main():
+        flight, calls = SingleFlight(), []
+
+        async def fn():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "answer"
+
+        results = await asyncio.gather(*(flight.do("k", fn) for _ in range(5)))
+        return flight, calls, results
+
+    flight, calls, results = run(main())
+    assert len(calls) == 1
+    assert [r for r, _ in results] == ["answer"] * 5
+    assert [shared for _, shared in results].count(False) == 1
+    assert flight.metrics()["coalesced"] == 4 and flight.metrics()["in_flight"] == 0
+
+
+def test_single_flight_shares_exceptions_and_forgets_key():
+    async def main():
+        flight = SingleFlight()
+
+        async def boom():
+            await asyncio.sleep(0)
+            raise ValueError("nope")
+
+        results = await asyncio.gather(flight.do("k", boom), flight.do("k", boom), return_exceptions=True)
+        again, shared = await flight.do("k", lambda: asyncio.sleep(0, result="ok"))
+        return results, again, shared
+
+    results, again, shared = run(main())
+    assert all(isinstance(r, ValueError) for r in results)
+    assert (again, shared) == ("ok", False)
+
+
+def test_single_flight_caller_cancellation_keeps_shared_run():
+    async def main():
+        flight, release = SingleFlight(), asyncio.Event()
+
+        async def fn():
+            await release.wait()
+            return "done"
+
+        leader = asyncio.ensure_future(flight.do("k", fn))
+        follower = asyncio.ensure_future(flight.do("k", fn))
+        await asyncio.sleep(0)
+        leader.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        return await follower, leader.cancelled()
+
+    (result, shared), leader_cancelled = run(main())
+    assert leader_cancelled and result == "done" and shared
+
+
+# PrioritySemaphore
+
+def test_priority_semaphore_wakes_by_class_then_fifo():
+    async def main():
+        sem, order = PrioritySemaphore(1), []
+        await sem.acquire()
+
+        async def waiter(name, prio):
+            await sem.acquire(prio)
+            order.append(name)
+            sem.release()
+
+        tasks = [asyncio.ensure_future(waiter(n, p)) for n, p in
+                 [("b1", Priority.BATCH), ("i1", Priority.INTERACTIVE), ("b2", Priority.BATCH), ("i2", Priority.INTERACTIVE)]]
+        await asyncio.sleep(0)
+        assert sem.waiting == 4
+        sem.release()
+        await asyncio.gather(*tasks)
+        return order
+
+    assert run(main()) == ["i1", "i2", "b1", "b2"]
+
+
+def test_priority_semaphore_cancelled_waiter_does_not_leak_slot():
+    async def main():
+        sem = PrioritySemaphore(1)
+        await sem.acquire()
+        cancelled = asyncio.ensure_future(sem.acquire())
+        second = asyncio.ensure_future(sem.acquire())
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        await asyncio.sleep(0)
+        sem.release()
+        await asyncio.wait_for(second, 1)
+        sem.release()
+        await asyncio.wait_for(sem.acquire(), 1)  # the slot came back
+        return sem.waiting
+
+    assert run(main()) == 0
+
+
+# AdmissionController
+
+def test_admission_sheds_when_tenant_queue_is_full():
+    async def main():
+        ac, release = AdmissionController(max_inflight=1, tenant_queue=1), asyncio.Event()
+        running = asyncio.ensure_future(ac.run(release.wait, tenant="a"))
+        await asyncio.sleep(0)
+        queued = asyncio.ensure_future(ac.run(lambda: asyncio.sleep(0, result="q"), tenant="a"))
+        await asyncio.sleep(0)
+        with pytest.raises(Overloaded) as exc:
+            await ac.run(lambda: asyncio.sleep(0), tenant="a")
+        other = asyncio.ensure_future(ac.run(lambda: asyncio.sleep(0, result="b"), tenant="b"))
+        release.set()
+        await running
+        return exc.value, await queued, await other, ac.metrics()
+
+    exc, queued, other, metrics = run(main())
+    assert exc.reason == "queue_full" and exc.retry_after >= 1
+    assert (queued, other) == ("q", "b")
+    assert metrics["shed"] == {"interactive:queue_full": 1}
+    assert metrics["inflight"] == {"interactive": 0, "batch": 0}
+
+
+def test_admission_sheds_queued_request_at_deadline():
+    async def main():
+        ac, release = AdmissionController(max_inflight=1), asyncio.Event()
+        running = asyncio.ensure_future(ac.run(release.wait))
+        await asyncio.sleep(0)
+        with pytest.raises(Overloaded) as exc:
+            await ac.run(lambda: asyncio.sleep(0), deadline=0.02)
+        release.set()
+        await running
+        return exc.value, ac.queued()
+
+    exc, queued = run(main())
+    assert exc.reason == "deadline" and queued == 0
+
+
+def test_admission_serves_interactive_first_and_round_robin_tenants():
+    async def main():
+        ac, release, order = AdmissionController(max_inflight=1), asyncio.Event(), []
+        running = asyncio.ensure_future(ac.run(release.wait))
+        await asyncio.sleep(0)
+
+        def job(name):
+            async def fn():
+                order.append(name)
+            return fn
+
+        tasks = [asyncio.ensure_future(ac.run(job(n), tenant=t, priority=p)) for n, t, p in [
+            ("batch", "a", Priority.BATCH),
+            ("a1", "a", Priority.INTERACTIVE),
+            ("a2", "a", Priority.INTERACTIVE),
+            ("b1", "b", Priority.INTERACTIVE),
+        ]]
+        await asyncio.sleep(0)
+        release.set()
+        await running
+        await asyncio.gather(*tasks)
+        return order
+
+    assert run(main()) == ["a1", "b1", "a2", "batch"]
+
+
+def test_admission_cancelled_waiter_leaves_queue():
+    async def main():
+        ac, release = AdmissionController(max_inflight=1), asyncio.Event()
+        running = asyncio.ensure_future(ac.run(release.wait))
+        await asyncio.sleep(0)
+        waiter = asyncio.ensure_future(ac.run(lambda: asyncio.sleep(0)))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        queued = ac.queued()
+        release.set()
+        await running
+        return queued, ac.inflight
+
+    assert run(main()) == (0, 0)
+
+
+def test_admission_batch_is_capped_below_max_inflight():
+    async def main():
+        ac, release = AdmissionController(max_inflight=2, batch_max_inflight=1), asyncio.Event()
+        batch = asyncio.ensure_future(ac.run(release.wait, priority=Priority.BATCH))
+        await asyncio.sleep(0)
+        second_batch = asyncio.ensure_future(ac.run(lambda: asyncio.sleep(0), priority=Priority.BATCH))
+        interactive = await ac.run(lambda: asyncio.sleep(0, result="now"))
+        queued = ac.queued(Priority.BATCH)
+        release.set()
+        await asyncio.gather(batch, second_batch)
+        return interactive, queued
+
+    assert run(main()) == ("now", 1)
+
+
+# QuestionService: admission applies per caller
+
+class _Registry:
+    def current(self):
+        return "v1", None
+
+
+class _Audit:
+    def __init__(self):
+        self.records = []
+
+    def append(self, record):
+        self.records.append(record)
+
+    def record(self, result, **extra):
+        self.records.append({"result": result, **extra})
+
+
+def make_service(monkeypatch, admission, calls):
+    async def fake_answer(question, *args, **kwargs):
+        calls.append(question)
+        await asyncio.sleep(0.05)
+        return f"result for {question}"
+
+    monkeypatch.setattr(service_mod, "answer_question", fake_answer)
+    return QuestionService(registry=_Registry(), embed_model="m", audit=_Audit(), admission=admission)
+
+
+def test_service_coalesces_identical_questions(monkeypatch):
+    calls = []
+    svc = make_service(monkeypatch, AdmissionController(max_inflight=4), calls)
+
+    async def main():
+        return await asyncio.gather(*(svc.ask("Leave policy?", tenant=f"t{i}") for i in range(4)))
+
+    results = run(main())
+    assert calls == ["Leave policy?"] and set(results) == {"result for Leave policy?"}
+    assert sorted(r["coalesced"] for r in svc.audit.records) == [False, True, True, True]
+    assert [r["tenant"] for r in svc.audit.records if not r["coalesced"]] == ["t0"]
+
+
+def test_follower_is_readmitted_when_leader_is_shed(monkeypatch):
+    calls = []
+    svc = make_service(monkeypatch, AdmissionController(max_inflight=1), calls)
+
+    async def main():
+        blocker = asyncio.ensure_future(svc.ask("other question"))
+        await asyncio.sleep(0)
+        leader = asyncio.ensure_future(svc.ask("q", tenant="a", deadline=0.01))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(svc.ask("q", tenant="b", deadline=5))
+        results = await asyncio.gather(blocker, leader, follower, return_exceptions=True)
+        return results
+
+    _, leader, follower = run(main())
+    assert isinstance(leader, Overloaded) and leader.reason == "deadline"
+    assert follower == "result for q"
+    shed = [r for r in svc.audit.records if "LOAD_SHED:deadline" in r.get("reasons", [])]
+    assert [r["tenant"] for r in shed] == ["a"]
+
+
+def test_follower_is_shed_at_its_own_deadline(monkeypatch):
+    calls = []
+    svc = make_service(monkeypatch, AdmissionController(max_inflight=1), calls)
+
+    async def main():
+        blocker = asyncio.ensure_future(svc.ask("other question"))
+        await asyncio.sleep(0)
+        leader = asyncio.ensure_future(svc.ask("q", tenant="a", deadline=5))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(svc.ask("q", tenant="b", deadline=0.01))
+        return await asyncio.gather(blocker, leader, follower, return_exceptions=True)
+
+    _, leader, follower = run(main())
+    assert leader == "result for q"
+    assert isinstance(follower, Overloaded) and follower.reason == "deadline"
+    assert calls.count("q") == 1
+    assert svc.admission.metrics()["shed"] == {"interactive:deadline": 1}
@@ -0,0 +1,35 @@
+import numpy as np
+
+from retrieval.snapshot import Snapshot, import_as_version, write_snapshot
+from retrieval.versions import current_version, read_manifest, version_dir
+
+
+def page(ids, dim=4):
+    rng = np.random.default_rng(0)
+    return {
+        "ids": ids,
+        "documents": [f"text of {i}" for i in ids],
+        "metadatas": [{"policy_id": i.split(":")[0], "section_id": i.split(":")[1]} for i in ids],
+        "embeddings": rng.normal(size=(len(ids), dim)).astype(np.float32),
+    }
+
+
+def test_snapshot_round_trip(tmp_path):
+    manifest = write_snapshot(str(tmp_path / "snap"), iter([page(["leave:1", "leave:2"])]), embed_model="m")
+    snap = Snapshot(str(tmp_path / "snap"))
+    try:
+        assert manifest["count"] == snap.count == 2
+        assert snap.record(1)["id"] == "leave:2"
+        assert snap.embeddings.shape == (2, 4)
+    finally:
+        snap.close()
+
+
+def test_import_empty_snapshot_with_quantization(tmp_path, monkeypatch):
+    monkeypatch.setenv("VECTOR_QUANTIZATION", "int8")
+    monkeypatch.setenv("EMBED_DIMENSIONS", "")
+    write_snapshot(str(tmp_path / "empty"), iter([]), embed_model="m")
+
+    name = import_as_version(str(tmp_path / "empty"), str(tmp_path / "index"), "m")
+    assert current_version(str(tmp_path / "index")) == name
+    assert read_manifest(version_dir(str(tmp_path / "index"), name))["chunk_count"] == 0
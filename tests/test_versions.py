@@ -0,0 +1,68 @@
+import os
+import time
+
+from retrieval.versions import (
+    RETIRED_FILE,
+    current_version,
+    gc_versions,
+    list_versions,
+    lock_build,
+    new_version,
+    promote,
+    release_build,
+    write_manifest,
+)
+
+
+def complete(persist_dir):
+    name, path = new_version(str(persist_dir))
+    write_manifest(path, {"version": name})
+    return name, path
+
+
+def age(path, seconds):
+    old = time.time() - seconds
+    for dirpath, _, files in os.walk(path):
+        for f in files:
+            os.utime(os.path.join(dirpath, f), (old, old))
+    os.utime(path, (old, old))
+
+
+def test_promote_retires_previous_and_gc_waits_for_grace(tmp_path):
+    first, _ = complete(tmp_path)
+    promote(str(tmp_path), first)
+    second, _ = complete(tmp_path)
+    assert promote(str(tmp_path), second) == first
+    assert current_version(str(tmp_path)) == second
+
+    assert gc_versions(str(tmp_path), grace_seconds=60) == []
+    assert gc_versions(str(tmp_path), grace_seconds=0) == [first]
+    assert list_versions(str(tmp_path)) == [second]
+
+
+def test_gc_removes_abandoned_build_after_build_grace(tmp_path):
+    current, _ = complete(tmp_path)
+    promote(str(tmp_path), current)
+    abandoned, path = new_version(str(tmp_path))
+    (tmp_path / "versions" / abandoned / "chroma.sqlite3").write_text("x")
+
+    assert gc_versions(str(tmp_path), grace_seconds=0, build_grace_seconds=60) == []
+    age(path, 120)
+    assert gc_versions(str(tmp_path), grace_seconds=0, build_grace_seconds=60) == [abandoned]
+    assert list_versions(str(tmp_path)) == [current]
+
+
+def test_gc_keeps_locked_build_and_unpromoted_complete_version(tmp_path):
+    building, path = new_version(str(tmp_path))
+    lock = lock_build(path)
+    unpromoted, done_path = complete(tmp_path)
+    age(path, 120)
+    age(done_path, 120)
+    try:
+        assert gc_versions(str(tmp_path), grace_seconds=0, build_grace_seconds=0) == []
+    finally:
+        release_build(lock)
+    assert not (tmp_path / "versions" / building / "BUILDING").exists()
+    assert gc_versions(str(tmp_path), grace_seconds=0, build_grace_seconds=0) == [building]
+    assert list_versions(str(tmp_path)) == [unpromoted]
+    assert not (tmp_path / "versions" / unpromoted / RETIRED_FILE).exists()
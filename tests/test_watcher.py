@@ -0,0 +1,64 @@
+import time
+
+import ingestion.watcher as watcher_mod
+from ingestion.watcher import PolicyWatcher
+
+
+def test_failed_rebuild_is_retried_after_debounce(tmp_path, monkeypatch):
+    builds, failed = [], []
+
+    def build(data_dir, persist_dir, embed_model):
+        builds.append(time.monotonic())
+        if len(builds) == 1:
+            time.sleep(0.4)  # outlasts the debounce window that started before the build
+            failed.append(time.monotonic())
+            raise RuntimeError("embedding service down")
+        return "v2"
+
+    monkeypatch.setattr(watcher_mod, "build_index_version", build)
+    monkeypatch.setattr(watcher_mod, "stat_signature", lambda d: {"leave.md": (1, 1)})
+    monkeypatch.setattr(watcher_mod, "gc_versions", lambda *a: [])
+
+    swapped = []
+    w = PolicyWatcher(str(tmp_path), str(tmp_path), "m", poll_interval=0.01, debounce=0.3, on_swap=swapped.append)
+    w.start()
+    try:
+        deadline = time.monotonic() + 5
+        while not swapped and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        w.stop()
+    assert swapped == ["v2"]
+    assert builds[1] - failed[0] >= 0.3
+
+
+def test_successful_rebuild_is_not_repeated(tmp_path, monkeypatch):
+    builds = []
+    sig = {"leave.md": (1, 1)}
+
+    def build(data_dir, persist_dir, embed_model):
+        builds.append(dict(sig))
+        time.sleep(0.3)  # the poller asks for a rebuild while this one runs
+        return f"v{len(builds)}"
+
+    monkeypatch.setattr(watcher_mod, "build_index_version", build)
+    monkeypatch.setattr(watcher_mod, "stat_signature", lambda d: dict(sig))
+    monkeypatch.setattr(watcher_mod, "gc_versions", lambda *a: [])
+
+    swapped = []
+    w = PolicyWatcher(str(tmp_path), str(tmp_path), "m", poll_interval=0.01, debounce=0.05, on_swap=swapped.append)
+    w.start()
+    try:
+        time.sleep(0.8)
+        assert swapped == ["v1"]
+
+        # a change after the build still triggers exactly one more
+        sig["leave.md"] = (2, 2)
+        deadline = time.monotonic() + 5
+        while len(swapped) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        time.sleep(0.5)
+    finally:
+        w.stop()
+    assert swapped == ["v1", "v2"]
+    assert builds[1] == {"leave.md": (2, 2)}